@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+背景绘制性能对比：逐帧绘制 vs 预渲染缓存层
+"""
+
+import os
+import sys
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from src.environment.background import Background
+from src.utils.constants import *
+from src.utils.timing import time_calls, summarize
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    results = {}
+    for label, cached in (('逐帧绘制', False), ('缓存层', True)):
+        background = Background(cached=cached)
+        results[label] = summarize(time_calls(background.draw, screen))
+
+    print(f"{'模式':<8} {'平均(ms)':>10} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for label, stats in results.items():
+        print(f"{label:<8} {stats['mean']:>10.3f} {stats['p50']:>8.3f} {stats['p95']:>8.3f} {stats['p99']:>8.3f}")
+
+    speedup = results['逐帧绘制']['mean'] / max(results['缓存层']['mean'], 1e-9)
+    print(f"加速比: {speedup:.1f}x")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+标准场景性能基准：在 SDL dummy 驱动下逐帧测量各阶段耗时，并与基线对比
+
+场景：四个内置关卡、粒子风暴、500 只小鸟同时飞行、程序生成的超大关卡。
+阶段：静态世界层（背景 + 西瓜 + 小羊）、运动物体绘制（小鸟/粒子）、Game.update、其中的碰撞处理。
+
+    python3 benchmarks/bench_scenes.py                  # 运行并与 benchmarks/baseline.json 对比
+    python3 benchmarks/bench_scenes.py --save-baseline  # 把本次结果保存为新基线
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from src.game import Game
+from src.entities.particle import particle_pool
+from src.levels.generator import GeneratedLevels
+from src.levels.loader import level_library
+from src.utils.constants import *
+from src.utils.timing import summarize
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+PHASES = ('world', 'moving', 'update', 'collisions', 'frame')
+SEED = 1234
+
+
+def _random_pull(rng):
+    """能打到关卡中小羊的一类拉动向量"""
+    return (rng.uniform(-150, -60), rng.uniform(10, 120))
+
+
+class Scene:
+    """基准场景：setup 准备世界状态，before_frame 在每帧开始前补充负载（不计时）"""
+    def __init__(self, name, level=1, levels=None, max_birds=500):
+        self.name = name
+        self.level = level
+        self.levels = levels
+        self.max_birds = max_birds
+        self.rng = random.Random(SEED)
+
+    def setup(self, game):
+        game.sim.levels = self.levels if self.levels is not None else level_library
+        game.sim.level_count = game.sim.levels.level_count
+        game.sim.max_birds = self.max_birds
+        game.setup_level(self.level)
+
+    def before_frame(self, game):
+        """当前小鸟没有在飞时发射它，保持场景中一直有小鸟飞行和碰撞"""
+        bird = game.get_current_bird()
+        if game.sim.level_complete or game.sim.game_over or bird is None:
+            game.sim.game_over = False
+            game.setup_level(self.level)
+            bird = game.get_current_bird()
+        if not bird.launched:
+            game.sim.launch(*_random_pull(self.rng))
+
+
+class ParticleStormScene(Scene):
+    """第四关，每帧在屏幕上随机位置喷出大量粒子（粒子池会一直处于满载状态）"""
+    def before_frame(self, game):
+        super().before_frame(game)
+        for _ in range(20):
+            particle_pool.emit(self.rng.uniform(0, SCREEN_WIDTH), self.rng.uniform(0, SCREEN_HEIGHT),
+                               [RED, YELLOW, PINK, WHITE], 10, spread_x=40, spread_y=40)
+
+
+class FlockScene(Scene):
+    """同时有 500 只小鸟在飞"""
+    FLOCK_SIZE = 500
+
+    def before_frame(self, game):
+        sim = game.sim
+        queue = sim.bird_queue
+        in_flight = sum(1 for bird in queue.in_flight if bird.active)
+        while in_flight < self.FLOCK_SIZE and queue.current is not None:
+            sim.launch(*_random_pull(self.rng))
+            sim.next_bird()
+            in_flight += 1
+
+
+def standard_scenes():
+    scenes = [Scene(f'level{level}', level) for level in range(1, 5)]
+    scenes.append(ParticleStormScene('particle_storm', 4))
+    scenes.append(FlockScene('birds_500', 1, max_birds=1000000))
+    scenes.append(Scene('mega_level', 1, GeneratedLevels(SEED, groups=100)))
+    return scenes
+
+
+def run_scene(game, scene, frames, warmup):
+    """运行一个场景，返回各阶段的耗时样本（纳秒）"""
+    random.seed(SEED)
+    particle_pool.seed(SEED)
+    particle_pool.clear()
+    scene.setup(game)
+
+    sim = game.sim
+    screen = game.screen
+    collision_ns = [0]
+    resolve_collisions = sim.resolve_collisions
+
+    def timed_collisions(bird):
+        start = time.perf_counter_ns()
+        resolve_collisions(bird)
+        collision_ns[0] += time.perf_counter_ns() - start
+
+    sim.resolve_collisions = timed_collisions
+    samples = {phase: [] for phase in PHASES}
+    try:
+        for frame in range(warmup + frames):
+            scene.before_frame(game)
+            collision_ns[0] = 0
+
+            t0 = time.perf_counter_ns()
+            game.update()
+            t1 = time.perf_counter_ns()
+            game.world.draw(screen, sim.watermelons, sim.sheeps)
+            t2 = time.perf_counter_ns()
+            for bird in sim.bird_queue.active_birds():
+                bird.draw(screen)
+            particle_pool.draw(screen)
+            t3 = time.perf_counter_ns()
+            game.draw_ui()
+            pygame.display.flip()
+            t4 = time.perf_counter_ns()
+
+            if frame >= warmup:
+                samples['update'].append(t1 - t0)
+                samples['collisions'].append(collision_ns[0])
+                samples['world'].append(t2 - t1)
+                samples['moving'].append(t3 - t2)
+                samples['frame'].append(t4 - t0)
+    finally:
+        del sim.resolve_collisions
+    return samples
+
+
+def compare(results, baseline, tolerance, floor_ms):
+    """对比 p95，超过基线 (1 + tolerance) 倍且绝对差值超过 floor_ms 的记为退化"""
+    regressions = []
+    for scene, phases in results.items():
+        for phase, stats in phases.items():
+            base = baseline.get(scene, {}).get(phase)
+            if base is None:
+                continue
+            if stats['p95'] > base['p95'] * (1 + tolerance) and stats['p95'] - base['p95'] > floor_ms:
+                regressions.append((scene, phase, base['p95'], stats['p95']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="标准场景性能基准")
+    parser.add_argument('--scenes', nargs='*', default=None, help="只运行这些场景")
+    parser.add_argument('--frames', type=int, default=300, help="每个场景计时的帧数")
+    parser.add_argument('--warmup', type=int, default=30, help="每个场景开始计时前的预热帧数")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="基线文件")
+    parser.add_argument('--save-baseline', action='store_true', help="把本次结果保存为基线")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="p95 允许比基线慢的比例")
+    parser.add_argument('--floor', type=float, default=0.2, help="小于这个差值（毫秒）的变化不算退化")
+    args = parser.parse_args()
+
+    game = Game(quiet=True)
+    scenes = [scene for scene in standard_scenes() if not args.scenes or scene.name in args.scenes]
+
+    results = {}
+    print(f"{'场景':<16}{'阶段':<12}{'平均(ms)':>10}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for scene in scenes:
+        samples = run_scene(game, scene, args.frames, args.warmup)
+        results[scene.name] = {phase: summarize(values) for phase, values in samples.items()}
+        for phase in PHASES:
+            stats = results[scene.name][phase]
+            print(f"{scene.name:<16}{phase:<12}{stats['mean']:>10.3f}{stats['p50']:>9.3f}"
+                  f"{stats['p95']:>9.3f}{stats['p99']:>9.3f}")
+    pygame.quit()
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+        for scene, phases in results.items():
+            baseline[scene] = {phase: {key: round(value, 4) for key, value in stats.items()}
+                               for phase, stats in phases.items()}
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"基线已保存: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("没有基线文件，使用 --save-baseline 保存本次结果")
+        return
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.floor)
+    if regressions:
+        print(f"\n⚠️ p95 比基线慢超过 {args.tolerance:.0%}：")
+        for scene, phase, base, now in regressions:
+            print(f"  {scene:<16}{phase:<12}{base:>8.3f} -> {now:.3f} ms")
+        sys.exit(1)
+    print("\n✅ 没有发现性能退化")
+
+
+if __name__ == "__main__":
+    main()
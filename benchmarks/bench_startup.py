@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+启动性能基准：从启动进程到第一帧显示出来（time-to-first-frame）的耗时
+
+每次测量都新开一个 Python 进程（冷启动，包含解释器启动和导入），在 SDL dummy 驱动下创建 Game、画出第一帧，
+分别统计：解释器启动、导入、Game 初始化、第一帧绘制。
+
+    python3 benchmarks/bench_startup.py                 # 测 10 次，中位数超过目标时退出码为 1
+    python3 benchmarks/bench_startup.py --runs 20 --target 400
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAGES = ('interpreter', 'imports', 'init', 'first_frame', 'total')
+TARGET_MS = 400
+
+
+def child(spawned_at):
+    """子进程：导入游戏、创建 Game、画第一帧，把各阶段耗时（毫秒）以 JSON 输出"""
+    started = time.time()
+    sys.path.insert(0, ROOT)
+    import pygame
+    from src.game import Game
+    imported = time.time()
+    game = Game(quiet=True)
+    initialized = time.time()
+    game.draw()
+    drawn = time.time()
+    loaded_fonts = game.fonts.loaded
+    game._wait_for_music()
+    pygame.quit()
+    print(json.dumps({
+        'interpreter': (started - spawned_at) * 1000,
+        'imports': (imported - started) * 1000,
+        'init': (initialized - imported) * 1000,
+        'first_frame': (drawn - initialized) * 1000,
+        'total': (drawn - spawned_at) * 1000,
+        'fonts': loaded_fonts,
+    }))
+
+
+def measure_once():
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+    spawned_at = time.time()
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', repr(spawned_at)],
+                            env=env, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动到第一帧的耗时")
+    parser.add_argument('--runs', type=int, default=10, help="冷启动次数")
+    parser.add_argument('--target', type=float, default=TARGET_MS, help="首帧耗时中位数的目标（毫秒）")
+    parser.add_argument('--child', type=float, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child is not None:
+        child(args.child)
+        return
+
+    sys.path.insert(0, ROOT)
+    from src.utils.timing import summarize
+
+    runs = [measure_once() for _ in range(args.runs)]
+    print(f"{'阶段':<14}{'平均(ms)':>10}{'p50':>9}{'p95':>9}")
+    results = {}
+    for stage in STAGES:
+        # summarize 以纳秒为输入
+        results[stage] = summarize([run[stage] * 1e6 for run in runs])
+        stats = results[stage]
+        print(f"{stage:<14}{stats['mean']:>10.1f}{stats['p50']:>9.1f}{stats['p95']:>9.1f}")
+    print(f"第一帧之前加载的字体: {', '.join(runs[-1]['fonts']) or '无'}")
+
+    median = results['total']['p50']
+    if median > args.target:
+        print(f"\n⚠️ 首帧耗时中位数 {median:.0f} ms 超过目标 {args.target:.0f} ms")
+        sys.exit(1)
+    print(f"\n✅ 首帧耗时中位数 {median:.0f} ms（目标 {args.target:.0f} ms）")
+
+
+if __name__ == "__main__":
+    main()
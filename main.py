@@ -4,27 +4,101 @@
 主程序入口文件
 """
 
+import argparse
+import math
+import os
 import pygame
 import sys
 from src.game import Game
+from src.levels.generator import GeneratedLevels
+from src.simulation.replay import MAX_COUNT, MAX_LEVEL_SEED, MAX_SEED, Replay
+from src.utils.constants import SIM_RATE
+
+def _int_in_range(low, high):
+    """argparse 类型：low 到 high 之间的整数（上限取自录像文件头字段的宽度）"""
+    def parse(text):
+        value = int(text)
+        if not low <= value <= high:
+            raise argparse.ArgumentTypeError(f"必须是 {low} 到 {high} 之间的整数: {text}")
+        return value
+    parse.__name__ = 'int'  # argparse 报告无法解析的值时显示的类型名
+    return parse
+
+def _positive_float(text):
+    """argparse 类型：有限的正数"""
+    value = float(text)
+    if not (math.isfinite(value) and value > 0):
+        raise argparse.ArgumentTypeError(f"必须是有限的正数: {text}")
+    return value
 
 def main():
     """游戏主函数"""
-    print("🎮 愤怒的小鸟 🎮")
-    print("=" * 40)
-    print("游戏控制说明：")
-    print("🖱️  鼠标拖动 - 瞄准和发射")
-    print("🎯 R 键 - 重置当前小鸟")
-    print("📊 T 键 - 显示/隐藏轨迹预测")
-    print("➡️  N 键 - 进入下一关")
-    print("🐑 目标 - 消灭所有可爱小羊！")
-    print("=" * 40)
+    parser = argparse.ArgumentParser(description="愤怒的小鸟 - 西瓜乐园")
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help="只刷新画面中变化的区域（适合低功耗显示设备）")
+    parser.add_argument('--sim-rate', type=_int_in_range(1, MAX_COUNT), default=SIM_RATE,
+                        help="每秒物理帧数（与渲染帧率无关）")
+    parser.add_argument('--generate', type=_int_in_range(0, MAX_LEVEL_SEED), metavar='SEED', default=None,
+                        help="用随机种子生成关卡来玩（代替内置关卡）")
+    parser.add_argument('--groups', type=_int_in_range(1, MAX_COUNT), default=10,
+                        help="生成关卡的组数（配合 --generate）")
+    parser.add_argument('--density', type=_positive_float, default=1.0,
+                        help="生成关卡每组金字塔的大小倍数（配合 --generate）")
+    parser.add_argument('--generate-count', type=_int_in_range(1, MAX_COUNT), default=4,
+                        help="生成的关卡数（配合 --generate）")
+    parser.add_argument('--record', metavar='PATH', default=None,
+                        help="把本局输入录制到文件")
+    parser.add_argument('--seed', type=_int_in_range(0, MAX_SEED), default=None,
+                        help="随机种子（录制时写入录像，默认随机选取）")
+    parser.add_argument('--replay', metavar='PATH', default=None,
+                        help="回放录像文件")
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help="回放倍速，0 表示不限速")
+    parser.add_argument('--headless', action='store_true',
+                        help="回放时不打开窗口（用于性能分析）")
+    parser.add_argument('--profile-csv', metavar='PATH', default=None,
+                        help="退出时把逐帧各阶段耗时导出为 CSV")
+    parser.add_argument('--quiet', action='store_true',
+                        help="不输出启动信息和操作说明")
+    parser.add_argument('--export-frames', metavar='NAME', nargs='?', const='', default=None,
+                        help="把每帧画面发布到名为 NAME 的共享内存环形缓冲区（省略 NAME 时自动命名）")
+    args = parser.parse_args()
+    if args.headless and not args.replay:
+        parser.error("--headless 只能与 --replay 一起使用")
+    if args.headless:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    
+    levels = None
+    if args.generate is not None:
+        levels = GeneratedLevels(args.generate, args.groups, args.density, args.generate_count)
+    
+    if not args.quiet:
+        print("🎮 愤怒的小鸟 🎮")
+        print("=" * 40)
+        print("游戏控制说明：")
+        print("🖱️  鼠标拖动 - 瞄准和发射")
+        print("🎯 R 键 - 重置当前小鸟")
+        print("📊 T 键 - 显示/隐藏轨迹预测")
+        print("➡️  N 键 - 进入下一关")
+        print("🐑 目标 - 消灭所有可爱小羊！")
+        print("=" * 40)
     
+    game = None
     try:
-        game = Game()
+        if args.replay:
+            game = Game(render_mode='dirty' if args.dirty_rects else 'flip', replay=Replay.load(args.replay),
+                        profile_csv=args.profile_csv, quiet=args.quiet, frame_export=args.export_frames)
+            game.run_replay(args.replay_speed)
+            return
+        game = Game(render_mode='dirty' if args.dirty_rects else 'flip', sim_rate=args.sim_rate,
+                    levels=levels, seed=args.seed, record_path=args.record, profile_csv=args.profile_csv,
+                    quiet=args.quiet, frame_export=args.export_frames)
         game.run()
     except Exception as e:
         print(f"游戏运行出错: {e}")
+        if game is not None:
+            game.close_frame_export()
         pygame.quit()
         sys.exit(1)
 
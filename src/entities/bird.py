@@ -5,14 +5,25 @@
 import pygame
 import math
 import random
-from src.entities.particle import Particle
+from src.entities.particle import particle_pool
+from src.utils.physics import sweep_circle
 from src.utils.constants import *
 
 class Bird:
     """小鸟类"""
+    __slots__ = ('x', 'y', 'prev_x', 'prev_y', 'radius', 'color', 'velocity_x', 'velocity_y',
+                 'launched', 'dragging', 'start_x', 'start_y', 'active')
+    
+    # 精灵缓存：每种颜色、每个旋转档位只渲染一次
+    _sprite_cache = {}
+    SPRITE_HALF = 27  # 嘴尖离中心约 25 像素
+    ROTATION_STEPS = 36  # 飞行方向按 10° 一档量化
+    
     def __init__(self, x, y):
         self.x = x
         self.y = y
+        self.prev_x = x  # 上一帧位置，用于扫掠包围盒
+        self.prev_y = y
         self.radius = BIRD_RADIUS
         self.color = RED
         self.velocity_x = 0
@@ -21,54 +32,106 @@ class Bird:
         self.dragging = False
         self.start_x = x
         self.start_y = y
-        self.trail_particles = []
         self.active = True  # 新增：标记小鸟是否活跃
         
-    def draw(self, screen):
-        """绘制精美的小鸟"""
+    def draw(self, screen, alpha=1.0):
+        """绘制精美的小鸟（alpha 为两个物理帧之间的插值比例），飞行中朝向速度方向"""
         if not self.active:
             return
-            
+        
+        x, y = self.render_position(alpha)
+        sprite = self.get_sprite(self.color, self.rotation_step())
+        screen.blit(sprite, (int(x) - self.SPRITE_HALF, int(y) - self.SPRITE_HALF))
+    
+    def rotation_step(self):
+        """飞行方向量化后的档位（0 为朝右，逆时针递增）；没发射时朝右"""
+        if not self.launched or (self.velocity_x == 0 and self.velocity_y == 0):
+            return 0
+        angle = math.atan2(-self.velocity_y, self.velocity_x)  # 屏幕 y 轴朝下
+        return round(angle * self.ROTATION_STEPS / (2 * math.pi)) % self.ROTATION_STEPS
+    
+    @classmethod
+    def get_sprite(cls, color, step=0):
+        """获取（必要时渲染）某种颜色、某个旋转档位的精灵"""
+        key = (color, step)
+        sprite = cls._sprite_cache.get(key)
+        if sprite is None:
+            if step == 0:
+                sprite = cls._render_sprite(color)
+            else:
+                sprite = cls._rotate(cls.get_sprite(color), step)
+            cls._sprite_cache[key] = sprite
+        return sprite
+    
+    @classmethod
+    def _render_sprite(cls, color):
+        """把朝右的小鸟渲染到透明精灵上"""
+        size = cls.SPRITE_HALF * 2
+        sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+        x = y = cls.SPRITE_HALF
+        
         # 主体
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
+        pygame.draw.circle(sprite, color, (x, y), BIRD_RADIUS)
         
         # 高光
-        pygame.draw.circle(screen, (255, 150, 150), (int(self.x - 5), int(self.y - 5)), 8)
+        pygame.draw.circle(sprite, (255, 150, 150), (x - 5, y - 5), 8)
         
         # 眼睛
-        pygame.draw.circle(screen, WHITE, (int(self.x + 8), int(self.y - 5)), 7)
-        pygame.draw.circle(screen, BLACK, (int(self.x + 8), int(self.y - 5)), 3)
+        pygame.draw.circle(sprite, WHITE, (x + 8, y - 5), 7)
+        pygame.draw.circle(sprite, BLACK, (x + 8, y - 5), 3)
         
         # 眉毛
-        pygame.draw.arc(screen, BLACK, (self.x + 5, self.y - 12, 10, 8), math.pi, 2 * math.pi, 2)
+        pygame.draw.arc(sprite, BLACK, (x + 5, y - 12, 10, 8), math.pi, 2 * math.pi, 2)
         
         # 嘴巴
-        pygame.draw.polygon(screen, ORANGE, [
-            (self.x + 15, self.y),
-            (self.x + 25, self.y - 4),
-            (self.x + 25, self.y + 4)
+        pygame.draw.polygon(sprite, ORANGE, [
+            (x + 15, y),
+            (x + 25, y - 4),
+            (x + 25, y + 4)
         ])
+        return sprite
+    
+    @classmethod
+    def _rotate(cls, sprite, step):
+        """把精灵逆时针旋转 step 档，再裁回原尺寸（中心不变，小鸟在中心 SPRITE_HALF 范围内，不会被裁掉）"""
+        rotated = pygame.transform.rotozoom(sprite, step * 360 / cls.ROTATION_STEPS, 1)
+        frame = pygame.Surface(sprite.get_size(), pygame.SRCALPHA)
+        frame.blit(rotated, rotated.get_rect(center=frame.get_rect().center))
+        return frame
+    
+    def render_position(self, alpha=1.0):
+        """渲染位置：飞行中在上一物理帧和当前物理帧之间插值"""
+        if not self.launched:
+            return self.x, self.y
+        return (self.prev_x + (self.x - self.prev_x) * alpha,
+                self.prev_y + (self.y - self.prev_y) * alpha)
+    
+    def get_rect(self, alpha=1.0):
+        """精灵绘制区域（任意朝向都在其中）"""
+        x, y = self.render_position(alpha)
+        size = self.SPRITE_HALF * 2
+        return pygame.Rect(int(x) - self.SPRITE_HALF, int(y) - self.SPRITE_HALF, size, size)
+    
+    def update(self, gravity=GRAVITY, dt=1.0, trail=True):
+        """
+        更新小鸟位置（dt 为以物理帧为单位的步长，无头批量模拟时可以取大于 1 的粗步长）
         
-        # 绘制尾迹粒子
-        for particle in self.trail_particles[:]:
-            particle.update()
-            particle.draw(screen)
-            if particle.life <= 0:
-                self.trail_particles.remove(particle)
-    
-    def update(self, gravity=GRAVITY):
-        """更新小鸟位置"""
+        trail 为 False 时不发射尾迹粒子（无头模拟不需要）。
+        """
         if not self.active:
             return
             
+        self.prev_x = self.x
+        self.prev_y = self.y
+        
         if self.launched:
-            self.velocity_y += gravity
-            self.x += self.velocity_x
-            self.y += self.velocity_y
+            self.velocity_y += gravity * dt
+            self.x += self.velocity_x * dt
+            self.y += self.velocity_y * dt
             
-            # 添加尾迹粒子
-            if random.random() < 0.3:
-                self.trail_particles.append(Particle(self.x, self.y, YELLOW))
+            # 添加尾迹粒子（每个基准物理帧 30% 的概率）
+            if trail and random.random() < 0.3 * dt:
+                particle_pool.emit(self.x, self.y, YELLOW)
             
             # 边界检测 - 飞出屏幕后标记为非活跃
             if self.x < -50 or self.x > SCREEN_WIDTH + 50 or self.y > SCREEN_HEIGHT + 50:
@@ -78,11 +141,12 @@ class Bird:
         """重置小鸟位置"""
         self.x = self.start_x
         self.y = self.start_y
+        self.prev_x = self.start_x
+        self.prev_y = self.start_y
         self.velocity_x = 0
         self.velocity_y = 0
         self.launched = False
         self.dragging = False
-        self.trail_particles = []
         self.active = True
     
     def launch(self, power_x, power_y):
@@ -95,6 +159,79 @@ class Bird:
         """检测与小羊的碰撞"""
         if not self.active or not self.launched:
             return False
-            
-        distance = math.sqrt((self.x - sheep.x) ** 2 + (self.y - sheep.y) ** 2)
-        return distance < self.radius + sheep.radius + 5
\ No newline at end of file
+        
+        dx = self.x - sheep.x
+        dy = self.y - sheep.y
+        reach = self.radius + sheep.radius + 5
+        return dx * dx + dy * dy < reach * reach
+    
+    def sweep_collision(self, sheep):
+        """
+        上一帧位置到当前位置的扫掠碰撞检测（快速飞行时不会穿过小羊）
+        
+        返回 (toi, nx, ny)，toi 为这一帧的线段上碰到小羊的比例，(nx, ny) 为接触法线；没碰到时返回 None。
+        """
+        if not self.active or not self.launched:
+            return None
+        return sweep_circle(self.prev_x, self.prev_y, self.x, self.y, sheep.x, sheep.y,
+                            self.radius + sheep.radius + 5)
+    
+    def swept_bounds(self, margin=0):
+        """上一帧到当前帧扫过区域的包围盒 (left, top, right, bottom)"""
+        extent = self.radius + margin
+        return (min(self.prev_x, self.x) - extent, min(self.prev_y, self.y) - extent,
+                max(self.prev_x, self.x) + extent, max(self.prev_y, self.y) + extent)
+
+
+class BirdQueue:
+    """小鸟队列：按需创建小鸟，只保留当前小鸟和仍在飞行的小鸟"""
+    def __init__(self, total, colors, x, y):
+        self.total = total
+        self.colors = colors
+        self.x = x
+        self.y = y
+        self.index = 0
+        self.in_flight = []  # 已经发射、仍在飞行的小鸟（包括已发射的当前小鸟，按发射顺序）
+        self.current = self._make_bird(0) if total > 0 else None
+    
+    def _make_bird(self, index):
+        """创建第 index 只小鸟"""
+        bird = Bird(self.x, self.y)
+        bird.color = self.colors[index % len(self.colors)]  # 分配不同颜色
+        return bird
+    
+    def remaining(self):
+        """剩余小鸟数量（包括当前小鸟）"""
+        return self.total - self.index
+    
+    def launch(self, power_x, power_y):
+        """发射当前小鸟并记入飞行中的小鸟"""
+        self.current.launch(power_x, power_y)
+        self.in_flight.append(self.current)
+    
+    def reset_current(self):
+        """把当前小鸟放回弹弓（已发射的从飞行中的小鸟里移除）"""
+        if self.current.launched and self.current in self.in_flight:
+            self.in_flight.remove(self.current)
+        self.current.reset()
+    
+    def advance(self):
+        """切换到下一只小鸟（仍在飞行的当前小鸟留在 in_flight 中），没有小鸟时返回 False"""
+        if self.current is None:
+            return False
+        self.index += 1
+        if self.index >= self.total:
+            self.current = None
+            return False
+        self.current = self._make_bird(self.index)
+        return True
+    
+    def active_birds(self):
+        """当前需要更新和绘制的小鸟"""
+        if self.in_flight:
+            self.in_flight = [bird for bird in self.in_flight if bird.active]
+        current = self.current
+        # 已发射且仍在飞行的当前小鸟是 in_flight 的最后一只；其余情况（在弹弓上、刚飞出屏幕）单独加在最后
+        if current is not None and not (self.in_flight and self.in_flight[-1] is current):
+            return self.in_flight + [current]
+        return self.in_flight
@@ -3,30 +3,121 @@
 """
 
 import pygame
-import random
+import numpy as np
 
-class Particle:
-    """粒子特效类"""
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.size = random.randint(2, 6)
-        self.speed_x = random.uniform(-3, 3)
-        self.speed_y = random.uniform(-3, 3)
-        self.life = 30
+class ParticlePool:
+    """固定容量的粒子池：结构化数组存储，向量化更新，交换删除回收"""
+    ALPHA_BUCKET = 16
+    
+    def __init__(self, capacity=4096, seed=None):
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.speed_x = np.zeros(capacity, dtype=np.float32)
+        self.speed_y = np.zeros(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)  # 剩余寿命（基准物理帧）
+        self.color = np.zeros(capacity, dtype=np.uint16)
         
-    def update(self):
-        """更新粒子状态"""
-        self.x += self.speed_x
-        self.y += self.speed_y
-        self.life -= 1
-        self.size *= 0.95
+        # 颜色表：粒子只保存颜色索引
+        self.palette = []
+        self._palette_index = {}
         
-    def draw(self, screen):
-        """绘制粒子"""
-        alpha = min(255, self.life * 8)
-        color_with_alpha = (*self.color, alpha)
-        surf = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
-        pygame.draw.circle(surf, color_with_alpha, (self.size, self.size), self.size)
-        screen.blit(surf, (int(self.x - self.size), int(self.y - self.size)))
\ No newline at end of file
+        # 预渲染的半透明圆点，键为 (尺寸, 颜色索引, 透明度档位)
+        self._disc_cache = {}
+        self.rng = np.random.default_rng(seed)
+    
+    def seed(self, seed):
+        """重置随机数种子"""
+        self.rng = np.random.default_rng(seed)
+    
+    def clear(self):
+        """清空所有粒子"""
+        self.count = 0
+    
+    def _color_id(self, color):
+        """获取颜色在颜色表中的索引"""
+        index = self._palette_index.get(color)
+        if index is None:
+            index = len(self.palette)
+            self.palette.append(color)
+            self._palette_index[color] = index
+        return index
+    
+    def emit(self, x, y, colors, n=1, spread_x=0, spread_y=0):
+        """发射 n 个粒子；colors 可以是单个颜色或颜色列表（逐个随机选择）"""
+        n = min(n, self.capacity - self.count)
+        if n <= 0:
+            return
+        start, end = self.count, self.count + n
+        rng = self.rng
+        
+        self.x[start:end] = x + (rng.integers(0, spread_x + 1, n) if spread_x else 0)
+        self.y[start:end] = y + (rng.integers(0, spread_y + 1, n) if spread_y else 0)
+        self.speed_x[start:end] = rng.uniform(-3, 3, n)
+        self.speed_y[start:end] = rng.uniform(-3, 3, n)
+        self.size[start:end] = rng.integers(2, 7, n)
+        self.life[start:end] = 30
+        
+        if isinstance(colors, list):
+            ids = np.array([self._color_id(color) for color in colors], dtype=np.uint16)
+            self.color[start:end] = ids[rng.integers(0, len(ids), n)]
+        else:
+            self.color[start:end] = self._color_id(colors)
+        self.count = end
+    
+    def update(self, dt=1.0):
+        """向量化更新所有粒子，并回收寿命耗尽的粒子（dt 为以基准物理帧为单位的步长）"""
+        n = self.count
+        if n == 0:
+            return
+        self.x[:n] += self.speed_x[:n] * dt
+        self.y[:n] += self.speed_y[:n] * dt
+        self.life[:n] -= dt
+        self.size[:n] *= 0.95 ** dt
+        
+        # 交换删除：用尾部存活的粒子填补前面的空位
+        alive = self.life[:n] > 0
+        remaining = int(np.count_nonzero(alive))
+        if remaining == n:
+            return
+        holes = np.flatnonzero(~alive[:remaining])
+        movers = np.flatnonzero(alive[remaining:]) + remaining
+        for column in (self.x, self.y, self.speed_x, self.speed_y,
+                       self.size, self.life, self.color):
+            column[holes] = column[movers]
+        self.count = remaining
+    
+    def _disc(self, size, color_id, bucket):
+        """获取预渲染的半透明圆点"""
+        key = (size, color_id, bucket)
+        surf = self._disc_cache.get(key)
+        if surf is None:
+            alpha = min(255, bucket * self.ALPHA_BUCKET + self.ALPHA_BUCKET // 2)
+            surf = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surf, (*self.palette[color_id], alpha), (size, size), size)
+            self._disc_cache[key] = surf
+        return surf
+    
+    def draw(self, screen, collect_rects=False):
+        """批量绘制所有粒子；collect_rects 为 True 时返回绘制区域列表"""
+        n = self.count
+        if n == 0:
+            return []
+        sizes = self.size[:n].astype(np.int32)
+        buckets = (np.minimum(255, self.life[:n] * 8) // self.ALPHA_BUCKET).astype(np.int32)
+        left = (self.x[:n] - self.size[:n]).astype(np.int32)
+        top = (self.y[:n] - self.size[:n]).astype(np.int32)
+        
+        blits = []
+        disc = self._disc
+        for size, color_id, bucket, px, py in zip(sizes.tolist(), self.color[:n].tolist(),
+                                                  buckets.tolist(), left.tolist(), top.tolist()):
+            if size > 0:
+                blits.append((disc(size, color_id, bucket), (px, py)))
+        return screen.blits(blits, collect_rects) or []
+
+
+# 全局共享的粒子池
+particle_pool = ParticlePool()
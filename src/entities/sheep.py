@@ -5,111 +5,165 @@
 import pygame
 import math
 import random
-from src.entities.particle import Particle
+from src.entities.particle import particle_pool
+from src.entities.table import TableRow
 from src.utils.constants import *
 
-class Sheep:
-    """小羊类"""
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
+class Sheep(TableRow):
+    """小羊类（x / y / alive 可以登记到实体表中批量读取）"""
+    __slots__ = ('radius', 'body_color', 'face_color', 'has_bow', 'bow_color', 'has_spot', 'spot_color')
+    
+    # 精灵缓存：每种外观组合只渲染一次
+    _sprite_cache = {}
+    SPRITE_HALF = 36
+    SPRITE_SEED = 2025
+    
+    # 装饰颜色候选（快照按下标保存外观）
+    BOW_COLORS = [RED, BLUE, PURPLE, ORANGE]
+    SPOT_COLORS = [YELLOW, PINK, LIGHT_BLUE]
+    
+    def __init__(self, x, y, table=None, rng=random):
+        super().__init__(x, y, table)
         self.radius = SHEEP_RADIUS
-        self.body_color = random.choice(SHEEP_COLORS)
+        self.body_color = rng.choice(SHEEP_COLORS)
         self.face_color = SHEEP_WHITE
-        self.alive = True
-        self.hit_particles = []
-        self.has_bow = random.choice([True, False])
-        self.bow_color = random.choice([RED, BLUE, PURPLE, ORANGE])
-        self.has_spot = random.choice([True, False])
-        self.spot_color = random.choice([YELLOW, PINK, LIGHT_BLUE])
+        self.has_bow = rng.choice([True, False])
+        self.bow_color = rng.choice(self.BOW_COLORS)
+        self.has_spot = rng.choice([True, False])
+        self.spot_color = rng.choice(self.SPOT_COLORS)
         
+    @classmethod
+    def from_row(cls, table, index, variant):
+        """用实体表中已有的一行和外观组合创建小羊（不消耗随机数，用于恢复快照）"""
+        sheep = cls.__new__(cls)
+        sheep._load_row(table, index)
+        sheep.radius = SHEEP_RADIUS
+        sheep.face_color = SHEEP_WHITE
+        sheep.body_color, sheep.has_bow, sheep.bow_color, sheep.has_spot, sheep.spot_color = variant
+        return sheep
+    
+    def variant(self):
+        """外观组合，作为精灵缓存的键"""
+        return (self.body_color, self.has_bow, self.bow_color, self.has_spot, self.spot_color)
+    
     def draw(self, screen):
         """绘制生动可爱的小羊"""
         if not self.alive:
             return
-            
+        
+        sprite = self.get_sprite(self.variant())
+        screen.blit(sprite, (int(self.x) - self.SPRITE_HALF, int(self.y) - self.SPRITE_HALF))
+    
+    def get_rect(self):
+        """精灵绘制区域"""
+        size = self.SPRITE_HALF * 2
+        return pygame.Rect(int(self.x) - self.SPRITE_HALF, int(self.y) - self.SPRITE_HALF, size, size)
+    
+    @classmethod
+    def get_sprite(cls, variant):
+        """获取（必要时渲染）外观组合对应的精灵"""
+        sprite = cls._sprite_cache.get(variant)
+        if sprite is None:
+            sprite = cls._render_sprite(variant)
+            cls._sprite_cache[variant] = sprite
+        return sprite
+    
+    @classmethod
+    def _render_sprite(cls, variant):
+        """用固定随机种子把小羊渲染到透明精灵上"""
+        body_color, has_bow, bow_color, has_spot, spot_color = variant
+        rng = random.Random(cls.SPRITE_SEED)
+        size = cls.SPRITE_HALF * 2
+        sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+        x = y = cls.SPRITE_HALF
+        radius = SHEEP_RADIUS
+        
         # 主体 - 毛茸茸的效果
-        pygame.draw.circle(screen, self.body_color, (int(self.x), int(self.y)), self.radius)
+        pygame.draw.circle(sprite, body_color, (int(x), int(y)), radius)
         
         # 毛茸茸的纹理
         for i in range(12):
             angle = i * math.pi / 6
-            distance = self.radius - random.randint(2, 5)
-            fluff_x = self.x + math.cos(angle) * distance
-            fluff_y = self.y + math.sin(angle) * distance
-            fluff_size = random.randint(4, 7)
-            pygame.draw.circle(screen, self.body_color, (int(fluff_x), int(fluff_y)), fluff_size)
+            distance = radius - rng.randint(2, 5)
+            fluff_x = x + math.cos(angle) * distance
+            fluff_y = y + math.sin(angle) * distance
+            fluff_size = rng.randint(4, 7)
+            pygame.draw.circle(sprite, body_color, (int(fluff_x), int(fluff_y)), fluff_size)
         
         # 斑点装饰
-        if self.has_spot:
+        if has_spot:
             for i in range(2):
-                spot_x = self.x + random.randint(-15, 15)
-                spot_y = self.y + random.randint(-10, 10)
-                pygame.draw.circle(screen, self.spot_color, (int(spot_x), int(spot_y)), 8)
+                spot_x = x + rng.randint(-15, 15)
+                spot_y = y + rng.randint(-10, 10)
+                pygame.draw.circle(sprite, spot_color, (int(spot_x), int(spot_y)), 8)
         
         # 脸部
-        face_radius = self.radius * 0.6
-        pygame.draw.circle(screen, self.face_color, (int(self.x), int(self.y)), int(face_radius))
+        face_radius = radius * 0.6
+        pygame.draw.circle(sprite, SHEEP_WHITE, (int(x), int(y)), int(face_radius))
         
         # 眼睛
-        eye_y = self.y - 3
-        left_eye_x = self.x - 8
-        right_eye_x = self.x + 8
+        eye_y = y - 3
+        left_eye_x = x - 8
+        right_eye_x = x + 8
         
-        pygame.draw.circle(screen, WHITE, (int(left_eye_x), int(eye_y)), 6)
-        pygame.draw.circle(screen, WHITE, (int(right_eye_x), int(eye_y)), 6)
-        pygame.draw.circle(screen, BLUE, (int(left_eye_x), int(eye_y)), 4)
-        pygame.draw.circle(screen, BLUE, (int(right_eye_x), int(eye_y)), 4)
-        pygame.draw.circle(screen, BLACK, (int(left_eye_x), int(eye_y)), 2)
-        pygame.draw.circle(screen, BLACK, (int(right_eye_x), int(eye_y)), 2)
-        pygame.draw.circle(screen, WHITE, (int(left_eye_x - 1), int(eye_y - 1)), 1)
-        pygame.draw.circle(screen, WHITE, (int(right_eye_x - 1), int(eye_y - 1)), 1)
+        pygame.draw.circle(sprite, WHITE, (int(left_eye_x), int(eye_y)), 6)
+        pygame.draw.circle(sprite, WHITE, (int(right_eye_x), int(eye_y)), 6)
+        pygame.draw.circle(sprite, BLUE, (int(left_eye_x), int(eye_y)), 4)
+        pygame.draw.circle(sprite, BLUE, (int(right_eye_x), int(eye_y)), 4)
+        pygame.draw.circle(sprite, BLACK, (int(left_eye_x), int(eye_y)), 2)
+        pygame.draw.circle(sprite, BLACK, (int(right_eye_x), int(eye_y)), 2)
+        pygame.draw.circle(sprite, WHITE, (int(left_eye_x - 1), int(eye_y - 1)), 1)
+        pygame.draw.circle(sprite, WHITE, (int(right_eye_x - 1), int(eye_y - 1)), 1)
         
         # 睫毛
-        pygame.draw.line(screen, BLACK, (left_eye_x - 6, eye_y - 4), (left_eye_x - 8, eye_y - 6), 2)
-        pygame.draw.line(screen, BLACK, (left_eye_x - 6, eye_y - 2), (left_eye_x - 8, eye_y - 2), 2)
-        pygame.draw.line(screen, BLACK, (right_eye_x + 6, eye_y - 4), (right_eye_x + 8, eye_y - 6), 2)
-        pygame.draw.line(screen, BLACK, (right_eye_x + 6, eye_y - 2), (right_eye_x + 8, eye_y - 2), 2)
+        pygame.draw.line(sprite, BLACK, (left_eye_x - 6, eye_y - 4), (left_eye_x - 8, eye_y - 6), 2)
+        pygame.draw.line(sprite, BLACK, (left_eye_x - 6, eye_y - 2), (left_eye_x - 8, eye_y - 2), 2)
+        pygame.draw.line(sprite, BLACK, (right_eye_x + 6, eye_y - 4), (right_eye_x + 8, eye_y - 6), 2)
+        pygame.draw.line(sprite, BLACK, (right_eye_x + 6, eye_y - 2), (right_eye_x + 8, eye_y - 2), 2)
         
         # 嘴巴
-        mouth_y = self.y + 5
-        pygame.draw.arc(screen, PINK, (self.x - 6, mouth_y - 2, 12, 8), 0.2, math.pi - 0.2, 2)
+        mouth_y = y + 5
+        pygame.draw.arc(sprite, PINK, (x - 6, mouth_y - 2, 12, 8), 0.2, math.pi - 0.2, 2)
         
         # 腮红
-        blush_y = self.y + 2
-        pygame.draw.circle(screen, (255, 200, 200), (int(self.x - 10), int(blush_y)), 4)
-        pygame.draw.circle(screen, (255, 200, 200), (int(self.x + 10), int(blush_y)), 4)
+        blush_y = y + 2
+        pygame.draw.circle(sprite, (255, 200, 200), (int(x - 10), int(blush_y)), 4)
+        pygame.draw.circle(sprite, (255, 200, 200), (int(x + 10), int(blush_y)), 4)
         
         # 耳朵
-        ear_color = (min(255, self.body_color[0] + 30), 
-                    min(255, self.body_color[1] + 30), 
-                    min(255, self.body_color[2] + 30))
+        ear_color = (min(255, body_color[0] + 30), 
+                    min(255, body_color[1] + 30), 
+                    min(255, body_color[2] + 30))
         
-        pygame.draw.ellipse(screen, ear_color, (self.x - 22, self.y - 20, 10, 14))
-        pygame.draw.ellipse(screen, (255, 220, 220), (self.x - 20, self.y - 18, 6, 8))
-        pygame.draw.ellipse(screen, ear_color, (self.x + 12, self.y - 20, 10, 14))
-        pygame.draw.ellipse(screen, (255, 220, 220), (self.x + 14, self.y - 18, 6, 8))
+        pygame.draw.ellipse(sprite, ear_color, (x - 22, y - 20, 10, 14))
+        pygame.draw.ellipse(sprite, (255, 220, 220), (x - 20, y - 18, 6, 8))
+        pygame.draw.ellipse(sprite, ear_color, (x + 12, y - 20, 10, 14))
+        pygame.draw.ellipse(sprite, (255, 220, 220), (x + 14, y - 18, 6, 8))
         
         # 蝴蝶结装饰
-        if self.has_bow:
-            bow_x = self.x
-            bow_y = self.y - self.radius - 5
-            pygame.draw.circle(screen, self.bow_color, (int(bow_x), int(bow_y)), 5)
-            pygame.draw.ellipse(screen, self.bow_color, (bow_x - 8, bow_y - 4, 6, 8))
-            pygame.draw.ellipse(screen, self.bow_color, (bow_x + 2, bow_y - 4, 6, 8))
-            pygame.draw.rect(screen, self.bow_color, (bow_x - 2, bow_y + 3, 4, 8))
+        if has_bow:
+            bow_x = x
+            bow_y = y - radius - 5
+            pygame.draw.circle(sprite, bow_color, (int(bow_x), int(bow_y)), 5)
+            pygame.draw.ellipse(sprite, bow_color, (bow_x - 8, bow_y - 4, 6, 8))
+            pygame.draw.ellipse(sprite, bow_color, (bow_x + 2, bow_y - 4, 6, 8))
+            pygame.draw.rect(sprite, bow_color, (bow_x - 2, bow_y + 3, 4, 8))
         
-        # 绘制击中特效
-        for particle in self.hit_particles[:]:
-            particle.update()
-            particle.draw(screen)
-            if particle.life <= 0:
-                self.hit_particles.remove(particle)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+        return sprite
+    
+    def bounds(self):
+        """碰撞包围盒 (left, top, right, bottom)"""
+        return (self.x - self.radius, self.y - self.radius,
+                self.x + self.radius, self.y + self.radius)
     
     def hit(self):
         """小羊被击中"""
         self.alive = False
-        for _ in range(25):
-            color = random.choice([self.body_color, self.spot_color if self.has_spot else self.body_color, 
-                                 WHITE, YELLOW, PINK])
-            self.hit_particles.append(Particle(self.x, self.y, color))
\ No newline at end of file
+    
+    def burst(self):
+        """被击中时的粒子特效"""
+        colors = [self.body_color, self.spot_color if self.has_spot else self.body_color,
+                  WHITE, YELLOW, PINK]
+        particle_pool.emit(self.x, self.y, colors, 25)
\ No newline at end of file
@@ -12,6 +12,10 @@ class Slingshot:
         self.x = x
         self.y = y
         
+    def get_rect(self):
+        """弹弓支架的绘制区域"""
+        return pygame.Rect(self.x - 28, self.y - 60, 36, 70)
+    
     def draw(self, screen, bird):
         """绘制弹弓"""
         # 弹弓支架
@@ -0,0 +1,80 @@
+"""
+实体表：需要批量读取时，把同类实体的位置和存活标记按列放进紧凑数组
+
+Sheep、Watermelon 的 x / y / alive 是普通的 __slots__ 属性，碰撞检测、绘制等热路径直接读写它们。
+模拟核心建关时把整关实体登记到一张共享表，批量评估、快照、观测等代码调用 columns() / sync()
+时才把各行的当前值写进列，之后就可以直接把整列当作 numpy 数组使用，而不必逐个读取对象属性。
+
+表里没有速度列：小羊和西瓜不会移动，会移动的只有小鸟，每关最多几只，
+速度留在 Bird 的 __slots__ 属性上；批量评估（batch.py）自己用数组保存成批小鸟的速度。
+"""
+
+from array import array
+
+import numpy as np
+
+
+class EntityTable:
+    """按列存放实体位置 (x, y) 和存活标记的表，rows 是登记的实体对象"""
+    __slots__ = ('rows', 'x', 'y', 'alive')
+    
+    def __init__(self):
+        self.rows = []
+        self.x = array('d')
+        self.y = array('d')
+        self.alive = array('b')
+    
+    def __len__(self):
+        return len(self.x)
+    
+    def add(self, row):
+        """登记一个实体（连同当前位置和存活状态），返回行号"""
+        self.rows.append(row)
+        self.x.append(row.x)
+        self.y.append(row.y)
+        self.alive.append(1 if row.alive else 0)
+        return len(self.x) - 1
+    
+    def sync(self):
+        """把各实体的当前属性写回列（原地改写，不改变长度，已有的 numpy 视图仍然有效）"""
+        rows = self.rows
+        if len(rows) != len(self.x):
+            raise ValueError(f"实体表有 {len(self.x)} 行，但只登记了 {len(rows)} 个实体")
+        self.x[:] = array('d', [row.x for row in rows])
+        self.y[:] = array('d', [row.y for row in rows])
+        self.alive[:] = array('b', [1 if row.alive else 0 for row in rows])
+    
+    def columns(self):
+        """
+        同步后以 numpy 数组返回 (x, y, alive) 三列
+        
+        返回的是共享内存的视图，不复制数据，但只反映调用时刻的值，实体之后的改动要再调用一次才会写进来。
+        视图存在期间数组不能再追加行，所以模拟核心每次建关都新建一张表，而不是清空旧表。
+        """
+        if not len(self):
+            return (np.zeros(0), np.zeros(0), np.zeros(0, dtype=bool))
+        self.sync()
+        return (np.frombuffer(self.x, dtype=np.float64),
+                np.frombuffer(self.y, dtype=np.float64),
+                np.frombuffer(self.alive, dtype=np.int8).view(bool))
+
+
+class TableRow:
+    """可以登记到实体表的实体：x / y / alive 是普通属性，_index 是它在表中的行号"""
+    __slots__ = ('x', 'y', 'alive', '_table', '_index')
+    
+    def __init__(self, x, y, table=None):
+        self.x = x
+        self.y = y
+        self.alive = True
+        self._table = table
+        self._index = -1 if table is None else table.add(self)
+    
+    def _load_row(self, table, index):
+        """从表中已有的一行读出属性并登记为该行的实体（用于恢复快照）"""
+        self.x = table.x[index]
+        self.y = table.y[index]
+        self.alive = table.alive[index] != 0
+        self._table = table
+        self._index = index
+        table.rows.append(self)
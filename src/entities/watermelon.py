@@ -5,100 +5,138 @@
 import pygame
 import math
 import random
-from src.entities.particle import Particle
+from src.entities.particle import particle_pool
+from src.entities.table import TableRow
+from src.utils.physics import sweep_box
 from src.utils.constants import *
 
-class Watermelon:
-    """西瓜类"""
-    def __init__(self, x, y, size=1.0):
-        self.x = x
-        self.y = y
+class Watermelon(TableRow):
+    """西瓜类（x / y 可以登记到实体表中批量读取）"""
+    __slots__ = ('width', 'height', 'size', 'is_cut')
+    
+    # 精灵缓存：整个/切开两种状态各渲染一次
+    _sprite_cache = {}
+    SPRITE_MARGIN = 3  # 条纹线宽超出主体的部分
+    SPRITE_TOP = 16  # 藤和叶子高出主体的部分
+    
+    def __init__(self, x, y, size=1.0, table=None, rng=random):
+        super().__init__(x, y, table)
         self.width = 60
         self.height = 60
         self.size = size
-        self.crack_particles = []
-        self.is_cut = random.choice([True, False])
+        self.is_cut = rng.choice([True, False])
         
+    @classmethod
+    def from_row(cls, table, index, is_cut, size=1.0):
+        """用实体表中已有的一行创建西瓜（不消耗随机数，用于恢复快照）"""
+        watermelon = cls.__new__(cls)
+        watermelon._load_row(table, index)
+        watermelon.width = 60
+        watermelon.height = 60
+        watermelon.size = size
+        watermelon.is_cut = is_cut
+        return watermelon
+    
     def draw(self, screen):
         """绘制生动的西瓜"""
-        if self.is_cut:
-            self._draw_cut_watermelon(screen)
-        else:
-            self._draw_whole_watermelon(screen)
-        
-        # 绘制裂纹特效
-        for particle in self.crack_particles[:]:
-            particle.update()
-            particle.draw(screen)
-            if particle.life <= 0:
-                self.crack_particles.remove(particle)
+        sprite = self.get_sprite(self.is_cut, self.width, self.height)
+        screen.blit(sprite, (int(self.x) - self.SPRITE_MARGIN, int(self.y) - self.SPRITE_TOP))
+    
+    def get_rect(self):
+        """精灵绘制区域（包括藤和叶子）"""
+        return pygame.Rect(int(self.x) - self.SPRITE_MARGIN, int(self.y) - self.SPRITE_TOP,
+                           self.width + self.SPRITE_MARGIN * 2, self.height + self.SPRITE_TOP + self.SPRITE_MARGIN)
     
-    def _draw_whole_watermelon(self, screen):
-        """绘制整个西瓜"""
+    @classmethod
+    def get_sprite(cls, is_cut, width, height):
+        """获取（必要时渲染）整个/切开西瓜的精灵"""
+        key = (is_cut, width, height)
+        sprite = cls._sprite_cache.get(key)
+        if sprite is None:
+            sprite = pygame.Surface((width + cls.SPRITE_MARGIN * 2, height + cls.SPRITE_TOP + cls.SPRITE_MARGIN),
+                                    pygame.SRCALPHA)
+            draw = cls._draw_cut_watermelon if is_cut else cls._draw_whole_watermelon
+            draw(sprite, cls.SPRITE_MARGIN, cls.SPRITE_TOP, width, height)
+            cls._sprite_cache[key] = sprite
+        return sprite
+    
+    @staticmethod
+    def _draw_whole_watermelon(surface, x, y, width, height):
+        """绘制整个西瓜（左上角在 x, y）"""
         # 西瓜主体
-        pygame.draw.ellipse(screen, WATERMELON_GREEN, (self.x, self.y, self.width, self.height))
+        pygame.draw.ellipse(surface, WATERMELON_GREEN, (x, y, width, height))
         
         # 西瓜条纹
         stripe_width = 4
         for i in range(5):
-            stripe_y = self.y + i * (self.height // 4)
-            pygame.draw.line(screen, WATERMELON_DARK_GREEN, 
-                           (self.x, stripe_y), 
-                           (self.x + self.width, stripe_y), stripe_width)
+            stripe_y = y + i * (height // 4)
+            pygame.draw.line(surface, WATERMELON_DARK_GREEN, 
+                           (x, stripe_y), 
+                           (x + width, stripe_y), stripe_width)
         
         # 西瓜藤
-        pygame.draw.line(screen, (139, 69, 19), 
-                       (self.x + self.width // 2, self.y - 10),
-                       (self.x + self.width // 2, self.y), 3)
+        pygame.draw.line(surface, (139, 69, 19), 
+                       (x + width // 2, y - 10),
+                       (x + width // 2, y), 3)
         
         # 西瓜叶
         leaf_points = [
-            (self.x + self.width // 2, self.y - 10),
-            (self.x + self.width // 2 - 8, self.y - 15),
-            (self.x + self.width // 2 + 8, self.y - 15)
+            (x + width // 2, y - 10),
+            (x + width // 2 - 8, y - 15),
+            (x + width // 2 + 8, y - 15)
         ]
-        pygame.draw.polygon(screen, (34, 139, 34), leaf_points)
+        pygame.draw.polygon(surface, (34, 139, 34), leaf_points)
     
-    def _draw_cut_watermelon(self, screen):
-        """绘制切开的西瓜"""
+    @staticmethod
+    def _draw_cut_watermelon(surface, x, y, width, height):
+        """绘制切开的西瓜（左上角在 x, y）"""
         # 西瓜果肉
-        pygame.draw.ellipse(screen, WATERMELON_RED, (self.x, self.y, self.width, self.height // 2))
+        pygame.draw.ellipse(surface, WATERMELON_RED, (x, y, width, height // 2))
         
         # 西瓜皮
-        pygame.draw.arc(screen, WATERMELON_GREEN, 
-                      (self.x, self.y, self.width, self.height), 
+        pygame.draw.arc(surface, WATERMELON_GREEN, 
+                      (x, y, width, height), 
                       math.pi, 2 * math.pi, 8)
         
         # 西瓜籽
         seed_positions = [
-            (self.x + 15, self.y + 15),
-            (self.x + 45, self.y + 20),
-            (self.x + 25, self.y + 25),
-            (self.x + 35, self.y + 10)
+            (x + 15, y + 15),
+            (x + 45, y + 20),
+            (x + 25, y + 25),
+            (x + 35, y + 10)
         ]
         for seed_x, seed_y in seed_positions:
-            pygame.draw.ellipse(screen, BLACK, (seed_x, seed_y, 4, 6))
+            pygame.draw.ellipse(surface, BLACK, (seed_x, seed_y, 4, 6))
         
         # 果肉纹理
         for i in range(3):
-            y_pos = self.y + 5 + i * 8
-            pygame.draw.arc(screen, WATERMELON_PINK, 
-                          (self.x + 5, y_pos, self.width - 10, 10),
+            y_pos = y + 5 + i * 8
+            pygame.draw.arc(surface, WATERMELON_PINK, 
+                          (x + 5, y_pos, width - 10, 10),
                           0, math.pi, 1)
     
     def crack(self):
         """西瓜破裂特效"""
-        for _ in range(15):
-            color = random.choice([WATERMELON_RED, WATERMELON_GREEN, WATERMELON_PINK])
-            self.crack_particles.append(Particle(
-                self.x + random.randint(0, self.width),
-                self.y + random.randint(0, self.height),
-                color
-            ))
+        particle_pool.emit(self.x, self.y, [WATERMELON_RED, WATERMELON_GREEN, WATERMELON_PINK], 15,
+                           spread_x=self.width, spread_y=self.height)
+    
+    def bounds(self):
+        """碰撞包围盒 (left, top, right, bottom)"""
+        return (self.x, self.y, self.x + self.width, self.y + self.height)
     
     def check_collision(self, bird):
         """检测与小鸟的碰撞"""
         if (bird.x + bird.radius > self.x and bird.x - bird.radius < self.x + self.width and
             bird.y + bird.radius > self.y and bird.y - bird.radius < self.y + self.height):
             return True
-        return False
\ No newline at end of file
+        return False
+    
+    def sweep_collision(self, bird):
+        """
+        小鸟上一帧位置到当前位置的扫掠碰撞检测（与 check_collision 相同的包围盒规则）
+        
+        返回 (toi, nx, ny)，(nx, ny) 为小鸟碰到的那条边的外法线；没碰到时返回 None。
+        """
+        radius = bird.radius
+        return sweep_box(bird.prev_x, bird.prev_y, bird.x, bird.y, self.x - radius, self.y - radius,
+                         self.x + self.width + radius, self.y + self.height + radius)
\ No newline at end of file
@@ -9,51 +9,93 @@ from src.utils.constants import *
 
 class Background:
     """背景类"""
-    def __init__(self):
+    def __init__(self, cached=True, rng=random):
+        self.rng = rng  # 云朵使用的随机源（random 模块或 random.Random 实例）
         self.clouds = []
         self.generate_clouds()
         
+        # 静态天空/地面层缓存（只在分辨率变化时重建）
+        self.cached = cached
+        self._static_layer = None
+        self._static_size = None
+    
     def generate_clouds(self):
         """生成随机云朵"""
         for _ in range(5):
             self.clouds.append({
-                'x': random.randint(0, SCREEN_WIDTH),
-                'y': random.randint(50, 200),
-                'speed': random.uniform(0.2, 0.5),
-                'size': random.uniform(0.8, 1.5)
+                'x': self.rng.randint(0, SCREEN_WIDTH),
+                'y': self.rng.randint(50, 200),
+                'speed': self.rng.uniform(0.2, 0.5),
+                'size': self.rng.uniform(0.8, 1.5)
             })
     
     def draw(self, screen):
         """绘制精美背景"""
+        if self.cached:
+            screen.blit(self.get_static_layer(screen), (0, 0))
+        else:
+            self._draw_static(screen)
+        
+        # 云朵在天空区域内，与地面不重叠，可以直接叠加在静态层上
+        self.draw_clouds(screen)
+    
+    def get_static_layer(self, screen):
+        """获取预渲染的天空和地面层"""
+        size = screen.get_size()
+        if self._static_layer is None or self._static_size != size:
+            self._static_layer = pygame.Surface(size, 0, screen)
+            self._draw_static(self._static_layer)
+            self._static_size = size
+        return self._static_layer
+    
+    def invalidate(self):
+        """丢弃静态层缓存，下一帧重新渲染"""
+        self._static_layer = None
+        self._static_size = None
+    
+    def _draw_static(self, surface):
+        """绘制天空渐变和地面"""
+        width, height = surface.get_size()
+        
         # 天空渐变
-        for y in range(SCREEN_HEIGHT):
-            ratio = y / SCREEN_HEIGHT
+        for y in range(height):
+            ratio = y / height
             r = int(135 + ratio * 50)
             g = int(206 - ratio * 50)
             b = int(235 - ratio * 30)
-            pygame.draw.line(screen, (r, g, b), (0, y), (SCREEN_WIDTH, y))
-        
-        # 绘制云朵
-        for cloud in self.clouds:
-            x, y, size = cloud['x'], cloud['y'], cloud['size']
-            pygame.draw.circle(screen, CLOUD_WHITE, (int(x), int(y)), int(25 * size))
-            pygame.draw.circle(screen, CLOUD_WHITE, (int(x + 20 * size), int(y - 10 * size)), int(20 * size))
-            pygame.draw.circle(screen, CLOUD_WHITE, (int(x + 40 * size), int(y)), int(25 * size))
-            pygame.draw.circle(screen, CLOUD_WHITE, (int(x + 20 * size), int(y + 10 * size)), int(18 * size))
+            pygame.draw.line(surface, (r, g, b), (0, y), (width, y))
         
         # 绘制地面
-        pygame.draw.rect(screen, GRASS_GREEN, (0, SCREEN_HEIGHT - 80, SCREEN_WIDTH, 80))
+        pygame.draw.rect(surface, GRASS_GREEN, (0, height - 80, width, 80))
         
         # 草地纹理
         for i in range(20):
             x_pos = i * 50
-            pygame.draw.arc(screen, (76, 175, 80), 
-                          (x_pos, SCREEN_HEIGHT - 90, 40, 30), 
+            pygame.draw.arc(surface, (76, 175, 80),
+                          (x_pos, height - 90, 40, 30),
                           math.pi, 2 * math.pi, 3)
     
-    def update(self):
-        """更新云朵位置"""
+    def draw_clouds(self, screen):
+        """绘制云朵"""
+        for cloud in self.clouds:
+            x, y, size = cloud['x'], cloud['y'], cloud['size']
+            pygame.draw.circle(screen, CLOUD_WHITE, (int(x), int(y)), int(25 * size))
+            pygame.draw.circle(screen, CLOUD_WHITE, (int(x + 20 * size), int(y - 10 * size)), int(20 * size))
+            pygame.draw.circle(screen, CLOUD_WHITE, (int(x + 40 * size), int(y)), int(25 * size))
+            pygame.draw.circle(screen, CLOUD_WHITE, (int(x + 20 * size), int(y + 10 * size)), int(18 * size))
+    
+    def cloud_rects(self):
+        """云朵的绘制区域"""
+        rects = []
+        for cloud in self.clouds:
+            x, y, size = cloud['x'], cloud['y'], cloud['size']
+            rects.append(pygame.Rect(int(x - 25 * size), int(y - 30 * size),
+                                     int(90 * size) + 2, int(58 * size) + 2))
+        return rects
+    
+    def update(self, dt=1.0):
+        """更新云朵位置（dt 为以基准物理帧为单位的步长）"""
         for cloud in self.clouds:
-            cloud['x'] += cloud['speed']
+            cloud['x'] += cloud['speed'] * dt
             if cloud['x'] > SCREEN_WIDTH + 100:
-                cloud['x'] = -100
\ No newline at end of file
+                cloud['x'] = -100
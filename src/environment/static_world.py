@@ -0,0 +1,80 @@
+"""
+静态世界层：天空/地面 + 西瓜 + 存活的小羊预先合成到一张表面上，每帧只需一次整屏 blit
+"""
+
+import pygame
+
+
+class StaticWorld:
+    """
+    静态世界层
+    
+    composite 是不透明的合成结果，overlay 是只有西瓜和小羊的透明层。
+    小羊被击中时只重绘它所在的区域；换关/读档时整层重建。
+    原来的绘制顺序是 天空 → 云朵 → 轨迹 → 西瓜 → 小羊：云朵和轨迹画在 composite 之上后，
+    再把 overlay 在它们的区域内贴回去，画面与逐个绘制完全一致。
+    """
+    def __init__(self, background):
+        self.background = background
+        self.composite = None
+        self.overlay = None
+        self._pending = []  # 等待局部重绘的区域
+        self.rebuilds = 0
+        self.partial_redraws = 0
+    
+    def invalidate(self, rect=None):
+        """rect 为 None 时下一帧整层重建，否则只重绘 rect 区域"""
+        if rect is None:
+            self.composite = None
+            self._pending = []
+        elif self.composite is not None:
+            self._pending.append(pygame.Rect(rect))
+    
+    def draw(self, screen, watermelons, sheeps):
+        """把静态世界和云朵画到屏幕上"""
+        if self.composite is None or self.composite.get_size() != screen.get_size():
+            self._rebuild(screen, watermelons, sheeps)
+        elif self._pending:
+            for rect in self._pending:
+                self._redraw(rect, watermelons, sheeps)
+            self._pending = []
+        
+        screen.blit(self.composite, (0, 0))
+        self.background.draw_clouds(screen)
+        for rect in self.background.cloud_rects():
+            self.restore(screen, rect)
+    
+    def restore(self, screen, rect):
+        """把西瓜和小羊重新贴到 rect 区域上（盖住其间画上去的云朵、轨迹）"""
+        screen.blit(self.overlay, rect, rect)
+    
+    def _rebuild(self, screen, watermelons, sheeps):
+        base = self.background.get_static_layer(screen)
+        self.overlay = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+        for watermelon in watermelons:
+            watermelon.draw(self.overlay)
+        for sheep in sheeps:
+            sheep.draw(self.overlay)
+        self.composite = base.copy()
+        self.composite.blit(self.overlay, (0, 0))
+        self._pending = []
+        self.rebuilds += 1
+    
+    def _redraw(self, rect, watermelons, sheeps):
+        """只重绘 rect 区域：清空 overlay 的这块，重画与之相交的实体，再合成回 composite"""
+        rect = rect.clip(self.overlay.get_rect())
+        if rect.width <= 0 or rect.height <= 0:
+            return
+        overlay = self.overlay
+        overlay.fill((0, 0, 0, 0), rect)
+        overlay.set_clip(rect)
+        for watermelon in watermelons:
+            if rect.colliderect(watermelon.get_rect()):
+                watermelon.draw(overlay)
+        for sheep in sheeps:
+            if sheep.alive and rect.colliderect(sheep.get_rect()):
+                sheep.draw(overlay)
+        overlay.set_clip(None)
+        self.composite.blit(self.background.get_static_layer(self.composite), rect, rect)
+        self.composite.blit(overlay, rect, rect)
+        self.partial_redraws += 1
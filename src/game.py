@@ -7,6 +7,8 @@ import sys
 import math
 import os
 import random
+import threading
+import time
 
 # 添加项目根目录到 Python 路径
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -14,24 +16,54 @@ parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 
 try:
-    from entities.bird import Bird
-    from entities.sheep import Sheep
-    from entities.watermelon import Watermelon
     from entities.slingshot import Slingshot
+    from entities.particle import particle_pool
+    from simulation.core import Simulation
+    from simulation.replay import (ReplayRecorder, INPUT_PRESS, INPUT_DRAG, INPUT_RELEASE, INPUT_RESET,
+                                   INPUT_TRAJECTORY, INPUT_NEXT_LEVEL, INPUT_SOUND, INPUT_SAVE, INPUT_LOAD)
+    from utils.dirty_rects import DirtyRectTracker
+    from utils.text_cache import TextCache
+    from utils.assets import AssetManifest, LazyFonts, FONT_FILE, SOUND_FILES
+    from utils.profiler import FrameProfiler
+    from utils.frame_export import FrameExporter
+    from utils.physics import trajectory_points, clamp_pull
     from environment.background import Background
+    from environment.static_world import StaticWorld
     from utils.constants import *
 except ImportError:
     # 如果直接运行 game.py，使用相对导入
-    from .entities.bird import Bird
-    from .entities.sheep import Sheep
-    from .entities.watermelon import Watermelon
     from .entities.slingshot import Slingshot
+    from .entities.particle import particle_pool
+    from .simulation.core import Simulation
+    from .simulation.replay import (ReplayRecorder, INPUT_PRESS, INPUT_DRAG, INPUT_RELEASE, INPUT_RESET,
+                                    INPUT_TRAJECTORY, INPUT_NEXT_LEVEL, INPUT_SOUND, INPUT_SAVE, INPUT_LOAD)
+    from .utils.dirty_rects import DirtyRectTracker
+    from .utils.text_cache import TextCache
+    from .utils.assets import AssetManifest, LazyFonts, FONT_FILE, SOUND_FILES
+    from .utils.profiler import FrameProfiler
+    from .utils.frame_export import FrameExporter
+    from .utils.physics import trajectory_points, clamp_pull
     from .environment.background import Background
+    from .environment.static_world import StaticWorld
     from .utils.constants import *
 
 class Game:
     """游戏主类"""
-    def __init__(self):
+    def __init__(self, render_mode='flip', sim_rate=SIM_RATE, max_catchup_steps=MAX_CATCHUP_STEPS, levels=None,
+                 seed=None, record_path=None, replay=None, profile_csv=None, quiet=False, frame_export=None):
+        self.quiet = quiet  # 不输出启动诊断信息
+        # 录像回放使用录制时的随机种子和关卡来源
+        self.replay = replay
+        if replay is not None:
+            seed, sim_rate, levels = replay.seed, replay.sim_rate, replay.levels
+        if seed is None and record_path is not None:
+            seed = random.getrandbits(32)
+        self.seed = seed
+        if seed is not None:
+            # 小羊/西瓜外观、云朵、小鸟拖尾和粒子特效都由这两个随机源决定
+            random.seed(seed)
+            particle_pool.seed(seed)
+        
         # 先初始化 pygame
         pygame.init()
         
@@ -40,162 +72,154 @@ class Game:
         pygame.display.set_caption("🎯 愤怒的小鸟 - 西瓜乐园 🐦")
         self.clock = pygame.time.Clock()
         
+        # 固定步长物理循环：物理帧率与渲染帧率解耦
+        self.sim_rate = sim_rate
+        self.sim_dt = 1.0 / sim_rate
+        self.step_dt = SIM_RATE / sim_rate  # 每个物理帧推进多少个基准物理帧，游戏速度与物理帧率无关
+        self.max_catchup_steps = max_catchup_steps
+        self.render_alpha = 1.0  # 渲染时在两个物理帧之间的插值比例
+        
+        # 渲染模式：'flip' 每帧整屏翻转，'dirty' 只提交变化区域
+        self.render_mode = render_mode
+        self.dirty_rects = None
+        if render_mode == 'dirty':
+            self.dirty_rects = DirtyRectTracker(self.screen.get_size())
+        
+        # 资源路径只解析一次
+        self.assets = AssetManifest()
+        
         # 设置窗口图标
         self._set_window_icon()
         
         # 初始化音效
+        self.sound_enabled = True
+        self._music_thread = None
         self._init_sounds()
         
         # 现在初始化字体（在 pygame.init() 之后）
         self._init_fonts()
         
-        # 创建游戏对象
-        slingshot_x = 200
-        slingshot_y = 550
-        self.background = Background()
-        self.slingshot = Slingshot(slingshot_x, slingshot_y)
-        self.sheeps = []
-        self.watermelons = []
+        # 文字和半透明面板缓存，静态界面元素只需要一次 blit
+        self.text_cache = TextCache()
+        self._surface_cache = {}
+        self._trajectory_dots = None
+        
+        # 世界状态和逐帧推进交给无显示依赖的模拟核心
+        self.sim = Simulation(levels=levels, dt=self.step_dt)
         
-        # 小鸟管理
-        self.birds = []  # 改为小鸟列表
-        self.current_bird_index = 0
-        self.bird_colors = [RED, BLUE, GREEN, PURPLE, ORANGE]  # 不同颜色的小鸟
-        self.max_birds = 500  # 每关最多500只小鸟
+        # 创建渲染对象
+        self.background = Background()
+        self.world = StaticWorld(self.background)  # 背景 + 西瓜 + 存活小羊的合成层
+        self.slingshot = Slingshot(self.sim.slingshot_x, self.sim.slingshot_y)
         
-        # 游戏状态
-        self.score = 0
-        self.level = 1
-        self.game_over = False
-        self.level_complete = False
+        # 界面状态
         self.show_trajectory = False
-        self.sound_enabled = True
         
-        # 初始化关卡
-        self.setup_level()
-    
-    def _set_window_icon(self):
-        """设置窗口图标 - 支持 ICO 和 PNG 格式"""
-        # 获取项目根目录
-        project_root = os.path.dirname(os.path.dirname(__file__))
+        # 帧性能分析（F3 显示面板，F4 导出 CSV；profile_csv 不为空时退出时自动导出）
+        self.profiler = FrameProfiler()
+        self.profile_csv = profile_csv
         
-        # 图标文件的可能路径（优先查找您放的 images 文件夹）
-        icon_paths = [
-            # 您选择的位置 - assets/images/favicon.ico
-            os.path.join(project_root, 'assets', 'images', 'favicon.ico'),
-            
-            # 其他可能的位置
-            os.path.join(project_root, 'favicon.ico'),
-            os.path.join(project_root, 'assets', 'favicon.ico'),
-            os.path.join(project_root, 'assets', 'images', 'icon.png'),
-            os.path.join(project_root, 'icon.png'),
-        ]
+        # 帧导出：每帧呈现后把画面发布到共享内存环形缓冲区（frame_export 为共享内存名，空字符串表示自动命名）
+        self.frame_exporter = None
+        if frame_export is not None:
+            self.frame_exporter = FrameExporter(self.screen, name=frame_export or None)
+            self.log(f"📤 帧导出到共享内存: {self.frame_exporter.name}")
         
-        print("🔍 正在查找图标文件...")
-        icon_loaded = False
+        # 快速存档（F5 存档，F9 读档）
+        self._quicksave = None
+        self.save_path = os.path.join(parent_dir, 'saves', 'quicksave.snap')
         
-        for icon_path in icon_paths:
-            if os.path.exists(icon_path):
-                try:
-                    # 加载图标
-                    icon = pygame.image.load(icon_path)
-                    # 设置窗口图标
-                    pygame.display.set_icon(icon)
-                    print(f"✅ 成功加载应用图标: {os.path.basename(icon_path)}")
-                    print(f"📁 图标路径: {icon_path}")
-                    icon_loaded = True
-                    break
-                except Exception as e:
-                    print(f"❌ 加载图标失败 {icon_path}: {e}")
-            else:
-                print(f"🔍 未找到: {icon_path}")
+        # 输入录像：输入按物理帧序号记录
+        self.update_count = 0
+        self._last_drag_pos = None
+        self.recorder = None
+        if record_path is not None:
+            self.recorder = ReplayRecorder(record_path, seed, sim_rate, levels)
         
-        if not icon_loaded:
-            print("⚠️ 未找到可用的图标文件，将使用默认Pygame图标")
+        # 初始化关卡
+        self.setup_level()
+    
+    def log(self, message):
+        """输出启动诊断信息（quiet 模式下不输出，错误信息不经过这里）"""
+        if not self.quiet:
+            print(message)
+    
+    def _set_window_icon(self):
+        """设置窗口图标 - 支持 ICO 和 PNG 格式（候选位置由资源清单解析）"""
+        if self.assets.icon is None:
+            self.log("⚠️ 未找到可用的图标文件，将使用默认Pygame图标")
+            return
+        try:
+            pygame.display.set_icon(pygame.image.load(self.assets.icon))
+            self.log(f"✅ 成功加载应用图标: {self.assets.icon}")
+        except Exception as e:
+            print(f"❌ 加载图标失败 {self.assets.icon}: {e}")
     
     def _init_fonts(self):
-        """初始化字体"""
-        # 确保字体模块已初始化
-        if not pygame.font.get_init():
-            pygame.font.init()
-        
-        # 字体文件路径
-        fonts_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets', 'fonts')
-        font_path = os.path.join(fonts_dir, 'wqy-microhei-lite.ttc')
-        
-        print(f"查找字体文件: {font_path}")
-        print(f"字体文件存在: {os.path.exists(font_path)}")
-        
-        # 尝试加载文泉驿微米黑字体
-        if os.path.exists(font_path):
-            try:
-                self.title_font = pygame.font.Font(font_path, 48)
-                self.ui_font = pygame.font.Font(font_path, 28)
-                self.small_font = pygame.font.Font(font_path, 20)
-                self.signature_font = pygame.font.Font(font_path, 16)
-                
-                # 测试字体是否能正常渲染中文
-                test_text = self.title_font.render("测试", True, WHITE)
-                print("✅ 成功加载文泉驿微米黑字体，中文支持正常")
-                
-            except Exception as e:
-                print(f"❌ 加载文泉驿字体失败: {e}")
-                print("使用默认字体")
-                self._load_default_fonts()
-        else:
-            print(f"❌ 字体文件未找到: {font_path}")
-            print("使用默认字体")
-            self._load_default_fonts()
+        """初始化字体（各字号在第一次绘制时才加载）"""
+        self.fonts = LazyFonts(self.assets.font)
+        if self.assets.font is None:
+            self.log(f"⚠️ 字体文件未找到: {FONT_FILE}，使用默认字体")
+    
+    @property
+    def title_font(self):
+        return self.fonts['title']
+    
+    @property
+    def ui_font(self):
+        return self.fonts['ui']
+    
+    @property
+    def small_font(self):
+        return self.fonts['small']
     
-    def _load_default_fonts(self):
-        """加载默认字体"""
-        self.title_font = pygame.font.Font(None, 48)
-        self.ui_font = pygame.font.Font(None, 28)
-        self.small_font = pygame.font.Font(None, 20)
-        self.signature_font = pygame.font.Font(None, 16)
+    @property
+    def signature_font(self):
+        return self.fonts['signature']
     
     def _init_sounds(self):
         """初始化音效"""
         self.sounds = {}
-        sounds_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets', 'sounds')
-        
-        # 音效文件列表 - 使用您提供的文件名
-        sound_files = {
-            'bg_music': 'angry_bird.mp3'  # 使用您的背景音乐文件
-        }
-        
-        # 尝试加载每个音效
-        for sound_name, filename in sound_files.items():
-            file_path = os.path.join(sounds_dir, filename)
-            if os.path.exists(file_path):
+        for sound_name, path in self.assets.sounds.items():
+            if path is None:
+                self.log(f"⚠️ 音效文件未找到: {SOUND_FILES[sound_name]}")
+                self.sounds[sound_name] = None
+            elif sound_name == 'bg_music':
+                # 背景音乐由 pygame.mixer.music 流式播放，这里只记下路径
+                self.sounds[sound_name] = path
+            else:
                 try:
-                    if sound_name == 'bg_music':
-                        # 背景音乐特殊处理
-                        self.sounds[sound_name] = file_path
-                        print(f"✅ 加载背景音乐: {filename}")
-                    else:
-                        self.sounds[sound_name] = pygame.mixer.Sound(file_path)
-                        print(f"✅ 加载音效: {filename}")
+                    self.sounds[sound_name] = pygame.mixer.Sound(path)
                 except Exception as e:
-                    print(f"❌ 加载音效失败 {filename}: {e}")
+                    print(f"❌ 加载音效失败 {path}: {e}")
                     self.sounds[sound_name] = None
-            else:
-                print(f"⚠️ 音效文件未找到: {filename}")
-                self.sounds[sound_name] = None
         
         # 播放背景音乐
         self._play_background_music()
     
     def _play_background_music(self):
-        """播放背景音乐"""
-        if 'bg_music' in self.sounds and self.sounds['bg_music']:
-            try:
-                pygame.mixer.music.load(self.sounds['bg_music'])
-                pygame.mixer.music.set_volume(0.5)  # 设置音量
-                pygame.mixer.music.play(-1)  # -1 表示循环播放
-                print("🎵 背景音乐开始播放")
-            except Exception as e:
-                print(f"❌ 播放背景音乐失败: {e}")
+        """在后台线程打开并开始播放背景音乐，不阻塞第一帧"""
+        if self.sounds.get('bg_music'):
+            self._music_thread = threading.Thread(target=self._start_music, args=(self.sounds['bg_music'],),
+                                                  name='bg-music', daemon=True)
+            self._music_thread.start()
+    
+    def _start_music(self, path):
+        try:
+            pygame.mixer.music.load(path)
+            pygame.mixer.music.set_volume(0.5)  # 设置音量
+            pygame.mixer.music.play(-1)  # -1 表示循环播放
+            if not self.sound_enabled:
+                # 音乐还没开始时玩家就按了 M
+                pygame.mixer.music.pause()
+            self.log("🎵 背景音乐开始播放")
+        except Exception as e:
+            print(f"❌ 播放背景音乐失败: {e}")
+    
+    def _wait_for_music(self):
+        """退出前等后台线程结束，避免在 pygame.quit() 之后还访问 mixer"""
+        if self._music_thread is not None:
+            self._music_thread.join()
     
     def play_sound(self, sound_name):
         """播放指定音效"""
@@ -220,623 +244,49 @@ class Game:
             print("🔇 音效已关闭")
         return self.sound_enabled
     
-    def setup_level(self):
-        """设置关卡 - 第一关7组，第二关8组，第三关9组，第四关10组"""
-        self.sheeps = []
-        self.watermelons = []
-        
-        # 创建小鸟队列
-        self.birds = []
-        self.current_bird_index = 0
-        for i in range(self.max_birds):
-            bird = Bird(200, 550)
-            bird.color = self.bird_colors[i % len(self.bird_colors)]  # 分配不同颜色
-            self.birds.append(bird)
-        
-        if self.level == 1:
-            # 第一关：7组简单的羊和西瓜
-            # 第一组（右下角）
-            self.sheeps.extend([
-                Sheep(750, 580),
-                Sheep(780, 550),
-                Sheep(720, 550)
-            ])
-            self.watermelons.extend([
-                Watermelon(700, 530),
-                Watermelon(740, 530)
-            ])
-            
-            # 第二组（中间偏右）
-            self.sheeps.extend([
-                Sheep(600, 500),
-                Sheep(630, 470),
-                Sheep(570, 470)
-            ])
-            self.watermelons.extend([
-                Watermelon(550, 450),
-                Watermelon(590, 450)
-            ])
-            
-            # 第三组（右上角 - 第一组）
-            self.sheeps.extend([
-                Sheep(850, 450),
-                Sheep(880, 420),
-                Sheep(820, 420)
-            ])
-            self.watermelons.extend([
-                Watermelon(800, 400),
-                Watermelon(840, 400)
-            ])
-            
-            # 第四组（中间偏上）
-            self.sheeps.extend([
-                Sheep(500, 400),
-                Sheep(530, 370),
-                Sheep(470, 370)
-            ])
-            self.watermelons.extend([
-                Watermelon(450, 350),
-                Watermelon(490, 350)
-            ])
-            
-            # 第五组（左上角）
-            self.sheeps.extend([
-                Sheep(650, 350),
-                Sheep(680, 320),
-                Sheep(620, 320)
-            ])
-            self.watermelons.extend([
-                Watermelon(600, 300),
-                Watermelon(640, 300)
-            ])
-            
-            # 第六组（右上角 - 第二组，更高位置）
-            self.sheeps.extend([
-                Sheep(920, 380),
-                Sheep(950, 350),
-                Sheep(890, 350)
-            ])
-            self.watermelons.extend([
-                Watermelon(870, 330),
-                Watermelon(910, 330)
-            ])
-            
-            # 第七组（右上角 - 第三组，最高位置）
-            self.sheeps.extend([
-                Sheep(980, 320),
-                Sheep(1010, 290),
-                Sheep(950, 290)
-            ])
-            self.watermelons.extend([
-                Watermelon(930, 270),
-                Watermelon(970, 270)
-            ])
-            
-        elif self.level == 2:
-            # 第二关：8组中等难度的羊和西瓜
-            # 第一组（底部右侧）
-            self.sheeps.extend([
-                Sheep(800, 580),
-                Sheep(780, 530),
-                Sheep(820, 530),
-                Sheep(800, 480)
-            ])
-            self.watermelons.extend([
-                Watermelon(720, 530),
-                Watermelon(760, 530),
-                Watermelon(740, 480)
-            ])
-            
-            # 第二组（中间右侧）
-            self.sheeps.extend([
-                Sheep(650, 500),
-                Sheep(680, 470),
-                Sheep(620, 470),
-                Sheep(650, 420)
-            ])
-            self.watermelons.extend([
-                Watermelon(600, 470),
-                Watermelon(640, 470),
-                Watermelon(620, 420)
-            ])
-            
-            # 第三组（右上角 - 第一组）
-            self.sheeps.extend([
-                Sheep(900, 450),
-                Sheep(930, 420),
-                Sheep(870, 420),
-                Sheep(900, 370)
-            ])
-            self.watermelons.extend([
-                Watermelon(850, 420),
-                Watermelon(890, 420),
-                Watermelon(870, 370)
-            ])
-            
-            # 第四组（中间左侧）
-            self.sheeps.extend([
-                Sheep(550, 400),
-                Sheep(580, 370),
-                Sheep(520, 370),
-                Sheep(550, 320)
-            ])
-            self.watermelons.extend([
-                Watermelon(500, 370),
-                Watermelon(540, 370),
-                Watermelon(520, 320)
-            ])
-            
-            # 第五组（顶部左侧）
-            self.sheeps.extend([
-                Sheep(700, 350),
-                Sheep(730, 320),
-                Sheep(670, 320),
-                Sheep(700, 270)
-            ])
-            self.watermelons.extend([
-                Watermelon(650, 320),
-                Watermelon(690, 320),
-                Watermelon(670, 270)
-            ])
-            
-            # 第六组（右上角 - 第二组，更高位置）
-            self.sheeps.extend([
-                Sheep(950, 380),
-                Sheep(980, 350),
-                Sheep(920, 350),
-                Sheep(950, 300)
-            ])
-            self.watermelons.extend([
-                Watermelon(900, 350),
-                Watermelon(940, 350),
-                Watermelon(920, 300)
-            ])
-            
-            # 第七组（右上角 - 第三组，最高位置）
-            self.sheeps.extend([
-                Sheep(1020, 320),
-                Sheep(1050, 290),
-                Sheep(990, 290),
-                Sheep(1020, 240)
-            ])
-            self.watermelons.extend([
-                Watermelon(970, 290),
-                Watermelon(1010, 290),
-                Watermelon(990, 240)
-            ])
-            
-            # 第八组（新增 - 左侧高空）
-            self.sheeps.extend([
-                Sheep(350, 350),
-                Sheep(380, 320),
-                Sheep(320, 320),
-                Sheep(350, 290)
-            ])
-            self.watermelons.extend([
-                Watermelon(300, 320),
-                Watermelon(340, 320),
-                Watermelon(320, 290)
-            ])
-            
-        elif self.level == 3:
-            # 第三关：9组复杂的羊和西瓜
-            # 第一组（大型结构 - 右下角）
-            self.sheeps.extend([
-                Sheep(850, 580),
-                Sheep(830, 530),
-                Sheep(870, 530),
-                Sheep(850, 480),
-                Sheep(830, 430)
-            ])
-            self.watermelons.extend([
-                Watermelon(750, 530),
-                Watermelon(790, 530),
-                Watermelon(770, 480),
-                Watermelon(810, 480),
-                Watermelon(790, 430)
-            ])
-            
-            # 第二组（塔形结构 - 中间）
-            self.sheeps.extend([
-                Sheep(600, 550),
-                Sheep(600, 500),
-                Sheep(600, 450),
-                Sheep(570, 500),
-                Sheep(630, 500)
-            ])
-            self.watermelons.extend([
-                Watermelon(550, 530),
-                Watermelon(590, 530),
-                Watermelon(570, 480),
-                Watermelon(610, 480),
-                Watermelon(590, 430)
-            ])
-            
-            # 第三组（分散结构 - 右上角第一组）
-            self.sheeps.extend([
-                Sheep(950, 550),
-                Sheep(920, 500),
-                Sheep(980, 500),
-                Sheep(950, 450),
-                Sheep(920, 400),
-                Sheep(980, 400)
-            ])
-            self.watermelons.extend([
-                Watermelon(900, 530),
-                Watermelon(940, 530),
-                Watermelon(920, 480),
-                Watermelon(960, 480),
-                Watermelon(940, 430),
-                Watermelon(980, 430)
-            ])
-            
-            # 第四组（线性结构 - 左上角）
-            self.sheeps.extend([
-                Sheep(450, 500),
-                Sheep(480, 470),
-                Sheep(420, 470),
-                Sheep(450, 420),
-                Sheep(480, 390),
-                Sheep(420, 390)
-            ])
-            self.watermelons.extend([
-                Watermelon(400, 470),
-                Watermelon(440, 470),
-                Watermelon(420, 420),
-                Watermelon(460, 420),
-                Watermelon(440, 370)
-            ])
-            
-            # 第五组（金字塔结构 - 中间顶部）
-            self.sheeps.extend([
-                Sheep(750, 350),
-                Sheep(720, 320),
-                Sheep(780, 320),
-                Sheep(690, 290),
-                Sheep(750, 290),
-                Sheep(810, 290),
-                Sheep(720, 260),
-                Sheep(780, 260)
-            ])
-            self.watermelons.extend([
-                Watermelon(700, 320),
-                Watermelon(740, 320),
-                Watermelon(780, 320),
-                Watermelon(720, 290),
-                Watermelon(760, 290),
-                Watermelon(740, 260)
-            ])
-            
-            # 第六组（右上角 - 第二组，城堡结构）
-            self.sheeps.extend([
-                Sheep(1020, 480),
-                Sheep(1050, 450),
-                Sheep(990, 450),
-                Sheep(1020, 420),
-                Sheep(1050, 390),
-                Sheep(990, 390),
-                Sheep(1020, 360)
-            ])
-            self.watermelons.extend([
-                Watermelon(970, 450),
-                Watermelon(1010, 450),
-                Watermelon(990, 420),
-                Watermelon(1030, 420),
-                Watermelon(1010, 390),
-                Watermelon(1050, 390)
-            ])
-            
-            # 第七组（右上角 - 第三组，高空平台）
-            self.sheeps.extend([
-                Sheep(1080, 350),
-                Sheep(1110, 320),
-                Sheep(1050, 320),
-                Sheep(1080, 290),
-                Sheep(1110, 260),
-                Sheep(1050, 260),
-                Sheep(1080, 230),
-                Sheep(1110, 200)
-            ])
-            self.watermelons.extend([
-                Watermelon(1030, 320),
-                Watermelon(1070, 320),
-                Watermelon(1050, 290),
-                Watermelon(1090, 290),
-                Watermelon(1070, 260),
-                Watermelon(1110, 260),
-                Watermelon(1090, 230)
-            ])
-            
-            # 第八组（左侧高空塔）
-            self.sheeps.extend([
-                Sheep(350, 350),
-                Sheep(380, 320),
-                Sheep(320, 320),
-                Sheep(350, 290),
-                Sheep(380, 260),
-                Sheep(320, 260)
-            ])
-            self.watermelons.extend([
-                Watermelon(300, 320),
-                Watermelon(340, 320),
-                Watermelon(320, 290),
-                Watermelon(360, 290),
-                Watermelon(340, 260)
-            ])
-            
-            # 第九组（中间高空结构）
-            self.sheeps.extend([
-                Sheep(680, 280),
-                Sheep(710, 250),
-                Sheep(650, 250),
-                Sheep(680, 220),
-                Sheep(710, 190),
-                Sheep(650, 190),
-                Sheep(680, 160)
-            ])
-            self.watermelons.extend([
-                Watermelon(630, 250),
-                Watermelon(670, 250),
-                Watermelon(650, 220),
-                Watermelon(690, 220),
-                Watermelon(670, 190),
-                Watermelon(710, 190)
-            ])
-            
-        elif self.level == 4:
-            # 第四关：10组终极挑战
-            # 第一组（超级塔 - 右下角）
-            self.sheeps.extend([
-                Sheep(850, 580),
-                Sheep(830, 530),
-                Sheep(870, 530),
-                Sheep(850, 480),
-                Sheep(830, 430),
-                Sheep(870, 430),
-                Sheep(850, 380)
-            ])
-            self.watermelons.extend([
-                Watermelon(750, 530),
-                Watermelon(790, 530),
-                Watermelon(770, 480),
-                Watermelon(810, 480),
-                Watermelon(790, 430),
-                Watermelon(830, 430),
-                Watermelon(810, 380)
-            ])
-            
-            # 第二组（大型金字塔 - 中间右侧）
-            self.sheeps.extend([
-                Sheep(600, 550),
-                Sheep(570, 500),
-                Sheep(630, 500),
-                Sheep(540, 450),
-                Sheep(600, 450),
-                Sheep(660, 450),
-                Sheep(570, 400),
-                Sheep(630, 400)
-            ])
-            self.watermelons.extend([
-                Watermelon(550, 530),
-                Watermelon(590, 530),
-                Watermelon(570, 480),
-                Watermelon(610, 480),
-                Watermelon(590, 430),
-                Watermelon(630, 430),
-                Watermelon(610, 380)
-            ])
-            
-            # 第三组（城堡结构 - 右上角）
-            self.sheeps.extend([
-                Sheep(950, 550),
-                Sheep(920, 500),
-                Sheep(980, 500),
-                Sheep(950, 450),
-                Sheep(920, 400),
-                Sheep(980, 400),
-                Sheep(950, 350),
-                Sheep(920, 300),
-                Sheep(980, 300)
-            ])
-            self.watermelons.extend([
-                Watermelon(900, 530),
-                Watermelon(940, 530),
-                Watermelon(920, 480),
-                Watermelon(960, 480),
-                Watermelon(940, 430),
-                Watermelon(980, 430),
-                Watermelon(960, 380),
-                Watermelon(1000, 380)
-            ])
-            
-            # 第四组（复杂结构 - 左上角）
-            self.sheeps.extend([
-                Sheep(450, 500),
-                Sheep(480, 470),
-                Sheep(420, 470),
-                Sheep(450, 420),
-                Sheep(480, 390),
-                Sheep(420, 390),
-                Sheep(450, 340),
-                Sheep(480, 310),
-                Sheep(420, 310)
-            ])
-            self.watermelons.extend([
-                Watermelon(400, 470),
-                Watermelon(440, 470),
-                Watermelon(420, 420),
-                Watermelon(460, 420),
-                Watermelon(440, 370),
-                Watermelon(480, 370),
-                Watermelon(460, 320)
-            ])
-            
-            # 第五组（巨型金字塔 - 中间顶部）
-            self.sheeps.extend([
-                Sheep(750, 350),
-                Sheep(720, 320),
-                Sheep(780, 320),
-                Sheep(690, 290),
-                Sheep(750, 290),
-                Sheep(810, 290),
-                Sheep(660, 260),
-                Sheep(720, 260),
-                Sheep(780, 260),
-                Sheep(840, 260),
-                Sheep(690, 230),
-                Sheep(750, 230),
-                Sheep(810, 230)
-            ])
-            self.watermelons.extend([
-                Watermelon(700, 320),
-                Watermelon(740, 320),
-                Watermelon(780, 320),
-                Watermelon(720, 290),
-                Watermelon(760, 290),
-                Watermelon(800, 290),
-                Watermelon(740, 260),
-                Watermelon(780, 260),
-                Watermelon(760, 230)
-            ])
-            
-            # 第六组（高空城堡 - 右上角）
-            self.sheeps.extend([
-                Sheep(1020, 480),
-                Sheep(1050, 450),
-                Sheep(990, 450),
-                Sheep(1020, 420),
-                Sheep(1050, 390),
-                Sheep(990, 390),
-                Sheep(1020, 360),
-                Sheep(1050, 330),
-                Sheep(990, 330),
-                Sheep(1020, 300)
-            ])
-            self.watermelons.extend([
-                Watermelon(970, 450),
-                Watermelon(1010, 450),
-                Watermelon(990, 420),
-                Watermelon(1030, 420),
-                Watermelon(1010, 390),
-                Watermelon(1050, 390),
-                Watermelon(1030, 360),
-                Watermelon(1070, 360)
-            ])
-            
-            # 第七组（超高空平台）
-            self.sheeps.extend([
-                Sheep(1080, 350),
-                Sheep(1110, 320),
-                Sheep(1050, 320),
-                Sheep(1080, 290),
-                Sheep(1110, 260),
-                Sheep(1050, 260),
-                Sheep(1080, 230),
-                Sheep(1110, 200),
-                Sheep(1050, 200),
-                Sheep(1080, 170)
-            ])
-            self.watermelons.extend([
-                Watermelon(1030, 320),
-                Watermelon(1070, 320),
-                Watermelon(1050, 290),
-                Watermelon(1090, 290),
-                Watermelon(1070, 260),
-                Watermelon(1110, 260),
-                Watermelon(1090, 230),
-                Watermelon(1130, 230),
-                Watermelon(1110, 200)
-            ])
-            
-            # 第八组（左侧超级塔）
-            self.sheeps.extend([
-                Sheep(350, 350),
-                Sheep(380, 320),
-                Sheep(320, 320),
-                Sheep(350, 290),
-                Sheep(380, 260),
-                Sheep(320, 260),
-                Sheep(350, 230),
-                Sheep(380, 200),
-                Sheep(320, 200)
-            ])
-            self.watermelons.extend([
-                Watermelon(300, 320),
-                Watermelon(340, 320),
-                Watermelon(320, 290),
-                Watermelon(360, 290),
-                Watermelon(340, 260),
-                Watermelon(380, 260),
-                Watermelon(360, 230),
-                Watermelon(400, 230)
-            ])
-            
-            # 第九组（中间高空复杂结构）
-            self.sheeps.extend([
-                Sheep(680, 280),
-                Sheep(710, 250),
-                Sheep(650, 250),
-                Sheep(680, 220),
-                Sheep(710, 190),
-                Sheep(650, 190),
-                Sheep(680, 160),
-                Sheep(710, 130),
-                Sheep(650, 130)
-            ])
-            self.watermelons.extend([
-                Watermelon(630, 250),
-                Watermelon(670, 250),
-                Watermelon(650, 220),
-                Watermelon(690, 220),
-                Watermelon(670, 190),
-                Watermelon(710, 190),
-                Watermelon(690, 160),
-                Watermelon(730, 160)
-            ])
-            
-            # 第十组（终极挑战 - 最高点）
-            self.sheeps.extend([
-                Sheep(900, 180),
-                Sheep(930, 150),
-                Sheep(870, 150),
-                Sheep(900, 120),
-                Sheep(930, 90),
-                Sheep(870, 90),
-                Sheep(900, 60)
-            ])
-            self.watermelons.extend([
-                Watermelon(850, 150),
-                Watermelon(890, 150),
-                Watermelon(870, 120),
-                Watermelon(910, 120),
-                Watermelon(890, 90),
-                Watermelon(930, 90),
-                Watermelon(910, 60)
-            ])
+    def setup_level(self, level=None):
+        """设置关卡（世界状态由模拟核心创建）"""
+        self.sim.setup_level(level)
+        self._reset_level_effects()
+    
+    def _reset_level_effects(self):
+        """换关后清空特效并整屏重绘"""
+        particle_pool.clear()
+        self.world.invalidate()
+        if self.dirty_rects:
+            self.dirty_rects.invalidate()
     
     def get_current_bird(self):
         """获取当前活跃的小鸟"""
-        if self.current_bird_index < len(self.birds):
-            return self.birds[self.current_bird_index]
-        return None
+        return self.sim.get_current_bird()
     
-    def next_bird(self):
-        """切换到下一只小鸟"""
-        self.current_bird_index += 1
-        if self.current_bird_index >= len(self.birds):
-            # 所有小鸟都用完了
-            return False
-        return True
+    def render_text(self, font, text, color, antialias=True):
+        """通过缓存渲染文字"""
+        return self.text_cache.render(font, text, color, antialias)
+    
+    def get_translucent_surface(self, size, alpha):
+        """获取缓存的半透明黑色面板"""
+        key = (size, alpha)
+        surface = self._surface_cache.get(key)
+        if surface is None:
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            surface.fill((0, 0, 0, alpha))
+            self._surface_cache[key] = surface
+        return surface
+    
+    def mark_dirty(self, rect):
+        """脏矩形模式下标记本帧变化的区域"""
+        if self.dirty_rects:
+            self.dirty_rects.mark(rect)
     
     def draw_ui(self):
         """绘制UI"""
-        panel = pygame.Surface((300, 120), pygame.SRCALPHA)
-        panel.fill((0, 0, 0, 128))
-        self.screen.blit(panel, (10, 10))
+        panel = self.get_translucent_surface((300, 120), 128)
+        self.mark_dirty(self.screen.blit(panel, (10, 10)))
         
-        score_text = self.ui_font.render(f"🏆 分数: {self.score}", True, WHITE)
-        level_text = self.ui_font.render(f"🎯 关卡: {self.level}/4", True, WHITE)
-        birds_text = self.ui_font.render(f"🐦 剩余小鸟: {len(self.birds) - self.current_bird_index}", True, WHITE)
+        score_text = self.render_text(self.ui_font, f"🏆 分数: {self.sim.score}", WHITE)
+        level_text = self.render_text(self.ui_font, f"🎯 关卡: {self.sim.level}/{self.sim.level_count}", WHITE)
+        birds_text = self.render_text(self.ui_font, f"🐦 剩余小鸟: {self.sim.bird_queue.remaining()}", WHITE)
         
         self.screen.blit(score_text, (20, 20))
         self.screen.blit(level_text, (20, 50))
@@ -844,28 +294,27 @@ class Game:
         
         current_bird = self.get_current_bird()
         if current_bird and not current_bird.launched and not current_bird.dragging:
-            hint_text = self.small_font.render("拖动小鸟来发射！", True, WHITE)
-            self.screen.blit(hint_text, (SCREEN_WIDTH // 2 - hint_text.get_width() // 2, 100))
+            hint_text = self.render_text(self.small_font, "拖动小鸟来发射！", WHITE)
+            self.mark_dirty(self.screen.blit(hint_text, (SCREEN_WIDTH // 2 - hint_text.get_width() // 2, 100)))
         
         if current_bird and current_bird.dragging:
             power = math.sqrt((current_bird.start_x - current_bird.x)**2 + (current_bird.start_y - current_bird.y)**2)
             power_bar_width = min(200, power * 2)
             pygame.draw.rect(self.screen, RED, (SCREEN_WIDTH // 2 - 100, 80, power_bar_width, 15), 0, 7)
-            pygame.draw.rect(self.screen, WHITE, (SCREEN_WIDTH // 2 - 100, 80, 200, 15), 2, 7)
+            self.mark_dirty(pygame.draw.rect(self.screen, WHITE, (SCREEN_WIDTH // 2 - 100, 80, 200, 15), 2, 7))
             
-            power_text = self.small_font.render("发射力量", True, WHITE)
-            self.screen.blit(power_text, (SCREEN_WIDTH // 2 - power_text.get_width() // 2, 60))
+            power_text = self.render_text(self.small_font, "发射力量", WHITE)
+            self.mark_dirty(self.screen.blit(power_text, (SCREEN_WIDTH // 2 - power_text.get_width() // 2, 60)))
     
     def draw_signature(self):
         """绘制署名"""
-        signature_text = self.signature_font.render("@2025 Designed by Pengchao Ma", True, (200, 200, 200))
+        signature_text = self.render_text(self.signature_font, "@2025 Designed by Pengchao Ma", (200, 200, 200))
         
         # 计算居中位置（底部）
         text_x = SCREEN_WIDTH // 2 - signature_text.get_width() // 2  # 水平居中
         text_y = SCREEN_HEIGHT - signature_text.get_height() - 20    # 距离底部20像素
         
-        signature_bg = pygame.Surface((signature_text.get_width() + 10, signature_text.get_height() + 6), pygame.SRCALPHA)
-        signature_bg.fill((0, 0, 0, 128))
+        signature_bg = self.get_translucent_surface((signature_text.get_width() + 10, signature_text.get_height() + 6), 128)
         self.screen.blit(signature_bg, (text_x - 5, text_y - 3))
         
         self.screen.blit(signature_text, (text_x, text_y))
@@ -874,199 +323,397 @@ class Game:
         """绘制发射轨迹预测"""
         current_bird = self.get_current_bird()
         if current_bird and current_bird.dragging and not current_bird.launched:
-            power_x = current_bird.start_x - current_bird.x
-            power_y = current_bird.start_y - current_bird.y
-            
-            points = []
-            vx = power_x * LAUNCH_POWER
-            vy = power_y * LAUNCH_POWER
-            px, py = current_bird.x, current_bird.y
-            
-            for _ in range(50):
-                vy += GRAVITY
-                px += vx
-                py += vy
-                points.append((px, py))
-                
-                if px < 0 or px > SCREEN_WIDTH or py > SCREEN_HEIGHT:
-                    break
+            # 拉动向量取整后作为缓存键，拖动时大部分帧直接命中缓存
+            power_x = round(current_bird.start_x - current_bird.x)
+            power_y = round(current_bird.start_y - current_bird.y)
+            points = trajectory_points(current_bird.start_x, current_bird.start_y, power_x, power_y,
+                                       dt=self.step_dt)
             
             if len(points) > 1:
-                pygame.draw.lines(self.screen, (255, 255, 255, 128), False, points, 2)
+                rect = pygame.draw.lines(self.screen, (255, 255, 255, 128), False, points, 2).inflate(6, 6)
+                self.mark_dirty(rect)
                 
-                for i, point in enumerate(points):
-                    if i % 5 == 0:
-                        alpha = 255 - i * 5
-                        if alpha > 0:
-                            surf = pygame.Surface((6, 6), pygame.SRCALPHA)
-                            pygame.draw.circle(surf, (255, 255, 255, alpha), (3, 3), 3)
-                            self.screen.blit(surf, (point[0] - 3, point[1] - 3))
+                dots = self._get_trajectory_dots()
+                self.screen.blits([(dots[i // 5], (point[0] - 3, point[1] - 3))
+                                   for i, point in enumerate(points) if i % 5 == 0], False)
+                # 轨迹在西瓜和小羊下面
+                self.world.restore(self.screen, rect)
+    
+    def _get_trajectory_dots(self):
+        """预渲染的轨迹圆点，透明度随距离递减"""
+        if self._trajectory_dots is None:
+            self._trajectory_dots = []
+            for i in range(0, 50, 5):
+                surf = pygame.Surface((6, 6), pygame.SRCALPHA)
+                pygame.draw.circle(surf, (255, 255, 255, 255 - i * 5), (3, 3), 3)
+                self._trajectory_dots.append(surf)
+        return self._trajectory_dots
     
     def handle_events(self):
         """处理游戏事件"""
-        current_bird = self.get_current_bird()
-        
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
             
+            elif event.type == pygame.KEYDOWN and event.key in (pygame.K_F3, pygame.K_F4):
+                # 性能面板不影响游戏状态：回放时也可以使用，也不写入录像
+                if event.key == pygame.K_F3:
+                    self.profiler.toggle()
+                    if self.dirty_rects:
+                        self.dirty_rects.invalidate()
+                else:
+                    self.dump_profile()
+            
+            elif self.replay is not None:
+                continue  # 回放时输入来自录像
+            
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                if current_bird and not current_bird.launched and not current_bird.dragging:
-                    mouse_x, mouse_y = pygame.mouse.get_pos()
-                    distance = math.sqrt((mouse_x - current_bird.x) ** 2 + (mouse_y - current_bird.y) ** 2)
-                    if distance < current_bird.radius:
-                        current_bird.dragging = True
+                self.apply_input(INPUT_PRESS, *pygame.mouse.get_pos())
             
             elif event.type == pygame.MOUSEBUTTONUP:
-                if current_bird and current_bird.dragging:
-                    current_bird.dragging = False
-                    mouse_x, mouse_y = pygame.mouse.get_pos()
-                    power_x = current_bird.start_x - mouse_x
-                    power_y = current_bird.start_y - mouse_y
-                    current_bird.launch(power_x, power_y)
+                self.apply_input(INPUT_RELEASE, *pygame.mouse.get_pos())
             
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r:
-                    if current_bird:
-                        current_bird.reset()
+                    self.apply_input(INPUT_RESET)
                 elif event.key == pygame.K_t:
-                    self.show_trajectory = not self.show_trajectory
-                elif event.key == pygame.K_n and self.level_complete:
-                    self.level += 1
-                    if self.level > 4:
-                        self.game_over = True
-                    else:
-                        self.setup_level()
-                        self.level_complete = False
+                    self.apply_input(INPUT_TRAJECTORY)
+                elif event.key == pygame.K_n:
+                    self.apply_input(INPUT_NEXT_LEVEL)
                 elif event.key == pygame.K_m:  # M键切换音效
-                    sound_status = "开启" if self.toggle_sound() else "关闭"
-                    print(f"音效{sound_status}")
+                    self.apply_input(INPUT_SOUND)
+                elif event.key == pygame.K_F5:
+                    self.apply_input(INPUT_SAVE)
+                elif event.key == pygame.K_F9:
+                    self.apply_input(INPUT_LOAD)
         
-        if current_bird and current_bird.dragging:
-            mouse_x, mouse_y = pygame.mouse.get_pos()
-            dx = current_bird.start_x - mouse_x
-            dy = current_bird.start_y - mouse_y
-            distance = math.sqrt(dx * dx + dy * dy)
-            
-            if distance > MAX_PULL_DISTANCE:
-                scale = MAX_PULL_DISTANCE / distance
-                dx *= scale
-                dy *= scale
-            
-            current_bird.x = current_bird.start_x - dx
-            current_bird.y = current_bird.start_y - dy
+        current_bird = self.get_current_bird()
+        if self.replay is None and current_bird and current_bird.dragging:
+            mouse_pos = pygame.mouse.get_pos()
+            if mouse_pos != self._last_drag_pos:
+                self.apply_input(INPUT_DRAG, *mouse_pos)
         
         return True
     
-    def update(self):
-        """更新游戏状态"""
-        self.background.update()
-        
+    def apply_input(self, kind, x=0, y=0):
+        """执行一条输入（玩家操作或录像回放），录制时同时写入录像"""
+        if self.recorder is not None:
+            self.recorder.record(self.update_count, kind, x, y)
         current_bird = self.get_current_bird()
-        if not current_bird:
-            return
         
-        # 更新所有小鸟
-        for bird in self.birds:
-            bird.update()
-        
-        # 如果当前小鸟已经发射且不再活跃，切换到下一只
-        if current_bird.launched and not current_bird.active:
-            if not self.next_bird():
-                # 所有小鸟都用完了，检查关卡是否完成
-                alive_sheeps = [sheep for sheep in self.sheeps if sheep.alive]
-                if not alive_sheeps and not self.level_complete:
-                    self.level_complete = True
-                    self.score += 500 * self.level
-                elif alive_sheeps and not self.level_complete:
-                    # 所有小鸟用完但还有羊存活，游戏结束
-                    self.game_over = True
-        
-        # 检测碰撞（只检测当前活跃的小鸟）
-        if current_bird.active:
-            for sheep in self.sheeps[:]:
-                if sheep.alive and current_bird.check_collision(sheep):
-                    sheep.hit()
-                    self.score += 100
-            
-            # 西瓜碰撞
-            for watermelon in self.watermelons:
-                if watermelon.check_collision(current_bird):
-                    watermelon.crack()
-                    current_bird.velocity_x *= -0.3
-                    current_bird.velocity_y *= -0.3
-        
-        # 检查关卡是否完成（所有羊都被消灭）
-        alive_sheeps = [sheep for sheep in self.sheeps if sheep.alive]
-        if not alive_sheeps and not self.level_complete:
-            self.level_complete = True
-            self.score += 500 * self.level
+        if kind == INPUT_PRESS:
+            self._last_drag_pos = None
+            if current_bird and not current_bird.launched and not current_bird.dragging:
+                distance = math.sqrt((x - current_bird.x) ** 2 + (y - current_bird.y) ** 2)
+                if distance < current_bird.radius:
+                    current_bird.dragging = True
+        
+        elif kind == INPUT_DRAG:
+            self._last_drag_pos = (x, y)
+            if current_bird and current_bird.dragging:
+                dx, dy = clamp_pull(current_bird.start_x - x, current_bird.start_y - y)
+                current_bird.x = current_bird.start_x - dx
+                current_bird.y = current_bird.start_y - dy
+        
+        elif kind == INPUT_RELEASE:
+            if current_bird and current_bird.dragging:
+                current_bird.dragging = False
+                self.sim.launch(current_bird.start_x - x, current_bird.start_y - y)
+        
+        elif kind == INPUT_RESET:
+            self.sim.reset_bird()
+        
+        elif kind == INPUT_TRAJECTORY:
+            self.show_trajectory = not self.show_trajectory
+        
+        elif kind == INPUT_NEXT_LEVEL:
+            if self.sim.level_complete:
+                self.sim.next_level()
+                self._reset_level_effects()
+        
+        elif kind == INPUT_SOUND:
+            sound_status = "开启" if self.toggle_sound() else "关闭"
+            print(f"音效{sound_status}")
+        
+        elif kind == INPUT_SAVE:
+            self.quick_save()
+        
+        elif kind == INPUT_LOAD:
+            self.quick_load()
+    
+    def quick_save(self):
+        """快速存档：快照保存在内存中，同时写入存档文件"""
+        self._quicksave = self.sim.snapshot()
+        if self.replay is None:
+            try:
+                os.makedirs(os.path.dirname(self.save_path), exist_ok=True)
+                with open(self.save_path, 'wb') as f:
+                    f.write(self._quicksave)
+            except OSError as e:
+                print(f"❌ 存档写入失败: {e}")
+                return
+        print(f"💾 已存档（关卡 {self.sim.level}，分数 {self.sim.score}，{len(self._quicksave)} 字节）")
+    
+    def quick_load(self):
+        """读取快速存档（优先使用本局内存中的存档）"""
+        data = self._quicksave
+        # 回放时只用本局内存中的存档，存档文件可能已经被之后的游戏覆盖
+        if data is None and self.replay is None and os.path.exists(self.save_path):
+            with open(self.save_path, 'rb') as f:
+                data = f.read()
+        if data is None:
+            print("没有可读取的存档")
+            return
+        try:
+            self.sim.restore(data)
+        except ValueError as e:
+            print(f"❌ 存档读取失败: {e}")
+            return
+        self._reset_level_effects()
+        print(f"📂 已读档（关卡 {self.sim.level}，分数 {self.sim.score}）")
+    
+    def update(self):
+        """更新游戏状态"""
+        if self.replay is not None:
+            for kind, x, y in self.replay.events_at(self.update_count):
+                self.apply_input(kind, x, y)
+        self.update_count += 1
+        
+        self.background.update(self.step_dt)
+        particle_pool.update(self.step_dt)
+        
+        # 世界状态由模拟核心推进，这里只负责标记需要重绘的区域
+        self.sim.step()
+        for sheep in self.sim.last_hits:
+            self.world.invalidate(sheep.get_rect())
+            self.mark_dirty(sheep.get_rect())
     
     def draw(self):
         """绘制游戏画面"""
-        self.background.draw(self.screen)
+        profiler = self.profiler
+        # 背景、西瓜和存活的小羊来自预先合成的静态层，每帧的开销只与运动的物体有关
+        self.world.draw(self.screen, self.sim.watermelons, self.sim.sheeps)
+        if self.dirty_rects:
+            self.dirty_rects.mark_many(self.background.cloud_rects())
+        profiler.lap('world')
         
         if self.show_trajectory:
             self.draw_trajectory()
+        profiler.lap('trajectory')
         
-        # 绘制西瓜
-        for watermelon in self.watermelons:
-            watermelon.draw(self.screen)
+        # 绘制当前小鸟和仍在飞行的小鸟
+        for bird in self.sim.bird_queue.active_birds():
+            bird.draw(self.screen, self.render_alpha)
+            self.mark_dirty(bird.get_rect(self.render_alpha))
+        profiler.lap('birds')
         
-        for sheep in self.sheeps:
-            sheep.draw(self.screen)
-        
-        # 绘制所有小鸟
-        for bird in self.birds:
-            bird.draw(self.screen)
+        # 绘制所有粒子特效
+        particle_rects = particle_pool.draw(self.screen, self.dirty_rects is not None)
+        if self.dirty_rects:
+            self.dirty_rects.mark_many(particle_rects)
+        profiler.lap('particles')
         
         # 绘制弹弓（只与当前小鸟交互）
         current_bird = self.get_current_bird()
         if current_bird:
             self.slingshot.draw(self.screen, current_bird)
+            if current_bird.dragging:
+                self.mark_dirty(self.slingshot.get_rect().union(current_bird.get_rect()))
         
         self.draw_ui()
         self.draw_signature()
         
-        if self.level_complete:
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 150))
+        if self.dirty_rects and (self.sim.level_complete or self.sim.game_over):
+            self.dirty_rects.invalidate()
+        
+        if self.sim.level_complete:
+            overlay = self.get_translucent_surface((SCREEN_WIDTH, SCREEN_HEIGHT), 150)
             self.screen.blit(overlay, (0, 0))
             
-            if self.level < 4:
-                complete_text = self.title_font.render(f"关卡 {self.level} 完成！", True, YELLOW)
-                next_text = self.ui_font.render("按 N 进入下一关", True, WHITE)
+            if self.sim.level < self.sim.level_count:
+                complete_text = self.render_text(self.title_font, f"关卡 {self.sim.level} 完成！", YELLOW)
+                next_text = self.render_text(self.ui_font, "按 N 进入下一关", WHITE)
             else:
-                complete_text = self.title_font.render("游戏通关！", True, YELLOW)
-                next_text = self.ui_font.render("恭喜你完成了所有关卡！", True, WHITE)
+                complete_text = self.render_text(self.title_font, "游戏通关！", YELLOW)
+                next_text = self.render_text(self.ui_font, "恭喜你完成了所有关卡！", WHITE)
             
             self.screen.blit(complete_text, (SCREEN_WIDTH // 2 - complete_text.get_width() // 2, SCREEN_HEIGHT // 2 - 50))
             self.screen.blit(next_text, (SCREEN_WIDTH // 2 - next_text.get_width() // 2, SCREEN_HEIGHT // 2 + 20))
         
-        if self.game_over:
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 200))
+        if self.sim.game_over:
+            overlay = self.get_translucent_surface((SCREEN_WIDTH, SCREEN_HEIGHT), 200)
             self.screen.blit(overlay, (0, 0))
             
-            game_over_text = self.title_font.render("游戏结束！", True, RED)
-            score_text = self.ui_font.render(f"最终分数: {self.score}", True, WHITE)
+            game_over_text = self.render_text(self.title_font, "游戏结束！", RED)
+            score_text = self.render_text(self.ui_font, f"最终分数: {self.sim.score}", WHITE)
             
             self.screen.blit(game_over_text, (SCREEN_WIDTH // 2 - game_over_text.get_width() // 2, SCREEN_HEIGHT // 2 - 50))
             self.screen.blit(score_text, (SCREEN_WIDTH // 2 - score_text.get_width() // 2, SCREEN_HEIGHT // 2 + 20))
+        profiler.lap('ui')
+        
+        if profiler.visible:
+            self.draw_profiler()
+            profiler.lap('hud')
+        
+        if self.dirty_rects:
+            self.dirty_rects.present()
+        else:
+            pygame.display.flip()
+        profiler.lap('present')
         
-        pygame.display.flip()
+        if self.frame_exporter is not None:
+            self.frame_exporter.publish(self.screen)
+            profiler.lap('export')
+    
+    def draw_profiler(self):
+        """绘制性能面板：最近各帧耗时曲线、p50/p95/p99 和各阶段平均耗时"""
+        stats = self.profiler.stats()
+        width, height = 340, 260
+        x, y = SCREEN_WIDTH - width - 10, 10
+        panel = self.get_translucent_surface((width, height), 170)
+        self.mark_dirty(self.screen.blit(panel, (x, y)))
+        
+        title = self.render_text(self.small_font, f"帧耗时 p50 {stats['p50']:.1f}  p95 {stats['p95']:.1f}  "
+                                                  f"p99 {stats['p99']:.1f} ms", WHITE)
+        self.screen.blit(title, (x + 10, y + 8))
+        
+        # 耗时曲线：纵轴 0 ~ 2 帧预算，虚线为一帧预算（1 / FPS）
+        graph_x, graph_y, graph_w, graph_h = x + 10, y + 36, width - 20, 80
+        budget = 1000 / FPS
+        pygame.draw.rect(self.screen, (60, 60, 60), (graph_x, graph_y, graph_w, graph_h), 1)
+        budget_y = graph_y + graph_h // 2
+        for dash_x in range(graph_x, graph_x + graph_w, 8):
+            pygame.draw.line(self.screen, YELLOW, (dash_x, budget_y), (dash_x + 3, budget_y))
+        busy = self.profiler.busy_times()[-graph_w:] / 1e6
+        if len(busy) > 1:
+            points = [(graph_x + i, graph_y + graph_h - min(value, 2 * budget) / (2 * budget) * graph_h)
+                      for i, value in enumerate(busy.tolist())]
+            pygame.draw.lines(self.screen, GREEN, False, points)
+        
+        # 各阶段平均耗时（两列）
+        for index, (phase, value) in enumerate(stats['phases'].items()):
+            text = self.render_text(self.small_font, f"{phase} {value:.2f}", WHITE)
+            self.screen.blit(text, (x + 10 + (index % 2) * (width // 2), graph_y + graph_h + 10 + (index // 2) * 20))
+    
+    def dump_profile(self, path=None):
+        """把性能分析缓冲区导出为 CSV"""
+        if path is None:
+            profile_dir = os.path.join(parent_dir, 'profiles')
+            os.makedirs(profile_dir, exist_ok=True)
+            path = os.path.join(profile_dir, time.strftime("frame_profile_%Y%m%d_%H%M%S.csv"))
+        frames = self.profiler.dump_csv(path)
+        print(f"📈 已导出 {frames} 帧性能数据: {path}")
+        return path
+    
+    def close_frame_export(self):
+        """停止帧导出并删除共享内存"""
+        if self.frame_exporter is not None:
+            self.frame_exporter.close()
+            self.frame_exporter = None
     
     def run(self):
         """运行游戏主循环"""
-        running = True
-        while running:
-            running = self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
+        if self.replay is not None:
+            return self.run_replay()
         
+        running = True
+        accumulator = 0.0
+        previous = time.perf_counter()
+        try:
+            while running:
+                self.profiler.begin_frame()
+                now = time.perf_counter()
+                accumulator += now - previous
+                previous = now
+                
+                running = self.handle_events()
+                self.profiler.lap('events')
+                
+                # 按固定步长推进物理，渲染变慢时追赶，但每帧最多追赶 max_catchup_steps 步
+                steps = 0
+                while accumulator >= self.sim_dt and steps < self.max_catchup_steps:
+                    self.update()
+                    accumulator -= self.sim_dt
+                    steps += 1
+                if accumulator >= self.sim_dt:
+                    # 负载过高时丢弃积压的时间，避免越追越慢
+                    accumulator %= self.sim_dt
+                self.profiler.lap('update')
+                
+                self.render_alpha = accumulator / self.sim_dt
+                self.draw()
+                self.clock.tick(FPS)
+                self.profiler.lap('wait')
+                self.profiler.end_frame()
+        finally:
+            self.close_frame_export()  # 异常退出时也要删除共享内存
+        
+        if self.profile_csv:
+            self.dump_profile(self.profile_csv)
+        if self.recorder is not None:
+            self.recorder.close(self.update_count)
+            print(f"📼 录像已保存: {self.recorder.path} ({self.recorder.events} 条输入, {self.update_count} 帧)")
+        self._wait_for_music()
         pygame.quit()
         sys.exit()
+    
+    def run_replay(self, speed=1.0):
+        """
+        回放录像直到录制结束的那一帧，返回回放统计
+        
+        speed 为相对实时的倍速，0 表示不限速（每个物理帧都渲染一次，不等待）。
+        """
+        end_tick = self.replay.end_tick
+        start = previous = time.perf_counter()
+        accumulator = 0.0
+        running = True
+        try:
+            while running and self.update_count < end_tick:
+                self.profiler.begin_frame()
+                running = self.handle_events()
+                self.profiler.lap('events')
+                
+                if speed > 0:
+                    now = time.perf_counter()
+                    accumulator += (now - previous) * speed
+                    previous = now
+                    steps = 0
+                    max_steps = self.max_catchup_steps * max(1, math.ceil(speed))
+                    while accumulator >= self.sim_dt and steps < max_steps and self.update_count < end_tick:
+                        self.update()
+                        accumulator -= self.sim_dt
+                        steps += 1
+                    accumulator = min(accumulator, self.sim_dt)
+                    self.render_alpha = accumulator / self.sim_dt
+                else:
+                    self.update()
+                    self.render_alpha = 1.0
+                self.profiler.lap('update')
+                
+                self.draw()
+                if speed > 0:
+                    self.clock.tick(FPS)
+                self.profiler.lap('wait')
+                self.profiler.end_frame()
+        finally:
+            self.close_frame_export()  # 异常退出时也要删除共享内存
+        
+        if self.profile_csv:
+            self.dump_profile(self.profile_csv)
+        seconds = time.perf_counter() - start
+        result = {
+            'ticks': self.update_count,
+            'seconds': seconds,
+            'ticks_per_second': self.update_count / seconds if seconds > 0 else 0.0,
+            'level': self.sim.level,
+            'score': self.sim.score,
+            'completed': self.update_count >= end_tick,
+        }
+        print(f"⏩ 回放{'完成' if result['completed'] else '中断'}: {result['ticks']} 帧, 用时 {seconds:.2f} 秒 "
+              f"({result['ticks_per_second']:.0f} 帧/秒), 关卡 {result['level']}, 分数 {result['score']}")
+        self._wait_for_music()
+        pygame.quit()
+        return result
 
 # 添加直接运行的代码
 if __name__ == "__main__":
@@ -0,0 +1,107 @@
+"""
+程序化关卡生成：按随机种子生成与手工关卡同样风格的“组”（小羊金字塔 + 左侧西瓜掩体）
+
+用于压力测试和性能基准：组数和密度可以调到手工第四关的 10～100 倍。
+同一个种子总是生成同样的关卡。
+"""
+
+import argparse
+import random
+import sys
+
+from src.levels.loader import LevelData, dump_source
+from src.utils.constants import *
+
+# 与手工关卡一致的间距：同一行小羊相隔 60，行距 50，西瓜在每行左上方
+SHEEP_SPACING_X = 60
+SHEEP_SPACING_Y = 50
+WATERMELON_SPACING_X = 40
+GROUP_AREA = (350, 150, SCREEN_WIDTH - 30, SCREEN_HEIGHT - 120)  # 金字塔底部中心的取值范围
+
+
+def generate_group(rng, density=1.0):
+    """生成一组：底部中心随机的小羊金字塔，每行左上方一排西瓜"""
+    left, top, right, bottom = GROUP_AREA
+    rows = rng.randint(2, 2 + max(1, round(3 * density)))
+    rows = min(rows, bottom // SHEEP_SPACING_Y + 1)  # 塔顶不能超出屏幕上边
+    base_x = rng.randint(left, right)
+    base_y = rng.randint(min(max(top, (rows - 1) * SHEEP_SPACING_Y), bottom), bottom)
+    shields = max(1, round(2 * density))
+    
+    sheep = []
+    watermelons = []
+    for row in range(rows):
+        count = rows - row
+        row_y = base_y - row * SHEEP_SPACING_Y
+        row_left = base_x - (count - 1) * SHEEP_SPACING_X // 2
+        for i in range(count):
+            sheep.append([row_left + i * SHEEP_SPACING_X, row_y])
+        for i in range(shields):
+            watermelons.append([max(0, row_left - 50 - i * WATERMELON_SPACING_X), max(0, row_y - 50)])
+    return sheep, watermelons
+
+
+def generate_source(seed, groups=10, density=1.0):
+    """生成关卡源数据（与 assets/levels/levelN.json 格式相同）"""
+    rng = random.Random(seed)
+    source = {'title': f"随机关卡 #{seed}：{groups}组", 'groups': []}
+    for number in range(1, groups + 1):
+        sheep, watermelons = generate_group(rng, density)
+        source['groups'].append({'name': f"第{number}组（生成）", 'sheep': sheep, 'watermelons': watermelons})
+    return source
+
+
+def generate_level(seed, groups=10, density=1.0):
+    """生成一关并经过与关卡文件相同的校验"""
+    return LevelData.from_source(generate_source(seed, groups, density), f"seed={seed}")
+
+
+class GeneratedLevels:
+    """
+    生成关卡组成的关卡库，接口与 LevelLibrary 相同（level_count / load）
+    
+    第 n 关使用种子 seed + n - 1。
+    """
+    def __init__(self, seed, groups=10, density=1.0, count=1):
+        self.seed = seed
+        self.groups = groups
+        self.density = density
+        self.count = count
+        self._levels = {}
+    
+    @property
+    def level_count(self):
+        return self.count
+    
+    def load(self, level):
+        """生成第 level 关（从 1 开始）"""
+        data = self._levels.get(level)
+        if data is None:
+            data = generate_level(self.seed + level - 1, self.groups, self.density)
+            self._levels[level] = data
+        return data
+
+
+def main():
+    """把生成的关卡输出为关卡源文件"""
+    parser = argparse.ArgumentParser(description="按随机种子生成关卡源文件（JSON）")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子")
+    parser.add_argument('--groups', type=int, default=10, help="组数（手工第四关为 10 组）")
+    parser.add_argument('--density', type=float, default=1.0, help="每组金字塔的大小倍数")
+    parser.add_argument('--output', default=None, help="输出文件，默认写到标准输出")
+    args = parser.parse_args()
+    
+    source = generate_source(args.seed, args.groups, args.density)
+    data = LevelData.from_source(source, f"seed={args.seed}")
+    text = dump_source(source)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"✅ {source['title']}: {data.sheep_count} 只小羊, {data.watermelon_count} 个西瓜 -> {args.output}",
+              file=sys.stderr)
+    else:
+        print(text, end='')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+关卡加载：assets/levels/levelN.json 源文件编译成二进制缓存，按需只解码正在玩的关卡
+
+源文件格式：
+    {
+      "title": "第一关：...",
+      "groups": [
+        {"name": "第一组（右下角）", "sheep": [[x, y], ...], "watermelons": [[x, y], ...]},
+        ...
+      ]
+    }
+
+缓存文件格式（小端）：
+    文件头   <4sHH       魔数 b'SLVL'、版本号、关卡数
+    索引表   <II * 关卡数  每关记录的偏移和长度
+    关卡记录 <HH         标题字节数、组数
+             标题（UTF-8）
+             array('H')  每组 (小羊数, 西瓜数)
+             array('d')  小羊坐标 x0, y0, x1, y1, ...
+             array('d')  西瓜坐标
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import struct
+import sys
+from array import array
+
+from src.utils.constants import *
+
+LEVELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                          'assets', 'levels')
+
+CACHE_MAGIC = b'SLVL'
+CACHE_VERSION = 1
+_HEADER = struct.Struct('<4sHH')
+_INDEX_ENTRY = struct.Struct('<II')
+_RECORD_HEADER = struct.Struct('<HH')
+
+
+class LevelFormatError(ValueError):
+    """关卡源文件或缓存格式错误"""
+
+
+def _little_endian(values):
+    """array 按本机字节序存储，缓存统一使用小端"""
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+class LevelData:
+    """一关的数据：标题、分组和小羊/西瓜坐标（扁平的 array('d')）"""
+    __slots__ = ('title', 'group_sizes', 'sheep', 'watermelons')
+    
+    def __init__(self, title, group_sizes, sheep, watermelons):
+        self.title = title
+        self.group_sizes = group_sizes  # array('H')：s0, w0, s1, w1, ...
+        self.sheep = sheep
+        self.watermelons = watermelons
+    
+    @property
+    def sheep_count(self):
+        return len(self.sheep) // 2
+    
+    @property
+    def watermelon_count(self):
+        return len(self.watermelons) // 2
+    
+    def offscreen_count(self):
+        """圆心位于屏幕右侧之外的小羊数（玩家看不到或只能看到一部分）"""
+        return sum(1 for x in self.sheep[0::2] if x > SCREEN_WIDTH)
+    
+    def groups(self):
+        """按源文件顺序逐组返回 (小羊坐标列表, 西瓜坐标列表)"""
+        sheep_at = watermelon_at = 0
+        for i in range(0, len(self.group_sizes), 2):
+            sheep_count, watermelon_count = self.group_sizes[i], self.group_sizes[i + 1]
+            sheep = [(self.sheep[2 * j], self.sheep[2 * j + 1])
+                     for j in range(sheep_at, sheep_at + sheep_count)]
+            watermelons = [(self.watermelons[2 * j], self.watermelons[2 * j + 1])
+                           for j in range(watermelon_at, watermelon_at + watermelon_count)]
+            sheep_at += sheep_count
+            watermelon_at += watermelon_count
+            yield sheep, watermelons
+    
+    def to_bytes(self):
+        """编码成缓存中的一条关卡记录"""
+        title = self.title.encode('utf-8')
+        return b''.join([
+            _RECORD_HEADER.pack(len(title), len(self.group_sizes) // 2),
+            title,
+            _little_endian(array('H', self.group_sizes)).tobytes(),
+            _little_endian(array('d', self.sheep)).tobytes(),
+            _little_endian(array('d', self.watermelons)).tobytes(),
+        ])
+    
+    @classmethod
+    def from_bytes(cls, record):
+        """从缓存中的一条关卡记录解码"""
+        title_length, group_count = _RECORD_HEADER.unpack_from(record, 0)
+        offset = _RECORD_HEADER.size
+        title = record[offset:offset + title_length].decode('utf-8')
+        offset += title_length
+        
+        group_sizes = array('H')
+        group_sizes.frombytes(record[offset:offset + group_count * 2 * group_sizes.itemsize])
+        _little_endian(group_sizes)
+        offset += len(group_sizes) * group_sizes.itemsize
+        
+        sheep_count = sum(group_sizes[0::2])
+        watermelon_count = sum(group_sizes[1::2])
+        sheep = array('d')
+        sheep.frombytes(record[offset:offset + sheep_count * 2 * sheep.itemsize])
+        offset += len(sheep) * sheep.itemsize
+        watermelons = array('d')
+        watermelons.frombytes(record[offset:offset + watermelon_count * 2 * watermelons.itemsize])
+        if len(sheep) != sheep_count * 2 or len(watermelons) != watermelon_count * 2:
+            raise LevelFormatError("关卡缓存记录被截断")
+        return cls(title, group_sizes, _little_endian(sheep), _little_endian(watermelons))
+    
+    @classmethod
+    def from_source(cls, source, name='<level>'):
+        """校验 JSON 源数据并转换成关卡数据"""
+        if not isinstance(source, dict):
+            raise LevelFormatError(f"{name}: 顶层必须是对象")
+        title = source.get('title', '')
+        if not isinstance(title, str):
+            raise LevelFormatError(f"{name}: title 必须是字符串")
+        if len(title.encode('utf-8')) > 0xFFFF:
+            raise LevelFormatError(f"{name}: title 超过 65535 字节")
+        groups = source.get('groups')
+        if not isinstance(groups, list) or not groups:
+            raise LevelFormatError(f"{name}: groups 必须是非空列表")
+        if len(groups) > 0xFFFF:
+            raise LevelFormatError(f"{name}: 组数超过 65535")
+        
+        group_sizes = array('H')
+        sheep = array('d')
+        watermelons = array('d')
+        for group_number, group in enumerate(groups, 1):
+            where = f"{name}: 第 {group_number} 组"
+            if not isinstance(group, dict):
+                raise LevelFormatError(f"{where} 必须是对象")
+            for key, target in (('sheep', sheep), ('watermelons', watermelons)):
+                points = group.get(key, [])
+                if not isinstance(points, list):
+                    raise LevelFormatError(f"{where} 的 {key} 必须是坐标列表")
+                if len(points) > 0xFFFF:
+                    raise LevelFormatError(f"{where} 的 {key} 超过 65535 个")
+                for point in points:
+                    if (not isinstance(point, list) or len(point) != 2 or
+                            not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in point)):
+                        raise LevelFormatError(f"{where} 的 {key} 坐标必须是 [x, y]: {point!r}")
+                    x, y = point
+                    # 原有关卡里有放在屏幕右侧之外的小羊，这里只要求坐标有限且不在屏幕左侧或上下之外
+                    if not (math.isfinite(x) and x >= 0 and 0 <= y <= SCREEN_HEIGHT):
+                        raise LevelFormatError(f"{where} 的 {key} 坐标超出范围: {point!r}")
+                    target.extend((x, y))
+                group_sizes.append(len(points))
+        if not sheep:
+            raise LevelFormatError(f"{name}: 关卡中没有小羊")
+        return cls(title, group_sizes, sheep, watermelons)
+
+
+def dump_source(source):
+    """把关卡源数据格式化成 JSON 文本（每组一块，坐标列表写在一行）"""
+    def points(values):
+        return '[' + ', '.join(f'[{x}, {y}]' for x, y in values) + ']'
+    
+    groups = []
+    for group in source['groups']:
+        groups.append('    {\n'
+                      f'      "name": {json.dumps(group.get("name", ""), ensure_ascii=False)},\n'
+                      f'      "sheep": {points(group.get("sheep", []))},\n'
+                      f'      "watermelons": {points(group.get("watermelons", []))}\n'
+                      '    }')
+    return ('{\n'
+            f'  "title": {json.dumps(source.get("title", ""), ensure_ascii=False)},\n'
+            '  "groups": [\n' + ',\n'.join(groups) + '\n  ]\n'
+            '}\n')
+
+
+def find_sources(source_dir=LEVELS_DIR):
+    """按关卡编号返回 levelN.json 源文件路径，编号必须从 1 开始连续"""
+    numbered = {}
+    for filename in os.listdir(source_dir):
+        match = re.fullmatch(r'level(\d+)\.json', filename)
+        if match:
+            numbered[int(match.group(1))] = os.path.join(source_dir, filename)
+    if sorted(numbered) != list(range(1, len(numbered) + 1)):
+        raise LevelFormatError(f"{source_dir}: 关卡编号必须从 1 开始连续，实际为 {sorted(numbered)}")
+    return [numbered[number] for number in sorted(numbered)]
+
+
+def compile_levels(sources):
+    """校验并编译关卡源文件，返回缓存文件内容"""
+    if len(sources) > 0xFFFF:
+        raise LevelFormatError(f"关卡数超过 65535: {len(sources)}")
+    records = []
+    for path in sources:
+        with open(path, encoding='utf-8') as f:
+            try:
+                source = json.load(f)
+            except json.JSONDecodeError as error:
+                raise LevelFormatError(f"{path}: {error}") from None
+        records.append(LevelData.from_source(source, os.path.basename(path)).to_bytes())
+    
+    offset = _HEADER.size + _INDEX_ENTRY.size * len(records)
+    index = []
+    for record in records:
+        index.append(_INDEX_ENTRY.pack(offset, len(record)))
+        offset += len(record)
+    return _HEADER.pack(CACHE_MAGIC, CACHE_VERSION, len(records)) + b''.join(index) + b''.join(records)
+
+
+class LevelLibrary:
+    """
+    关卡库：首次使用时检查缓存是否过期（必要时重新编译），之后只读取并解码请求的关卡
+    
+    缓存无法写入（例如只读安装）时改为把编译结果保存在内存中。
+    """
+    def __init__(self, source_dir=LEVELS_DIR, cache_path=None):
+        self.source_dir = source_dir
+        self.cache_path = cache_path or os.path.join(source_dir, 'levels.bin')
+        self._index = None
+        self._data = None  # 缓存写入失败时的内存副本
+        self._levels = {}
+    
+    @property
+    def level_count(self):
+        return len(self._open())
+    
+    def _is_stale(self, sources):
+        try:
+            cache_mtime = os.path.getmtime(self.cache_path)
+        except OSError:
+            return True
+        return any(os.path.getmtime(path) > cache_mtime for path in sources)
+    
+    def _open(self):
+        """读取缓存的文件头和索引表"""
+        if self._index is not None:
+            return self._index
+        
+        sources = find_sources(self.source_dir)
+        if self._is_stale(sources):
+            data = compile_levels(sources)
+            try:
+                with open(self.cache_path, 'wb') as f:
+                    f.write(data)
+            except OSError:
+                self._data = data
+        
+        header = self._read(0, _HEADER.size)
+        magic, version, count = _HEADER.unpack(header)
+        if magic != CACHE_MAGIC or version != CACHE_VERSION:
+            if self._data is None:
+                # 旧版本缓存：删除后重新编译
+                return self._discard_cache(sources)
+            raise LevelFormatError(f"{self.cache_path}: 不是关卡缓存文件")
+        if count != len(sources):
+            # 源文件被删除时缓存不会比源文件旧，按关卡数判断过期
+            return self._discard_cache(sources)
+        
+        table = self._read(_HEADER.size, _INDEX_ENTRY.size * count)
+        self._index = [entry for entry in _INDEX_ENTRY.iter_unpack(table)]
+        return self._index
+    
+    def _discard_cache(self, sources):
+        """删除过期的缓存后重新打开；删除失败（例如只读安装）时改用内存中的编译结果"""
+        try:
+            os.remove(self.cache_path)
+        except OSError:
+            self._data = compile_levels(sources)
+        return self._open()
+    
+    def _read(self, offset, size):
+        if self._data is not None:
+            return self._data[offset:offset + size]
+        with open(self.cache_path, 'rb') as f:
+            f.seek(offset)
+            return f.read(size)
+    
+    def load(self, level):
+        """加载第 level 关（从 1 开始）"""
+        data = self._levels.get(level)
+        if data is None:
+            index = self._open()
+            if not 1 <= level <= len(index):
+                raise LevelFormatError(f"没有第 {level} 关（共 {len(index)} 关）")
+            offset, size = index[level - 1]
+            data = LevelData.from_bytes(self._read(offset, size))
+            self._levels[level] = data
+        return data
+
+
+# 全局关卡库（Simulation 默认使用）
+level_library = LevelLibrary()
+
+
+def main():
+    """校验关卡源文件并重新编译缓存"""
+    parser = argparse.ArgumentParser(description="校验关卡源文件并编译成二进制缓存")
+    parser.add_argument('--source-dir', default=LEVELS_DIR, help="levelN.json 所在目录")
+    parser.add_argument('--output', default=None, help="缓存文件路径，默认 <source-dir>/levels.bin")
+    args = parser.parse_args()
+    
+    try:
+        sources = find_sources(args.source_dir)
+        data = compile_levels(sources)
+    except LevelFormatError as error:
+        print(f"❌ {error}")
+        sys.exit(1)
+    
+    output = args.output or os.path.join(args.source_dir, 'levels.bin')
+    with open(output, 'wb') as f:
+        f.write(data)
+    library = LevelLibrary(args.source_dir, output)
+    for level in range(1, library.level_count + 1):
+        level_data = library.load(level)
+        print(f"关卡 {level}: {level_data.title} - {len(level_data.group_sizes) // 2} 组, "
+              f"{level_data.sheep_count} 只小羊, {level_data.watermelon_count} 个西瓜")
+        offscreen = level_data.offscreen_count()
+        if offscreen:
+            print(f"    ⚠️ {offscreen} 只小羊在屏幕右侧之外")
+    print(f"✅ 已写入 {output} ({len(data)} 字节)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+批量发射评估：用 NumPy 同时积分大量小鸟，得到每个拉动向量击中的小羊
+"""
+
+import math
+import numpy as np
+from src.utils.constants import *
+
+
+def launch_grid(step=2.0, max_distance=MAX_PULL_DISTANCE):
+    """弹弓拉动范围内的拉动向量网格，形状 (N, 2)"""
+    steps = int(math.floor(max_distance / step))
+    axis = np.arange(-steps, steps + 1) * step
+    grid_x, grid_y = np.meshgrid(axis, axis, indexing='ij')
+    pulls = np.stack([grid_x.ravel(), grid_y.ravel()], axis=1)
+    inside = (pulls ** 2).sum(axis=1) <= max_distance ** 2
+    return pulls[inside]
+
+
+class _CandidateGrid:
+    """把物体按扩展包围盒分桶到均匀网格，查询时每只小鸟只需检测所在格子里的候选物体"""
+    def __init__(self, boxes, cell_size=BATCH_CELL_SIZE):
+        self.cell_size = cell_size
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        self.left = boxes[:, 0].min()
+        self.top = boxes[:, 1].min()
+        self.right = boxes[:, 2].max()
+        self.bottom = boxes[:, 3].max()
+        self.columns = int((self.right - self.left) // cell_size) + 1
+        self.rows = int((self.bottom - self.top) // cell_size) + 1
+        
+        buckets = [[] for _ in range(self.columns * self.rows)]
+        for item, (left, top, right, bottom) in enumerate(boxes):
+            for cx in range(int((left - self.left) // cell_size), int((right - self.left) // cell_size) + 1):
+                for cy in range(int((top - self.top) // cell_size), int((bottom - self.top) // cell_size) + 1):
+                    buckets[cy * self.columns + cx].append(item)
+        
+        # 每个格子的候选列表补齐成定长，-1 表示空位
+        width = max(1, max(len(bucket) for bucket in buckets))
+        self.table = np.full((len(buckets), width), -1, dtype=np.int64)
+        for cell, bucket in enumerate(buckets):
+            self.table[cell, :len(bucket)] = bucket
+    
+    def query(self, x, y):
+        """返回 (落在网格内的小鸟下标, 对应的候选物体下标矩阵)"""
+        inside = np.flatnonzero((x >= self.left) & (x <= self.right) & (y >= self.top) & (y <= self.bottom))
+        if len(inside) == 0:
+            return inside, None
+        cx = ((x[inside] - self.left) // self.cell_size).astype(np.int64)
+        cy = ((y[inside] - self.top) // self.cell_size).astype(np.int64)
+        return inside, self.table[cy * self.columns + cx]
+
+
+def _sweep_circles(px, py, dx, dy, cx, cy, reach):
+    """physics.sweep_circle 的向量化版本（同样的运算顺序），返回每对 (小鸟, 小羊) 是否碰到"""
+    with np.errstate(divide='ignore', invalid='ignore'):  # 哨兵位置是 inf
+        fx = px - cx
+        fy = py - cy
+        c = fx * fx + fy * fy - reach * reach
+        a = dx * dx + dy * dy
+        b = fx * dx + fy * dy
+        discriminant = b * b - a * c
+        toi = (-b - np.sqrt(np.maximum(discriminant, 0))) / a
+    return (c < 0) | ((a != 0) & (b < 0) & (discriminant > 0) & (toi <= 1))
+
+
+def _sweep_boxes(px, py, dx, dy, left, top, right, bottom):
+    """
+    physics.sweep_box 的向量化版本（同样的运算顺序）
+    
+    返回 (toi, side)：没碰到的 toi 为 inf；side 为法线下标（0 左、1 右、2 上、3 下）。
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        entry_x = np.where(dx > 0, (left - px) / dx, (right - px) / dx)
+        exit_x = np.where(dx > 0, (right - px) / dx, (left - px) / dx)
+        entry_y = np.where(dy > 0, (top - py) / dy, (bottom - py) / dy)
+        exit_y = np.where(dy > 0, (bottom - py) / dy, (top - py) / dy)
+    # 某个轴上不动时：在区间内则这个轴不限制，否则永远碰不到
+    inside_x = (left < px) & (px < right)
+    inside_y = (top < py) & (py < bottom)
+    entry_x = np.where(dx == 0, np.where(inside_x, -np.inf, np.inf), entry_x)
+    exit_x = np.where(dx == 0, np.inf, exit_x)
+    entry_y = np.where(dy == 0, np.where(inside_y, -np.inf, np.inf), entry_y)
+    exit_y = np.where(dy == 0, np.inf, exit_y)
+    
+    use_y = entry_y > entry_x
+    t_near = np.where(use_y, entry_y, entry_x)
+    t_far = np.minimum(exit_x, exit_y)
+    side = np.where(use_y, np.where(dy > 0, 2, 3), np.where(dx > 0, 0, 1))
+    hit = (t_near >= 0) & (t_near <= 1) & (t_near < t_far)
+    toi = np.where(hit, t_near, np.inf)
+    
+    # 起点已在矩形内：toi 为 0，法线取最近的边
+    inside = inside_x & inside_y
+    if inside.any():
+        nearest = np.argmin(np.stack(np.broadcast_arrays(px - left, right - px, py - top, bottom - py)), axis=0)
+        toi = np.where(inside, 0.0, toi)
+        side = np.where(inside, nearest, side)
+    return toi, side
+
+
+# _sweep_boxes 的法线，与 physics.sweep_box 相同
+_SIDE_NX = np.array([-1.0, 1.0, 0.0, 0.0])
+_SIDE_NY = np.array([0.0, 0.0, -1.0, 1.0])
+
+
+class BatchShotEvaluator:
+    """
+    批量发射模拟器
+    
+    与 Bird.update 和 Simulation.resolve_collisions 的规则一致：
+    每步先加重力再移动，飞出屏幕后失效；然后用这一步扫过的线段做扫掠检测——
+    这一步从外面进入的西瓜中最早碰到的一个让速度乘以 -0.3（整个穿过时退回接触点），
+    小鸟实际走过的线段与小羊距离小于半径之和 + 5 即击中。
+    小羊被击中不影响小鸟的运动，所以每个拉动向量的结果与关卡当前状态无关。
+    dt 为每步推进的物理帧数，与 Simulation(dt=...) 对应。
+    """
+    def __init__(self, sheep_xy, watermelon_xy, start=(200, 550),
+                 watermelon_size=(60, 60), sheep_radius=SHEEP_RADIUS, bird_radius=BIRD_RADIUS, dt=1.0,
+                 sweep_margin=None):
+        self.sheep_xy = np.asarray(sheep_xy, dtype=np.float64).reshape(-1, 2)
+        self.watermelon_xy = np.asarray(watermelon_xy, dtype=np.float64).reshape(-1, 2)
+        self.start_x, self.start_y = start
+        self.watermelon_w, self.watermelon_h = watermelon_size
+        self.bird_radius = bird_radius
+        self.reach = bird_radius + sheep_radius + 5
+        self.dt = dt
+        self.sweep_margin = BATCH_SWEEP_MARGIN * dt if sweep_margin is None else sweep_margin
+        
+        # 按线段中点查询候选：小羊是以圆心为中心、边长 2 * reach 的方框，西瓜是包围盒向外扩展小鸟半径，
+        # 都再扩展 sweep_margin（半步长不超过它的线段碰到的物体一定在中点的候选里）
+        self.sheep_grid = None
+        if len(self.sheep_xy):
+            sx, sy = self.sheep_xy[:, 0], self.sheep_xy[:, 1]
+            extent = self.reach + self.sweep_margin
+            self.sheep_grid = _CandidateGrid(np.stack([sx - extent, sy - extent,
+                                                       sx + extent, sy + extent], axis=1))
+        self.melon_grid = None
+        if len(self.watermelon_xy):
+            wx, wy = self.watermelon_xy[:, 0], self.watermelon_xy[:, 1]
+            extent = bird_radius + self.sweep_margin
+            self.melon_grid = _CandidateGrid(np.stack([wx - extent, wy - extent,
+                                                       wx + self.watermelon_w + extent,
+                                                       wy + self.watermelon_h + extent], axis=1))
+    
+    @classmethod
+    def from_simulation(cls, sim):
+        """从模拟核心的当前关卡构建（使用同样的步长）"""
+        sheep_x, sheep_y, _ = sim.sheep_table.columns()
+        watermelon_x, watermelon_y, _ = sim.watermelon_table.columns()
+        return cls(np.column_stack((sheep_x, sheep_y)),
+                   np.column_stack((watermelon_x, watermelon_y)),
+                   start=(sim.slingshot_x, sim.slingshot_y), dt=sim.dt)
+    
+    def _candidates(self, grid, count, px, py, x, y):
+        """
+        每只小鸟这一步线段的候选物体，按 [(小鸟下标, 候选下标矩阵)] 分组返回
+        
+        半步长不超过 sweep_margin 的小鸟按线段中点查询网格；更快的小鸟（粗步长时）与所有物体检测。
+        """
+        half_x = (x - px) / 2
+        half_y = (y - py) / 2
+        fast = half_x * half_x + half_y * half_y > self.sweep_margin * self.sweep_margin
+        groups = []
+        slow = np.flatnonzero(~fast)
+        if len(slow):
+            near, candidates = grid.query(px[slow] + half_x[slow], py[slow] + half_y[slow])
+            if len(near):
+                groups.append((slow[near], candidates))
+        fast = np.flatnonzero(fast)
+        if len(fast):
+            groups.append((fast, np.broadcast_to(np.arange(count), (len(fast), count))))
+        return groups
+    
+    def evaluate(self, pulls, max_steps=1000):
+        """
+        模拟每个拉动向量的一次发射
+        
+        返回 (hits, ticks)：hits 为 (N, 小羊数) 的布尔矩阵，
+        ticks 为每只小鸟飞出屏幕前经过的帧数（超过 max_steps 时为 max_steps）。
+        """
+        pulls = np.asarray(pulls, dtype=np.float64).reshape(-1, 2)
+        n = len(pulls)
+        hits = np.zeros((n, len(self.sheep_xy)), dtype=bool)
+        ticks = np.full(n, max_steps, dtype=np.int32)
+        
+        # 小鸟停在限制过的拉伸位置，速度按完整的拉动向量计算
+        distance = np.sqrt((pulls ** 2).sum(axis=1))
+        scale = np.where(distance > MAX_PULL_DISTANCE, MAX_PULL_DISTANCE / np.maximum(distance, 1e-12), 1.0)
+        x = self.start_x - pulls[:, 0] * scale
+        y = self.start_y - pulls[:, 1] * scale
+        vx = pulls[:, 0] * LAUNCH_POWER
+        vy = pulls[:, 1] * LAUNCH_POWER
+        
+        # 末尾补一个哨兵，让候选表里的 -1 指向永远不会命中的位置
+        sheep_x = np.append(self.sheep_xy[:, 0], np.inf)
+        sheep_y = np.append(self.sheep_xy[:, 1], np.inf)
+        # 西瓜包围盒向外扩展小鸟半径（与 Watermelon.sweep_collision 相同）
+        melon_x = np.append(self.watermelon_xy[:, 0], np.inf)
+        melon_y = np.append(self.watermelon_xy[:, 1], np.inf)
+        radius = self.bird_radius
+        melon_left = melon_x - radius
+        melon_top = melon_y - radius
+        melon_right = melon_x + self.watermelon_w + radius
+        melon_bottom = melon_y + self.watermelon_h + radius
+        
+        dt = self.dt
+        index = np.arange(n)  # 仍在飞行的小鸟
+        for tick in range(1, max_steps + 1):
+            px = x.copy()  # 上一步的位置
+            py = y.copy()
+            vy += GRAVITY * dt
+            x += vx * dt
+            y += vy * dt
+            
+            inside = (x >= -50) & (x <= SCREEN_WIDTH + 50) & (y <= SCREEN_HEIGHT + 50)
+            if not inside.all():
+                ticks[index[~inside]] = tick
+                index, x, y, vx, vy = index[inside], x[inside], y[inside], vx[inside], vy[inside]
+                px, py = px[inside], py[inside]
+                if len(index) == 0:
+                    break
+            
+            if self.melon_grid is not None:
+                for near, candidates in self._candidates(self.melon_grid, len(self.watermelon_xy), px, py, x, y):
+                    bx = px[near, None]
+                    by = py[near, None]
+                    toi, side = _sweep_boxes(bx, by, x[near, None] - bx, y[near, None] - by,
+                                             melon_left[candidates], melon_top[candidates],
+                                             melon_right[candidates], melon_bottom[candidates])
+                    # 每只小鸟只处理这一步从外面进入（toi > 0）的西瓜中最早碰到的一个
+                    toi[toi == 0] = np.inf
+                    first = np.argmin(toi, axis=1)
+                    rows = np.arange(len(near))
+                    contact = toi[rows, first]
+                    side = side[rows, first]
+                    melon = candidates[rows, first]
+                    touched = np.isfinite(contact)
+                    target, contact, side, melon = near[touched], contact[touched], side[touched], melon[touched]
+                    approaching = vx[target] * _SIDE_NX[side] + vy[target] * _SIDE_NY[side] < 0
+                    target, contact, melon = target[approaching], contact[approaching], melon[approaching]
+                    if len(target):
+                        # 与 Watermelon.check_collision 相同的重叠判断：终点不在西瓜里说明整个穿过了，退回接触点
+                        tx, ty = x[target], y[target]
+                        overlap = ((tx + radius > melon_x[melon]) & (tx - radius < melon_x[melon] + self.watermelon_w) &
+                                   (ty + radius > melon_y[melon]) & (ty - radius < melon_y[melon] + self.watermelon_h))
+                        back = target[~overlap]
+                        x[back] = px[back] + (x[back] - px[back]) * contact[~overlap]
+                        y[back] = py[back] + (y[back] - py[back]) * contact[~overlap]
+                        vx[target] *= -0.3
+                        vy[target] *= -0.3
+            
+            if self.sheep_grid is not None:
+                for near, candidates in self._candidates(self.sheep_grid, len(self.sheep_xy), px, py, x, y):
+                    bx = px[near, None]
+                    by = py[near, None]
+                    touched = _sweep_circles(bx, by, x[near, None] - bx, y[near, None] - by,
+                                             sheep_x[candidates], sheep_y[candidates], self.reach)
+                    rows, columns = np.nonzero(touched)
+                    if len(rows):
+                        hits[index[near[rows]], candidates[rows, columns]] = True
+        
+        return hits, ticks
+    
+    def hit_map(self, pulls, max_steps=1000):
+        """{拉动向量: 击中的小羊下标元组}"""
+        hits, _ = self.evaluate(pulls, max_steps)
+        pulls = np.asarray(pulls, dtype=np.float64).reshape(-1, 2)
+        return {(float(px), float(py)): tuple(np.flatnonzero(row).tolist())
+                for (px, py), row in zip(pulls, hits)}
+
+
+def main():
+    """打印每一关的批量评估结果"""
+    import argparse
+    import time
+    from src.simulation.core import Simulation
+    
+    parser = argparse.ArgumentParser(description="批量评估每个拉动向量能击中的小羊")
+    parser.add_argument('--step', type=float, default=2.0, help="拉动向量网格间距（像素）")
+    parser.add_argument('--levels', type=int, nargs='*', default=None, help="要评估的关卡，默认全部")
+    parser.add_argument('--dt', type=float, default=1.0, help="模拟步长（物理帧），大于 1 时更快但结果是近似的")
+    args = parser.parse_args()
+    
+    sim = Simulation(dt=args.dt)
+    pulls = launch_grid(args.step)
+    for level in args.levels or range(1, sim.level_count + 1):
+        sim.setup_level(level)
+        evaluator = BatchShotEvaluator.from_simulation(sim)
+        start = time.perf_counter()
+        hits, _ = evaluator.evaluate(pulls, math.ceil(1000 / args.dt))
+        elapsed = time.perf_counter() - start
+        reachable = int(hits.any(axis=0).sum())
+        print(f"关卡 {level}: {len(pulls)} 个拉动向量, 可击中 {reachable}/{len(sim.sheeps)} 只小羊, "
+              f"单发最多 {int(hits.sum(axis=1).max())} 只, 用时 {elapsed * 1000:.1f} ms "
+              f"({len(pulls) / elapsed:.0f} 发/秒)")
+
+
+if __name__ == "__main__":
+    main()
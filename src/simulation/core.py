@@ -0,0 +1,228 @@
+"""
+无显示依赖的模拟核心：关卡、小鸟、小羊、西瓜、计分和关卡完成判定
+"""
+
+import random
+
+from src.entities.bird import BirdQueue
+from src.entities.sheep import Sheep
+from src.entities.watermelon import Watermelon
+from src.entities.table import EntityTable
+from src.levels.loader import level_library
+from src.simulation.snapshot import save_snapshot, load_snapshot
+from src.utils.spatial import SpatialHash
+from src.utils.physics import clamp_pull
+from src.utils.constants import *
+
+
+class Simulation:
+    """游戏世界状态与逐帧推进，不依赖屏幕、字体和音频"""
+    def __init__(self, level=1, max_birds=500, levels=None, dt=1.0, rng=random, particles=True):
+        self.levels = levels or level_library  # 关卡来源（关卡文件或程序生成）
+        self.dt = dt  # 每个 step 推进的物理帧数，无头批量模拟可以用粗步长（碰撞是扫掠检测，不会漏掉）
+        self.rng = rng  # 小羊/西瓜外观的随机源，需要可复现时传入 random.Random 实例
+        self.particles = particles  # 是否发射尾迹和西瓜破裂粒子，无头模拟可以关掉
+        self.sheeps = []
+        self.watermelons = []
+        
+        # 本关小羊/西瓜的位置和存活标记（按列存放，供批量评估和快照直接读取）
+        self.sheep_table = EntityTable()
+        self.watermelon_table = EntityTable()
+        
+        # 碰撞粗检测的空间索引
+        self.sheep_index = SpatialHash()
+        self.watermelon_index = SpatialHash()
+        
+        # 小鸟管理
+        self.bird_queue = None  # 按需创建小鸟的队列
+        self.bird_colors = [RED, BLUE, GREEN, PURPLE, ORANGE]  # 不同颜色的小鸟
+        self.max_birds = max_birds  # 每关最多500只小鸟
+        self.slingshot_x = 200
+        self.slingshot_y = 550
+        
+        # 游戏状态
+        self.score = 0
+        self.level = level
+        self.level_count = self.levels.level_count
+        self.game_over = False
+        self.level_complete = False
+        self.alive_count = 0
+        self.tick = 0
+        self.last_hits = []  # 最近一次 step 中被击中的小羊
+        
+        # 初始化关卡
+        self.setup_level()
+    
+    def setup_level(self, level=None):
+        """设置关卡（关卡布局见 assets/levels/levelN.json）"""
+        if level is not None:
+            self.level = level
+        self.sheeps = []
+        self.watermelons = []
+        self.level_complete = False
+        self.last_hits = []
+        
+        # 创建小鸟队列
+        self.bird_queue = BirdQueue(self.max_birds, self.bird_colors, self.slingshot_x, self.slingshot_y)
+        
+        # 关卡数据默认来自 assets/levels，按组依次创建小羊和西瓜（实体直接写入本关的实体表）
+        data = self.levels.load(self.level)
+        self.sheep_table = EntityTable()
+        self.watermelon_table = EntityTable()
+        for sheep_positions, watermelon_positions in data.groups():
+            self.sheeps.extend(Sheep(x, y, self.sheep_table, self.rng) for x, y in sheep_positions)
+            self.watermelons.extend(Watermelon(x, y, table=self.watermelon_table, rng=self.rng)
+                                    for x, y in watermelon_positions)
+        
+        self.alive_count = sum(1 for sheep in self.sheeps if sheep.alive)
+        self._build_spatial_index()
+    
+    def _build_spatial_index(self):
+        """把本关的小羊和西瓜插入空间索引（西瓜静止，只需插入一次）"""
+        self.sheep_index.clear()
+        self.watermelon_index.clear()
+        for order, sheep in enumerate(self.sheeps):
+            if sheep.alive:
+                self.sheep_index.insert(sheep, *sheep.bounds(), order=order)
+        for watermelon in self.watermelons:
+            self.watermelon_index.insert(watermelon, *watermelon.bounds())
+    
+    def snapshot(self):
+        """当前世界状态的二进制快照"""
+        return save_snapshot(self)
+    
+    def restore(self, data):
+        """恢复到快照时的世界状态"""
+        load_snapshot(self, data)
+    
+    def get_current_bird(self):
+        """获取当前活跃的小鸟"""
+        return self.bird_queue.current
+    
+    def next_bird(self):
+        """切换到下一只小鸟"""
+        # 所有小鸟都用完时返回 False
+        return self.bird_queue.advance()
+    
+    def launch(self, power_x, power_y):
+        """以拉动向量发射当前小鸟，小鸟不可发射时返回 False"""
+        current_bird = self.get_current_bird()
+        if not current_bird or current_bird.launched:
+            return False
+        # 小鸟停在弹弓最大拉伸范围内，发射速度仍按完整的拉动向量计算
+        pull_x, pull_y = clamp_pull(power_x, power_y)
+        current_bird.dragging = False
+        current_bird.x = current_bird.start_x - pull_x
+        current_bird.y = current_bird.start_y - pull_y
+        self.bird_queue.launch(power_x, power_y)
+        return True
+    
+    def reset_bird(self):
+        """重置当前小鸟"""
+        current_bird = self.get_current_bird()
+        if current_bird:
+            self.bird_queue.reset_current()
+    
+    def next_level(self):
+        """进入下一关，全部通关时游戏结束"""
+        if not self.level_complete:
+            return False
+        self.level += 1
+        if self.level > self.level_count:
+            self.game_over = True
+        else:
+            self.setup_level()
+        return True
+    
+    def step(self, action=None):
+        """
+        推进一个物理帧，返回本帧得分
+        
+        action 为 None 或拉动向量 (power_x, power_y)，后者会先发射当前小鸟。
+        """
+        if action is not None:
+            self.launch(*action)
+        
+        score_before = self.score
+        self.last_hits = []
+        self.tick += 1
+        
+        current_bird = self.get_current_bird()
+        if not current_bird:
+            return 0
+        
+        # 更新当前小鸟和仍在飞行的小鸟
+        for bird in self.bird_queue.active_birds():
+            bird.update(dt=self.dt, trail=self.particles)
+        
+        # 如果当前小鸟已经发射且不再活跃，切换到下一只
+        if current_bird.launched and not current_bird.active:
+            if not self.next_bird():
+                # 所有小鸟都用完了，检查关卡是否完成
+                if self.alive_count == 0 and not self.level_complete:
+                    self.level_complete = True
+                    self.score += 500 * self.level
+                elif self.alive_count and not self.level_complete:
+                    # 所有小鸟用完但还有羊存活，游戏结束
+                    self.game_over = True
+        
+        # 检测碰撞（只检测当前活跃的小鸟）
+        if current_bird.active:
+            self.resolve_collisions(current_bird)
+        
+        # 检查关卡是否完成（所有羊都被消灭）
+        if self.alive_count == 0 and not self.level_complete:
+            self.level_complete = True
+            self.score += 500 * self.level
+        
+        return self.score - score_before
+    
+    def resolve_collisions(self, bird):
+        """
+        处理小鸟与西瓜、小羊的碰撞
+        
+        检测的是小鸟这一帧从上一帧位置到当前位置扫过的线段（先用它的包围盒查询空间索引），
+        飞得再快也不会穿过物体。
+        
+        西瓜：只处理这一帧从外面进入的西瓜中最早碰到的一个，小鸟速度乘以 -0.3。
+        起点已经在西瓜里（toi 为 0）时不再反弹，落在西瓜上的小鸟会慢慢穿出去，不会停在上面；
+        这一帧整个穿过了西瓜（粗步长时）则退回接触点。
+        小羊：小鸟实际走过的线段与小羊距离小于半径之和 + 5 即击中。
+        """
+        contact = None
+        for watermelon in self.watermelon_index.query(*bird.swept_bounds()):
+            hit = watermelon.sweep_collision(bird)
+            if hit is not None and hit[0] > 0 and (contact is None or hit[0] < contact[0]):
+                contact = hit + (watermelon,)
+        if contact is not None:
+            toi, nx, ny, watermelon = contact
+            if bird.velocity_x * nx + bird.velocity_y * ny < 0:
+                if self.particles:
+                    watermelon.crack()
+                if not watermelon.check_collision(bird):
+                    bird.x = bird.prev_x + (bird.x - bird.prev_x) * toi
+                    bird.y = bird.prev_y + (bird.y - bird.prev_y) * toi
+                bird.velocity_x *= -0.3
+                bird.velocity_y *= -0.3
+        
+        for sheep in self.sheep_index.query(*bird.swept_bounds(5)):
+            if sheep.alive and bird.sweep_collision(sheep) is not None:
+                sheep.hit()
+                if self.particles:
+                    sheep.burst()
+                self.sheep_index.remove(sheep)
+                self.alive_count -= 1
+                self.last_hits.append(sheep)
+                self.score += 100
+    
+    def simulate_shot(self, power_x, power_y, max_steps=2000):
+        """发射当前小鸟并推进到它飞出屏幕（或关卡结束），返回这一发的得分"""
+        bird = self.get_current_bird()
+        if not self.launch(power_x, power_y):
+            return 0
+        gained = 0
+        for _ in range(max_steps):
+            gained += self.step()
+            if self.get_current_bird() is not bird or self.level_complete or self.game_over:
+                break
+        return gained
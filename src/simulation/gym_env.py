@@ -0,0 +1,510 @@
+"""
+强化学习环境：把“一关 + 一发一发地打”包装成 Gymnasium 接口，以及多进程的向量化版本
+
+    动作      拉动向量 (power_x, power_y)，超出弹弓最大拉伸距离时按方向截断
+    一步      发射当前小鸟并推进到它飞出屏幕（不需要窗口，也不按 FPS 等待）
+    观测      sheep        (最多小羊数, 3)  x、y、是否存活
+              watermelons  (最多西瓜数, 3)  x、y、是否切开
+              status       (3,)            关卡、剩余小鸟、剩余小羊
+              frame        (高, 宽, 3)      可选，缩小的游戏画面
+    奖励      这一发的得分（每只小羊 100，清空本关另加 500 × 关卡）
+    回合结束  清空本关，或小鸟用完（terminated）；打满 max_shots 发仍未结束时截断（truncated）
+
+实体数组按可选关卡中最多的小羊/西瓜数补零，所有关卡的观测形状相同。
+reset(seed=n) 同时决定关卡选择和小羊/西瓜外观（西瓜是否切开也在观测里），同一个种子得到同样的回合。
+gymnasium 是可选依赖：没有安装时接口不变，只是没有 observation_space / action_space。
+
+    python3 -m src.simulation.gym_env --envs 8              # 随机动作的吞吐量测试
+    python3 -m src.simulation.gym_env --check-determinism   # 检查同一个种子的回合是否完全一致
+"""
+
+import argparse
+import hashlib
+import math
+import multiprocessing
+import os
+import random
+import time
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+import pygame
+
+from src.environment.background import Background
+from src.environment.static_world import StaticWorld
+from src.simulation.core import Simulation
+from src.utils.physics import clamp_pull
+from src.utils.constants import *
+
+try:
+    import gymnasium
+    from gymnasium import spaces
+except ImportError:
+    gymnasium = None
+    spaces = None
+
+# 向量化环境每一步的动作和结果（每个环境一份）
+_STEP_SPECS = {
+    'action': ((2,), np.float32),
+    'reward': ((), np.float32),
+    'terminated': ((), np.bool_),
+    'truncated': ((), np.bool_),
+    'level': ((), np.int32),
+    'level_complete': ((), np.bool_),
+    'stuck': ((), np.bool_),
+    'episode_score': ((), np.int32),  # 回合结束或截断时的总得分，否则为 0
+}
+_INFO_KEYS = ('level', 'level_complete', 'stuck', 'episode_score')
+
+
+def observation_specs(max_sheep, max_watermelons, frame_size=None):
+    """观测各项的 {名字: (形状, dtype)}，frame_size 为 (宽, 高)"""
+    specs = {
+        'sheep': ((max_sheep, 3), np.float32),
+        'watermelons': ((max_watermelons, 3), np.float32),
+        'status': ((3,), np.int32),
+    }
+    if frame_size is not None:
+        width, height = frame_size
+        specs['frame'] = ((height, width, 3), np.uint8)
+    return specs
+
+
+def _box(shape, dtype):
+    """观测项对应的 gymnasium Box"""
+    if dtype == np.uint8:
+        return spaces.Box(0, 255, shape, dtype)
+    if np.issubdtype(dtype, np.integer):
+        return spaces.Box(0, np.iinfo(dtype).max, shape, dtype)
+    return spaces.Box(-np.inf, np.inf, shape, dtype)
+
+
+class _FrameRenderer:
+    """离屏绘制静态世界层和小鸟，再缩小到观测的尺寸"""
+    def __init__(self, size, rng):
+        self.size = size
+        self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.small = pygame.Surface(size)
+        self.world = StaticWorld(Background(rng=rng))
+    
+    def reset(self):
+        """新回合：重新生成云朵并整层重建"""
+        background = self.world.background
+        background.clouds = []
+        background.generate_clouds()
+        self.world.invalidate()
+    
+    def render(self, sim):
+        """全尺寸画面"""
+        self.world.draw(self.screen, sim.watermelons, sim.sheeps)
+        for bird in sim.bird_queue.active_birds():
+            bird.draw(self.screen)
+        return self.screen
+    
+    def write(self, sim, out):
+        """把缩小后的画面写进 out（形状为 (高, 宽, 3)）"""
+        pygame.transform.smoothscale(self.render(sim), self.size, self.small)
+        out[...] = pygame.surfarray.pixels3d(self.small).transpose(1, 0, 2)
+
+
+class ShotEnv(gymnasium.Env if gymnasium is not None else object):
+    """
+    单个环境：一个回合是一关
+    
+    level 为 None 时每次 reset 从关卡库里随机选一关，也可以用 reset(options={'level': n}) 指定。
+    frame_size=(宽, 高) 时观测中多一张缩小的游戏画面。
+    """
+    metadata = {'render_modes': ['rgb_array']}
+    
+    def __init__(self, level=1, levels=None, birds=ENV_BIRDS, frame_size=None, dt=1.0,
+                 shot_max_steps=ENV_SHOT_MAX_STEPS, max_shots=ENV_MAX_SHOTS, render_mode=None):
+        # 外观和云朵用本环境自己的随机源，不受全局 random 影响；无头模拟不发射粒子
+        self._random = random.Random()
+        self._rng = np.random.default_rng()
+        self.sim = Simulation(level=level or 1, max_birds=birds, levels=levels, dt=dt,
+                              rng=self._random, particles=False)
+        self.level = level
+        self.frame_size = tuple(frame_size) if frame_size else None
+        self.shot_steps = math.ceil(shot_max_steps / dt)
+        self.max_shots = max_shots
+        self.shots = 0  # 本回合已经打的发数
+        self.render_mode = render_mode
+        self._renderer = None
+        
+        # 观测数组按可选关卡中最多的小羊/西瓜数分配
+        choices = [level] if level else range(1, self.sim.level_count + 1)
+        data = [self.sim.levels.load(number) for number in choices]
+        self.max_sheep = max(item.sheep_count for item in data)
+        self.max_watermelons = max(item.watermelon_count for item in data)
+        self.specs = observation_specs(self.max_sheep, self.max_watermelons, self.frame_size)
+        if spaces is not None:
+            self.observation_space = spaces.Dict({name: _box(*spec) for name, spec in self.specs.items()})
+            self.action_space = spaces.Box(-MAX_PULL_DISTANCE, MAX_PULL_DISTANCE, (2,), np.float32)
+    
+    def reset(self, seed=None, options=None):
+        """开始新的一回合，返回 (观测, info)"""
+        if gymnasium is not None:
+            super().reset(seed=seed)
+        if seed is not None:
+            self._rng = np.random.default_rng(seed)
+            self._random.seed(seed)
+        level = (options or {}).get('level', self.level)
+        if not level:
+            level = int(self._rng.integers(1, self.sim.level_count + 1))
+        
+        sim = self.sim
+        sim.score = 0
+        sim.tick = 0
+        sim.game_over = False
+        sim.setup_level(level)
+        if len(sim.sheeps) > self.max_sheep or len(sim.watermelons) > self.max_watermelons:
+            raise ValueError(f"第 {level} 关的小羊/西瓜数超过了观测数组的大小")
+        self.shots = 0
+        if self._renderer is not None:
+            self._renderer.reset()
+        return self.observation(), {'level': level}
+    
+    def step(self, action):
+        """打一发，返回 (观测, 奖励, terminated, truncated, info)"""
+        reward, terminated, truncated, info = self._shot(action)
+        return self.observation(), float(reward), terminated, truncated, info
+    
+    def _shot(self, action):
+        """发射当前小鸟并推进到它飞出屏幕，返回 (得分, terminated, truncated, info)"""
+        sim = self.sim
+        bird = sim.get_current_bird()
+        alive = [sheep.alive for sheep in sim.sheeps]
+        
+        reward = sim.simulate_shot(*clamp_pull(float(action[0]), float(action[1])), self.shot_steps)
+        self.shots += 1
+        terminated = sim.level_complete or sim.game_over
+        stuck = not terminated and sim.get_current_bird() is bird and bird.active
+        if stuck:
+            # 小鸟卡住了，和求解器一样像玩家按 R 那样收回（不消耗小鸟，但算在 max_shots 里）
+            sim.reset_bird()
+        truncated = not terminated and self.shots >= self.max_shots
+        
+        if self._renderer is not None:
+            world = self._renderer.world
+            for i, sheep in enumerate(sim.sheeps):
+                if alive[i] != sheep.alive:
+                    world.invalidate(sheep.get_rect())
+        info = {'level': sim.level, 'level_complete': sim.level_complete, 'stuck': stuck}
+        return reward, terminated, truncated, info
+    
+    def observation(self):
+        """新分配一份观测"""
+        out = {name: np.zeros(shape, dtype) for name, (shape, dtype) in self.specs.items()}
+        self.write_observation(out)
+        return out
+    
+    def write_observation(self, out):
+        """把当前观测写进已有的数组（向量化环境直接写进共享内存）"""
+        sim = self.sim
+        count = len(sim.sheeps)
+        sheep = out['sheep']
+        sheep[count:] = 0
+        if count:
+            x, y, alive = sim.sheep_table.columns()
+            sheep[:count, 0] = x
+            sheep[:count, 1] = y
+            sheep[:count, 2] = alive
+        
+        count = len(sim.watermelons)
+        watermelons = out['watermelons']
+        watermelons[count:] = 0
+        if count:
+            x, y, _ = sim.watermelon_table.columns()
+            watermelons[:count, 0] = x
+            watermelons[:count, 1] = y
+            watermelons[:count, 2] = [watermelon.is_cut for watermelon in sim.watermelons]
+        
+        out['status'][:] = (sim.level, sim.bird_queue.remaining(), sim.alive_count)
+        if 'frame' in out:
+            self._get_renderer().write(sim, out['frame'])
+    
+    def _get_renderer(self):
+        if self._renderer is None:
+            self._renderer = _FrameRenderer(self.frame_size or (SCREEN_WIDTH, SCREEN_HEIGHT), self._random)
+        return self._renderer
+    
+    def render(self):
+        """render_mode 为 'rgb_array' 时返回全尺寸画面 (高, 宽, 3)"""
+        if self.render_mode != 'rgb_array':
+            return None
+        return pygame.surfarray.array3d(self._get_renderer().render(self.sim)).transpose(1, 0, 2)
+    
+    def close(self):
+        self._renderer = None
+
+
+class _SharedArrays:
+    """
+    放在 multiprocessing.shared_memory 中的一组 numpy 数组
+    
+    fork 启动的子进程直接继承；spawn 时按共享内存的名字重新附加。
+    子进程与主进程共用同一个 resource_tracker，只有创建它的进程 close 时才 unlink。
+    """
+    def __init__(self, specs):
+        self.specs = specs
+        self.arrays = {}
+        self._blocks = {}
+        self._owner = os.getpid()
+        for name, (shape, dtype) in specs.items():
+            size = max(1, math.prod(shape) * np.dtype(dtype).itemsize)
+            self._attach(name, shared_memory.SharedMemory(create=True, size=size))
+    
+    def _attach(self, name, block):
+        shape, dtype = self.specs[name]
+        self._blocks[name] = block
+        self.arrays[name] = np.ndarray(shape, dtype, buffer=block.buf)
+    
+    def __getstate__(self):
+        return self.specs, {name: block.name for name, block in self._blocks.items()}
+    
+    def __setstate__(self, state):
+        self.specs, names = state
+        self.arrays = {}
+        self._blocks = {}
+        self._owner = None
+        for name, block_name in names.items():
+            self._attach(name, shared_memory.SharedMemory(name=block_name))
+    
+    def close(self):
+        self.arrays = {}
+        for block in self._blocks.values():
+            try:
+                block.close()
+            except BufferError:
+                pass  # 外面还拿着 copy=False 返回的视图，等它们释放后内存才会回收
+            if self._owner == os.getpid():
+                block.unlink()
+        self._blocks = {}
+
+
+def _serve(conn, envs, indices, observations, step):
+    """处理主进程的命令直到收到 close"""
+    rows = [{name: array[index] for name, array in observations.items()} for index in indices]
+    conn.send(None)
+    while True:
+        command, payload = conn.recv()
+        if command == 'reset':
+            for env, index, row in zip(envs, indices, rows):
+                seed = None if payload is None else payload + index
+                _, info = env.reset(seed=seed)
+                step['level'][index] = info['level']
+                env.write_observation(row)
+        elif command == 'step':
+            for env, index, row in zip(envs, indices, rows):
+                reward, terminated, truncated, info = env._shot(step['action'][index])
+                step['reward'][index] = reward
+                step['terminated'][index] = terminated
+                step['truncated'][index] = truncated
+                step['level'][index] = info['level']
+                step['level_complete'][index] = info['level_complete']
+                step['stuck'][index] = info['stuck']
+                step['episode_score'][index] = env.sim.score if terminated or truncated else 0
+                if terminated or truncated:
+                    env.reset()
+                env.write_observation(row)
+        elif command == 'close':
+            return
+        conn.send(None)
+
+
+def _worker(conn, env_kwargs, indices, observations, results):
+    """工作进程：依次推进分到的几个环境，观测和结果直接写进共享内存，管道只传命令"""
+    envs = []
+    try:
+        envs = [ShotEnv(**env_kwargs) for _ in indices]
+        _serve(conn, envs, indices, observations.arrays, results.arrays)
+    except (KeyboardInterrupt, EOFError):
+        pass
+    except Exception:
+        conn.send(traceback.format_exc())
+    finally:
+        for env in envs:
+            env.close()
+        observations.close()
+        results.close()
+        conn.close()
+
+
+class ShotVectorEnv:
+    """
+    num_envs 个 ShotEnv 分到 workers 个子进程里并行推进（接口与 gymnasium 的向量化环境相同）
+    
+    观测、动作和每一步的结果都放在共享内存里，每一步只通过管道发一条命令。
+    结束或截断的环境在同一步里自动 reset，返回的是新回合的第一个观测，结束时的总得分在 info['episode_score'] 里。
+    copy=False 时返回的观测直接是共享内存的视图，下一次 reset/step 会覆盖它。
+    """
+    def __init__(self, num_envs, workers=None, copy=True, context=None, **env_kwargs):
+        self.num_envs = num_envs
+        self.copy = copy
+        self._closed = True
+        
+        # 在主进程里建一个环境，确定观测形状和 spaces
+        template = ShotEnv(**env_kwargs)
+        self.single_observation_space = getattr(template, 'observation_space', None)
+        self.single_action_space = getattr(template, 'action_space', None)
+        if gymnasium is not None:
+            self.observation_space = gymnasium.vector.utils.batch_space(self.single_observation_space, num_envs)
+            self.action_space = gymnasium.vector.utils.batch_space(self.single_action_space, num_envs)
+        specs = template.specs
+        template.close()
+        
+        self._observations = _SharedArrays({name: ((num_envs,) + shape, dtype)
+                                            for name, (shape, dtype) in specs.items()})
+        self._results = _SharedArrays({name: ((num_envs,) + shape, dtype)
+                                       for name, (shape, dtype) in _STEP_SPECS.items()})
+        self._closed = False
+        
+        context = multiprocessing.get_context(context)
+        workers = max(1, min(num_envs, workers or os.cpu_count()))
+        self._pipes = []
+        self._processes = []
+        for indices in np.array_split(np.arange(num_envs), workers):
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, daemon=True,
+                                      args=(child, env_kwargs, indices.tolist(), self._observations, self._results))
+            process.start()
+            child.close()
+            self._pipes.append(parent)
+            self._processes.append(process)
+        self._wait()
+    
+    def _wait(self):
+        """等所有工作进程完成当前命令"""
+        errors = [message for message in [pipe.recv() for pipe in self._pipes] if message is not None]
+        if errors:
+            self.close()
+            raise RuntimeError(f"环境工作进程出错：\n{errors[0]}")
+    
+    def _call(self, command, payload=None):
+        for pipe in self._pipes:
+            pipe.send((command, payload))
+        self._wait()
+    
+    def _observation(self):
+        arrays = self._observations.arrays
+        return {name: array.copy() for name, array in arrays.items()} if self.copy else dict(arrays)
+    
+    def reset(self, seed=None, options=None):
+        """重置所有环境（第 i 个环境的种子为 seed + i），返回 (观测, info)"""
+        self._call('reset', seed)
+        return self._observation(), {'level': self._results.arrays['level'].copy()}
+    
+    def step(self, actions):
+        """每个环境打一发，actions 形状为 (num_envs, 2)"""
+        step = self._results.arrays
+        step['action'][:] = np.asarray(actions, dtype=np.float32).reshape(self.num_envs, 2)
+        self._call('step')
+        infos = {name: step[name].copy() for name in _INFO_KEYS}
+        return (self._observation(), step['reward'].copy(), step['terminated'].copy(),
+                step['truncated'].copy(), infos)
+    
+    def close(self):
+        """结束工作进程并释放共享内存"""
+        if self._closed:
+            return
+        self._closed = True
+        for pipe in self._pipes:
+            try:
+                pipe.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for pipe in self._pipes:
+            pipe.close()
+        self._observations.close()
+        self._results.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _episode_digest(env, seed, actions):
+    """用种子 seed reset 后依次打 actions，返回整个回合观测和奖励的摘要"""
+    digest = hashlib.sha256()
+    
+    def feed(obs):
+        for name in sorted(obs):
+            digest.update(obs[name].tobytes())
+    
+    obs, _ = env.reset(seed=seed)
+    feed(obs)
+    for action in actions:
+        obs, reward, terminated, truncated, _ = env.step(action)
+        feed(obs)
+        digest.update(repr((reward, terminated, truncated)).encode())
+        if terminated or truncated:
+            break
+    return digest.hexdigest()
+
+
+def check_determinism(seed=0, shots=20, **env_kwargs):
+    """
+    同一个种子的回合必须完全一致：同一个环境 reset 两次、再新建一个环境，三次的观测和奖励逐字节相同
+    
+    中间故意消耗全局 random，确认环境不依赖全局随机数状态。
+    """
+    actions = np.random.default_rng(seed).uniform(-MAX_PULL_DISTANCE, MAX_PULL_DISTANCE, (shots, 2))
+    env = ShotEnv(**env_kwargs)
+    digests = [_episode_digest(env, seed, actions)]
+    random.random()
+    digests.append(_episode_digest(env, seed, actions))
+    env.close()
+    random.random()
+    env = ShotEnv(**env_kwargs)
+    digests.append(_episode_digest(env, seed, actions))
+    env.close()
+    return len(set(digests)) == 1
+
+
+def main():
+    """吞吐量测试：所有环境都用随机拉动向量，报告每秒打出的发数"""
+    parser = argparse.ArgumentParser(description="强化学习环境吞吐量测试（随机动作）")
+    parser.add_argument('--envs', type=int, default=8, help="环境数")
+    parser.add_argument('--workers', type=int, default=None, help="工作进程数，默认每个核心一个")
+    parser.add_argument('--shots', type=int, default=20000, help="总共打多少发")
+    parser.add_argument('--level', type=int, default=None, help="关卡，默认每回合随机")
+    parser.add_argument('--frame', type=int, nargs=2, default=None, metavar=('W', 'H'), help="观测中加入缩小的画面")
+    parser.add_argument('--dt', type=float, default=1.0, help="模拟步长（物理帧）")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子")
+    parser.add_argument('--check-determinism', action='store_true', help="只检查同一个种子的回合是否完全一致")
+    args = parser.parse_args()
+    
+    if args.check_determinism:
+        ok = check_determinism(args.seed, level=args.level, frame_size=args.frame, dt=args.dt)
+        print("✅ 同一个种子的回合完全一致" if ok else "❌ 同一个种子的回合不一致")
+        if not ok:
+            raise SystemExit(1)
+        return
+    
+    rng = np.random.default_rng(args.seed)
+    steps = max(1, args.shots // args.envs)
+    episodes = cleared = 0
+    with ShotVectorEnv(args.envs, args.workers, copy=False, level=args.level,
+                       frame_size=args.frame, dt=args.dt) as envs:
+        envs.reset(seed=args.seed)
+        start = time.perf_counter()
+        for _ in range(steps):
+            actions = rng.uniform(-MAX_PULL_DISTANCE, MAX_PULL_DISTANCE, (args.envs, 2))
+            _, _, terminated, truncated, infos = envs.step(actions)
+            episodes += int((terminated | truncated).sum())
+            cleared += int(infos['level_complete'].sum())
+        elapsed = time.perf_counter() - start
+    shots = steps * args.envs
+    print(f"{shots} 发, 用时 {elapsed:.2f} 秒, {shots / elapsed:.0f} 发/秒, "
+          f"结束 {episodes} 个回合（其中清空关卡 {cleared} 个）")
+
+
+if __name__ == "__main__":
+    main()
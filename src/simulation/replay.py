@@ -0,0 +1,108 @@
+"""
+输入录像：把玩家输入按物理帧序号记录成紧凑的二进制日志，回放时按同样的帧序号重新施加
+
+文件格式（小端）：
+    文件头  <4sHQI qIdI  魔数 b'SRPL'、版本号、随机种子、物理帧率、
+                         生成关卡的种子（-1 表示内置关卡）、组数、密度、关卡数
+    事件    <IBhh        物理帧序号、输入类型、x、y（每条 9 字节）
+
+回放前用同一个种子重置 random 和粒子池，小羊/西瓜外观、小鸟拖尾和粒子特效都与录制时一致。
+"""
+
+import struct
+
+from src.levels.generator import GeneratedLevels
+
+REPLAY_MAGIC = b'SRPL'
+REPLAY_VERSION = 3  # 2：扫掠碰撞检测（物理规则变了，旧录像回放结果会不同）；3：加宽文件头字段
+_HEADER = struct.Struct('<4sHQIqIdI')
+
+# 文件头字段能表示的最大值（main.py 按这些范围检查命令行参数）
+MAX_SEED = 2 ** 64 - 1          # 随机种子
+MAX_LEVEL_SEED = 2 ** 63 - 1    # 生成关卡的种子
+MAX_COUNT = 2 ** 32 - 1         # 物理帧率、组数、关卡数
+_EVENT = struct.Struct('<IBhh')
+
+# 输入类型
+INPUT_PRESS = 1       # 按下鼠标（开始拖动小鸟）
+INPUT_DRAG = 2        # 拖动中鼠标位置变化
+INPUT_RELEASE = 3     # 松开鼠标（发射）
+INPUT_RESET = 4       # R 键
+INPUT_TRAJECTORY = 5  # T 键
+INPUT_NEXT_LEVEL = 6  # N 键
+INPUT_SOUND = 7       # M 键
+INPUT_END = 8         # 录制结束
+INPUT_SAVE = 9        # F5 快速存档
+INPUT_LOAD = 10       # F9 读取存档
+
+
+class ReplayError(ValueError):
+    """录像文件格式错误"""
+
+
+def _levels_header(levels):
+    """关卡来源写入文件头的字段"""
+    if isinstance(levels, GeneratedLevels):
+        return levels.seed, levels.groups, levels.density, levels.count
+    return -1, 0, 0.0, 0
+
+
+class ReplayRecorder:
+    """边玩边把输入追加到录像文件"""
+    def __init__(self, path, seed, sim_rate, levels=None):
+        self.path = path
+        self.events = 0
+        self._file = open(path, 'wb')
+        self._file.write(_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, seed, sim_rate, *_levels_header(levels)))
+    
+    def record(self, tick, kind, x=0, y=0):
+        """记录一条输入（tick 为这条输入之后执行的第一个物理帧的序号）"""
+        self._file.write(_EVENT.pack(tick, kind, x, y))
+        self.events += 1
+    
+    def close(self, tick):
+        """写入结束标记并关闭文件"""
+        if self._file.closed:
+            return
+        self.record(tick, INPUT_END)
+        self._file.close()
+
+
+class Replay:
+    """读入的录像：文件头字段和按帧序号排列的输入"""
+    def __init__(self, seed, sim_rate, levels, events):
+        self.seed = seed
+        self.sim_rate = sim_rate
+        self.levels = levels  # None 表示内置关卡
+        self.events = events  # [(tick, kind, x, y)]
+        self.end_tick = events[-1][0] if events else 0
+        self._cursor = 0
+    
+    @classmethod
+    def load(cls, path):
+        """读取录像文件"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            raise ReplayError(f"{path}: 文件太短")
+        magic, version, seed, sim_rate, gen_seed, groups, density, count = _HEADER.unpack_from(data, 0)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ReplayError(f"{path}: 不是录像文件或版本不支持")
+        body = memoryview(data)[_HEADER.size:]
+        usable = len(body) - len(body) % _EVENT.size  # 录制中途退出时最后一条可能不完整
+        events = list(_EVENT.iter_unpack(body[:usable]))
+        levels = GeneratedLevels(gen_seed, groups, density, count) if gen_seed >= 0 else None
+        return cls(seed, sim_rate, levels, events)
+    
+    @property
+    def finished(self):
+        return self._cursor >= len(self.events)
+    
+    def events_at(self, tick):
+        """取出帧序号不超过 tick 的所有输入 (kind, x, y)"""
+        due = []
+        while self._cursor < len(self.events) and self.events[self._cursor][0] <= tick:
+            _, kind, x, y = self.events[self._cursor]
+            self._cursor += 1
+            due.append((kind, x, y))
+        return due
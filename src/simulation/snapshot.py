@@ -0,0 +1,213 @@
+"""
+世界快照：把模拟核心的完整状态编码成紧凑的二进制数据，用于存档和搜索时的分支
+
+格式（小端）：
+    文件头   <4sHHiIIIBHII  魔数 b'SSNP'、版本号、关卡、分数、物理帧数、小鸟总数、
+                            当前小鸟序号、状态位、飞行中小鸟数、小羊数、西瓜数
+    小羊     array('d') x、array('d') y、array('b') 存活、array('B') 外观（每只 5 个下标）
+    西瓜     array('d') x、array('d') y、array('d') 大小、array('b') 是否切开
+    小鸟     <8dBB * n  位置、上一帧位置、速度、起点、颜色下标、状态位（有当前小鸟时排在第一个）
+
+小羊/西瓜的坐标直接取自实体表的整列，恢复时也整列放回，编解码都不需要逐个读写对象属性。
+随机数状态不在快照中：它只影响拖尾和粒子这类外观效果。
+"""
+
+import struct
+import sys
+from array import array
+
+from src.entities.bird import Bird, BirdQueue
+from src.entities.sheep import Sheep
+from src.entities.table import EntityTable
+from src.entities.watermelon import Watermelon
+from src.utils.constants import *
+
+SNAPSHOT_MAGIC = b'SSNP'
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct('<4sHHiIIIBHII')
+_BIRD = struct.Struct('<8dBB')
+
+# 文件头状态位
+_GAME_OVER = 1
+_LEVEL_COMPLETE = 2
+_HAS_CURRENT = 4
+
+# 小鸟状态位
+_LAUNCHED = 1
+_DRAGGING = 2
+_ACTIVE = 4
+
+
+class SnapshotError(ValueError):
+    """快照数据格式错误"""
+
+
+def _index_of(values):
+    return {value: index for index, value in enumerate(values)}
+
+
+_BODY_INDEX = _index_of(SHEEP_COLORS)
+_BOW_INDEX = _index_of(Sheep.BOW_COLORS)
+_SPOT_INDEX = _index_of(Sheep.SPOT_COLORS)
+
+
+def _lookup(values, index, what):
+    """按快照中的下标取候选值，下标越界说明数据损坏"""
+    if index >= len(values):
+        raise SnapshotError(f"快照数据损坏: {what}下标 {index} 超出范围")
+    return values[index]
+
+
+def _column_bytes(values):
+    """array 按本机字节序存储，快照统一使用小端"""
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _encode_bird(bird, colors):
+    flags = ((_LAUNCHED if bird.launched else 0) | (_DRAGGING if bird.dragging else 0) |
+             (_ACTIVE if bird.active else 0))
+    color = colors.index(bird.color) if bird.color in colors else 0
+    return _BIRD.pack(bird.x, bird.y, bird.prev_x, bird.prev_y, bird.velocity_x, bird.velocity_y,
+                      bird.start_x, bird.start_y, color, flags)
+
+
+def _decode_bird(data, offset, colors):
+    x, y, prev_x, prev_y, velocity_x, velocity_y, start_x, start_y, color, flags = _BIRD.unpack_from(data, offset)
+    bird = Bird(start_x, start_y)
+    bird.x, bird.y = x, y
+    bird.prev_x, bird.prev_y = prev_x, prev_y
+    bird.velocity_x, bird.velocity_y = velocity_x, velocity_y
+    bird.color = _lookup(colors, color, "小鸟颜色")
+    bird.launched = bool(flags & _LAUNCHED)
+    bird.dragging = bool(flags & _DRAGGING)
+    bird.active = bool(flags & _ACTIVE)
+    return bird
+
+
+def save_snapshot(sim):
+    """把模拟核心的当前状态编码成 bytes"""
+    queue = sim.bird_queue
+    birds = ([queue.current] if queue.current is not None else []) + [
+        bird for bird in queue.in_flight if bird is not queue.current]
+    flags = ((_GAME_OVER if sim.game_over else 0) | (_LEVEL_COMPLETE if sim.level_complete else 0) |
+             (_HAS_CURRENT if queue.current is not None else 0))
+    
+    variants = array('B')
+    for sheep in sim.sheeps:
+        variants.extend((_BODY_INDEX.get(sheep.body_color, 0), sheep.has_bow, _BOW_INDEX.get(sheep.bow_color, 0),
+                         sheep.has_spot, _SPOT_INDEX.get(sheep.spot_color, 0)))
+    sizes = array('d', [watermelon.size for watermelon in sim.watermelons])
+    cut = array('b', [watermelon.is_cut for watermelon in sim.watermelons])
+    sim.sheep_table.sync()
+    sim.watermelon_table.sync()
+    
+    return b''.join([
+        _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, sim.level, sim.score, sim.tick, queue.total, queue.index,
+                     flags, len(birds), len(sim.sheeps), len(sim.watermelons)),
+        _column_bytes(sim.sheep_table.x), _column_bytes(sim.sheep_table.y), _column_bytes(sim.sheep_table.alive),
+        variants.tobytes(),
+        _column_bytes(sim.watermelon_table.x), _column_bytes(sim.watermelon_table.y),
+        _column_bytes(sizes), cut.tobytes(),
+    ] + [_encode_bird(bird, queue.colors) for bird in birds])
+
+
+class _Reader:
+    """按顺序从快照数据中读出数组"""
+    def __init__(self, data, offset):
+        self.data = data
+        self.offset = offset
+    
+    def take(self, typecode, count):
+        values = array(typecode)
+        end = self.offset + count * values.itemsize
+        if end > len(self.data):
+            raise SnapshotError("快照数据被截断")
+        values.frombytes(self.data[self.offset:end])
+        if sys.byteorder != 'little':
+            values.byteswap()
+        self.offset = end
+        return values
+
+
+def load_snapshot(sim, data):
+    """用快照数据覆盖模拟核心的当前状态"""
+    data = memoryview(data)
+    if len(data) < _HEADER.size:
+        raise SnapshotError("快照数据太短")
+    (magic, version, level, score, tick, total, index, flags,
+     bird_count, sheep_count, watermelon_count) = _HEADER.unpack_from(data, 0)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise SnapshotError("不是快照数据或版本不支持")
+    
+    reader = _Reader(data, _HEADER.size)
+    sheep_table = EntityTable()
+    sheep_table.x = reader.take('d', sheep_count)
+    sheep_table.y = reader.take('d', sheep_count)
+    sheep_table.alive = reader.take('b', sheep_count)
+    variants = reader.take('B', sheep_count * 5)
+    watermelon_table = EntityTable()
+    watermelon_table.x = reader.take('d', watermelon_count)
+    watermelon_table.y = reader.take('d', watermelon_count)
+    watermelon_table.alive = array('b', bytes([1]) * watermelon_count)
+    sizes = reader.take('d', watermelon_count)
+    cut = reader.take('b', watermelon_count)
+    if reader.offset + bird_count * _BIRD.size > len(data):
+        raise SnapshotError("快照数据被截断")
+    
+    variants = [(_lookup(SHEEP_COLORS, variants[i], "小羊颜色"), bool(variants[i + 1]),
+                 _lookup(Sheep.BOW_COLORS, variants[i + 2], "蝴蝶结颜色"), bool(variants[i + 3]),
+                 _lookup(Sheep.SPOT_COLORS, variants[i + 4], "斑点颜色")) for i in range(0, len(variants), 5)]
+    
+    queue = BirdQueue(0, sim.bird_colors, sim.slingshot_x, sim.slingshot_y)
+    queue.total = total
+    queue.index = index
+    birds = [_decode_bird(data, reader.offset + i * _BIRD.size, queue.colors) for i in range(bird_count)]
+    if flags & _HAS_CURRENT:
+        queue.current = birds.pop(0)
+        if queue.current.launched and queue.current.active:
+            birds.append(queue.current)
+    queue.in_flight = birds
+    
+    sim.sheep_table.sync()
+    sim.watermelon_table.sync()
+    same_layout = (sheep_table.x == sim.sheep_table.x and sheep_table.y == sim.sheep_table.y and
+                   watermelon_table.x == sim.watermelon_table.x and watermelon_table.y == sim.watermelon_table.y)
+    if same_layout:
+        _restore_in_place(sim, sheep_table.alive, variants, sizes, cut)
+    else:
+        sim.sheeps = [Sheep.from_row(sheep_table, i, variant) for i, variant in enumerate(variants)]
+        sim.watermelons = [Watermelon.from_row(watermelon_table, i, bool(cut[i]), sizes[i])
+                           for i in range(watermelon_count)]
+        sim.sheep_table = sheep_table
+        sim.watermelon_table = watermelon_table
+        sim._build_spatial_index()
+    
+    sim.level = level
+    sim.score = score
+    sim.tick = tick
+    sim.game_over = bool(flags & _GAME_OVER)
+    sim.level_complete = bool(flags & _LEVEL_COMPLETE)
+    sim.bird_queue = queue
+    sim.last_hits = []
+    sim.alive_count = sum(sheep_table.alive)
+
+
+def _restore_in_place(sim, alive, variants, sizes, cut):
+    """
+    快照与当前关卡布局相同（同一关内存档/分支搜索）时，保留现有的小羊、西瓜对象和空间索引，
+    只改写存活标记和外观，并把存活状态变化的小羊移入/移出空间索引
+    """
+    for i, sheep in enumerate(sim.sheeps):
+        if sheep.alive != bool(alive[i]):
+            if alive[i]:
+                sim.sheep_index.insert(sheep, *sheep.bounds(), order=i)
+            else:
+                sim.sheep_index.remove(sheep)
+            sheep.alive = bool(alive[i])
+        sheep.body_color, sheep.has_bow, sheep.bow_color, sheep.has_spot, sheep.spot_color = variants[i]
+    for i, watermelon in enumerate(sim.watermelons):
+        watermelon.size = sizes[i]
+        watermelon.is_cut = bool(cut[i])
@@ -0,0 +1,264 @@
+"""
+关卡求解器：搜索清空每一关所需的最少小鸟数
+
+小羊被击中不会改变小鸟的飞行轨迹，西瓜也不会移动，所以一发拉动向量击中哪些小羊
+与之前打过哪些发无关。世界状态因此可以压缩成“存活小羊”的位掩码，
+求最少发数就是用各拉动向量的击中集合做精确集合覆盖：
+
+1. 把拉动向量网格分块交给进程池，用 BatchShotEvaluator 计算每个向量的击中位掩码；
+2. 合并相同的掩码、去掉被其他掩码包含的掩码；
+3. 以贪心解作为上界做分支定界搜索，第一层分支分发到各个工作进程，
+   已访问的存活状态做记忆化，用“剩余小羊数 / 单发最多击中数”做下界剪枝。
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.simulation.batch import BatchShotEvaluator, launch_grid
+from src.simulation.core import Simulation
+
+SHOT_MAX_STEPS = 1000
+
+# 工作进程内共享的只读关卡数据（由进程池初始化函数设置）
+_worker_evaluator = None
+
+
+def _init_worker(sheep_xy, watermelon_xy, start, dt=1.0):
+    """进程池初始化：每个工作进程只构建一次关卡评估器"""
+    global _worker_evaluator
+    _worker_evaluator = BatchShotEvaluator(sheep_xy, watermelon_xy, start=start, dt=dt)
+
+
+def _evaluate_chunk(pulls):
+    """
+    工作进程：返回一块拉动向量各自的 (击中位掩码, 是否卡住)
+    
+    卡在西瓜之间一直没有飞出屏幕的小鸟需要玩家按 R 收回，
+    这里按飞行 SHOT_MAX_STEPS 帧后收回计算它的击中结果。
+    """
+    max_steps = _shot_steps(_worker_evaluator.dt)
+    hits, ticks = _worker_evaluator.evaluate(pulls, max_steps)
+    packed = np.packbits(hits, axis=1, bitorder='little')
+    return [(int.from_bytes(row.tobytes(), 'little'), bool(stuck))
+            for row, stuck in zip(packed, ticks >= max_steps)]
+
+
+def _shot_steps(dt):
+    """飞行 SHOT_MAX_STEPS 个物理帧对应的步数"""
+    return math.ceil(SHOT_MAX_STEPS / dt)
+
+
+def _popcount(mask):
+    return bin(mask).count('1')
+
+
+def reduce_candidates(results, pulls):
+    """
+    合并相同的击中掩码并去掉被包含的掩码，返回 [(掩码, (拉动向量, 是否卡住))]，按覆盖数降序
+    
+    相同掩码优先保留不会卡住的拉动向量。
+    """
+    unique = {}
+    for (mask, stuck), pull in zip(results, pulls):
+        if mask and (mask not in unique or unique[mask][1] and not stuck):
+            unique[mask] = ((float(pull[0]), float(pull[1])), stuck)
+    
+    kept = []
+    for mask in sorted(unique, key=_popcount, reverse=True):
+        if not any(mask & other == mask for other, _ in kept):
+            kept.append((mask, unique[mask]))
+    return kept
+
+
+def greedy_cover(target, candidates):
+    """贪心集合覆盖，返回所选候选下标列表（无法覆盖时返回 None）"""
+    remaining = target
+    chosen = []
+    while remaining:
+        best, best_gain = None, 0
+        for index, (mask, _) in enumerate(candidates):
+            gain = _popcount(mask & remaining)
+            if gain > best_gain:
+                best, best_gain = index, gain
+        if best is None:
+            return None
+        chosen.append(best)
+        remaining &= ~candidates[best][0]
+    return chosen
+
+
+class _CoverSearch:
+    """带记忆化和下界剪枝的分支定界集合覆盖搜索"""
+    def __init__(self, candidates, bound, node_limit):
+        self.masks = [mask for mask, _ in candidates]
+        self.max_size = max(_popcount(mask) for mask in self.masks)
+        self.best = bound
+        self.best_sequence = None
+        self.node_limit = node_limit
+        self.nodes = 0
+        self.exhausted = True
+        self.memo = {}
+        
+        # 每只小羊可以被哪些候选击中（按覆盖数降序）
+        self.covers = {}
+        for index, mask in enumerate(self.masks):
+            bits = mask
+            while bits:
+                low = bits & -bits
+                self.covers.setdefault(low.bit_length() - 1, []).append(index)
+                bits ^= low
+    
+    def search(self, remaining, chosen):
+        self.nodes += 1
+        if self.nodes > self.node_limit:
+            self.exhausted = False
+            return
+        depth = len(chosen)
+        if remaining == 0:
+            if depth < self.best:
+                self.best = depth
+                self.best_sequence = list(chosen)
+            return
+        if depth + math.ceil(_popcount(remaining) / self.max_size) >= self.best:
+            return
+        seen = self.memo.get(remaining)
+        if seen is not None and seen <= depth:
+            return
+        self.memo[remaining] = depth
+        
+        # 从候选最少的小羊开始分支
+        options = None
+        bits = remaining
+        while bits:
+            low = bits & -bits
+            cover = self.covers.get(low.bit_length() - 1, ())
+            if options is None or len(cover) < len(options):
+                options = cover
+            bits ^= low
+        for index in sorted(options, key=lambda i: _popcount(self.masks[i] & remaining), reverse=True):
+            chosen.append(index)
+            self.search(remaining & ~self.masks[index], chosen)
+            chosen.pop()
+            if not self.exhausted:
+                return
+
+
+def _search_branch(candidates, target, first, bound, node_limit):
+    """工作进程：固定第一发后搜索剩余的最优覆盖"""
+    search = _CoverSearch(candidates, bound, node_limit)
+    search.search(target & ~candidates[first][0], [first])
+    return search.best, search.best_sequence, search.nodes, search.exhausted
+
+
+def solve_level(level, workers=None, step=2.0, node_limit=200000, dt=1.0):
+    """求解一关，返回结果字典（dt 为模拟步长，大于 1 时更快但轨迹是近似的）"""
+    start_time = time.perf_counter()
+    sim = Simulation(level=level, dt=dt)
+    sheep_xy = np.column_stack(sim.sheep_table.columns()[:2])
+    watermelon_xy = np.column_stack(sim.watermelon_table.columns()[:2])
+    start = (sim.slingshot_x, sim.slingshot_y)
+    pulls = launch_grid(step)
+    
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(sheep_xy, watermelon_xy, start, dt)) as executor:
+        chunks = np.array_split(pulls, max(1, workers * 4))
+        shots = [shot for chunk_shots in executor.map(_evaluate_chunk, chunks) for shot in chunk_shots]
+        
+        candidates = reduce_candidates(shots, pulls)
+        reachable = 0
+        for mask, _ in candidates:
+            reachable |= mask
+        
+        result = {
+            'level': level,
+            'sheep': len(sim.sheeps),
+            'reachable': _popcount(reachable),
+            'candidates': len(candidates),
+            'shots': None,
+            'optimal': False,
+            'sequence': [],
+        }
+        
+        greedy = greedy_cover(reachable, candidates) if candidates else []
+        best_sequence = greedy
+        best = len(greedy)
+        exhausted = True
+        nodes = 0
+        
+        if candidates and reachable:
+            # 第一层分支：候选最少的小羊的每一种击中方式
+            covers = {}
+            for index, (mask, _) in enumerate(candidates):
+                for bit in range(len(sim.sheeps)):
+                    if mask >> bit & 1:
+                        covers.setdefault(bit, []).append(index)
+            pivot = min(covers, key=lambda bit: len(covers[bit]))
+            futures = [executor.submit(_search_branch, candidates, reachable, first, best, node_limit)
+                       for first in covers[pivot]]
+            for future in futures:
+                depth, sequence, branch_nodes, branch_exhausted = future.result()
+                nodes += branch_nodes
+                exhausted = exhausted and branch_exhausted
+                if sequence is not None and depth < best:
+                    best, best_sequence = depth, sequence
+    
+    result['shots'] = best
+    result['optimal'] = exhausted
+    result['sequence'] = [candidates[index][1][0] for index in best_sequence]
+    result['recalls'] = [candidates[index][1][1] for index in best_sequence]
+    result['nodes'] = nodes
+    result['cleared'] = result['reachable'] == result['sheep']
+    result['verified'] = verify_sequence(level, result['sequence'], result['reachable'], dt)
+    result['seconds'] = time.perf_counter() - start_time
+    return result
+
+
+def verify_sequence(level, sequence, expected_hits, dt=1.0):
+    """用模拟核心逐发重放，确认击中的小羊数与求解结果一致"""
+    sim = Simulation(level=level, max_birds=max(1, len(sequence)), dt=dt)
+    for power_x, power_y in sequence:
+        bird = sim.get_current_bird()
+        sim.simulate_shot(power_x, power_y, _shot_steps(dt))
+        if sim.get_current_bird() is bird and bird.active:
+            # 小鸟卡住了，像玩家一样按 R 收回
+            sim.reset_bird()
+    return len(sim.sheeps) - sim.alive_count == expected_hits
+
+
+def main():
+    """求解器命令行入口"""
+    parser = argparse.ArgumentParser(description="搜索清空每一关所需的最少小鸟数")
+    parser.add_argument('--levels', type=int, nargs='*', default=None, help="要求解的关卡，默认全部")
+    parser.add_argument('--step', type=float, default=2.0, help="拉动向量网格间距（像素）")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="工作进程数，默认每个核心一个")
+    parser.add_argument('--node-limit', type=int, default=200000, help="每个分支的搜索节点上限")
+    parser.add_argument('--json', action='store_true', help="以 JSON 输出结果")
+    parser.add_argument('--dt', type=float, default=1.0, help="模拟步长（物理帧），大于 1 时更快但结果是近似的")
+    args = parser.parse_args()
+    
+    levels = args.levels or range(1, Simulation(max_birds=0).level_count + 1)
+    results = []
+    for level in levels:
+        result = solve_level(level, args.workers, args.step, args.node_limit, args.dt)
+        results.append(result)
+        if not args.json:
+            status = "最优" if result['optimal'] else "搜索未完成，当前最好"
+            print(f"关卡 {level}: {status} {result['shots']} 发, 可击中 {result['reachable']}/{result['sheep']} 只小羊, "
+                  f"候选 {result['candidates']} 个, 用时 {result['seconds']:.2f} 秒, "
+                  f"重放验证{'通过' if result['verified'] else '失败'}")
+            for (power_x, power_y), recall in zip(result['sequence'], result['recalls']):
+                note = "  （小鸟会卡在西瓜之间，需要按 R 收回）" if recall else ""
+                print(f"    拉动向量 ({power_x:+.1f}, {power_y:+.1f}){note}")
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+资源清单：启动时一次性解析图标、字体、音效文件的位置；字体在第一次用到时才加载
+"""
+
+import os
+
+import pygame
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ASSETS_DIR = os.path.join(PROJECT_ROOT, 'assets')
+
+# 图标文件的候选位置（按优先级）
+ICON_CANDIDATES = (
+    os.path.join(ASSETS_DIR, 'images', 'favicon.ico'),
+    os.path.join(PROJECT_ROOT, 'favicon.ico'),
+    os.path.join(ASSETS_DIR, 'favicon.ico'),
+    os.path.join(ASSETS_DIR, 'images', 'icon.png'),
+    os.path.join(PROJECT_ROOT, 'icon.png'),
+)
+FONT_FILE = os.path.join(ASSETS_DIR, 'fonts', 'wqy-microhei-lite.ttc')
+SOUND_FILES = {
+    'bg_music': 'angry_bird.mp3',
+}
+
+# 界面用到的字号
+FONT_SIZES = {
+    'title': 48,
+    'ui': 28,
+    'small': 20,
+    'signature': 16,
+}
+
+
+def _existing(path):
+    return path if os.path.exists(path) else None
+
+
+class AssetManifest:
+    """
+    资源路径清单，只在创建时检查一次文件是否存在
+    
+    找不到的资源对应 None，调用方据此退回默认图标/默认字体/无声。
+    """
+    def __init__(self):
+        self.icon = next((path for path in ICON_CANDIDATES if os.path.exists(path)), None)
+        self.font = _existing(FONT_FILE)
+        self.sounds = {name: _existing(os.path.join(ASSETS_DIR, 'sounds', filename))
+                       for name, filename in SOUND_FILES.items()}
+    
+    def missing(self):
+        """找不到的资源名"""
+        missing = [] if self.icon else ['icon']
+        if not self.font:
+            missing.append('font')
+        missing.extend(name for name, path in self.sounds.items() if not path)
+        return missing
+
+
+class LazyFonts:
+    """
+    按名字（FONT_SIZES 的键）取字体，第一次取某个字号时才加载
+    
+    标题字体只在过关/结束画面用到，启动时不必加载。字体文件加载失败后所有字号都退回 pygame 默认字体。
+    """
+    def __init__(self, path, sizes=FONT_SIZES):
+        self.path = path
+        self.sizes = sizes
+        self._fonts = {}
+    
+    def __getitem__(self, name):
+        font = self._fonts.get(name)
+        if font is None:
+            font = self._load(self.sizes[name])
+            self._fonts[name] = font
+        return font
+    
+    @property
+    def loaded(self):
+        """已经加载的字体名"""
+        return list(self._fonts)
+    
+    def _load(self, size):
+        if not pygame.font.get_init():
+            pygame.font.init()
+        if self.path is not None:
+            try:
+                return pygame.font.Font(self.path, size)
+            except Exception as e:
+                print(f"❌ 加载字体失败 {self.path}: {e}，使用默认字体")
+                self.path = None
+        return pygame.font.Font(None, size)
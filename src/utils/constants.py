@@ -7,6 +7,13 @@ SCREEN_WIDTH = 1000
 SCREEN_HEIGHT = 700
 FPS = 60
 
+# 固定步长物理模拟
+SIM_RATE = 60  # 每秒物理帧数
+MAX_CATCHUP_STEPS = 5  # 每个渲染帧最多追赶的物理帧数
+
+# 帧性能分析器
+PROFILER_FRAMES = 600  # 环形缓冲区保存的帧数
+
 # 颜色定义
 WHITE = (255, 255, 255)
 BLACK = (30, 30, 30)
@@ -41,4 +48,32 @@ GRAVITY = 0.3
 LAUNCH_POWER = 0.4
 MAX_PULL_DISTANCE = 80
 BIRD_RADIUS = 20
-SHEEP_RADIUS = 25
\ No newline at end of file
+SHEEP_RADIUS = 25
+
+# 碰撞检测空间网格大小
+SPATIAL_CELL_SIZE = 64
+
+# 脏矩形渲染：变化面积超过该比例时改为整屏翻转
+DIRTY_RECT_THRESHOLD = 0.5
+DIRTY_RECT_TILE = 100
+DIRTY_RECT_MAX_RECTS = 32
+
+# 文字渲染缓存容量
+TEXT_CACHE_SIZE = 128
+
+# 轨迹预测缓存容量（按取整后的拉动向量缓存）
+TRAJECTORY_CACHE_SIZE = 4096
+
+# 批量发射评估的候选网格大小
+BATCH_CELL_SIZE = 20
+
+# 批量评估扫掠检测的候选余量（每个物理帧）：半步长不超过它时按网格取候选，否则与所有物体检测
+BATCH_SWEEP_MARGIN = 16
+
+# 强化学习环境：每个回合（一关）可用的小鸟数、单发最多推进的物理帧数
+ENV_BIRDS = 20
+ENV_SHOT_MAX_STEPS = 1000
+ENV_MAX_SHOTS = 40  # 每回合最多打的发数（卡住后收回的也算），超过时回合被截断
+
+# 帧导出环形缓冲区的槽位数（读取端最多可以落后 槽位数 - 1 帧）
+FRAME_EXPORT_SLOTS = 8
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+脏矩形跟踪：只把变化的区域提交到显示设备
+"""
+
+import pygame
+from src.utils.constants import DIRTY_RECT_THRESHOLD, DIRTY_RECT_TILE, DIRTY_RECT_MAX_RECTS
+
+
+class DirtyRectTracker:
+    """记录每帧变化的区域，并决定局部刷新还是整屏翻转"""
+    def __init__(self, screen_size, threshold=DIRTY_RECT_THRESHOLD):
+        self.screen_rect = pygame.Rect((0, 0), screen_size)
+        self.threshold = threshold
+        self.current = []
+        self.previous = []
+        self.full_redraw = True
+        self.full_flips = 0
+        self.partial_updates = 0
+    
+    def mark(self, rect):
+        """标记本帧绘制过的区域（会裁剪到屏幕内）"""
+        if rect is None:
+            return
+        rect = self.screen_rect.clip(pygame.Rect(rect).inflate(2, 2))
+        if rect.width > 0 and rect.height > 0:
+            self.current.append(rect)
+    
+    def mark_many(self, rects):
+        """标记多个区域"""
+        for rect in rects:
+            self.mark(rect)
+    
+    def invalidate(self):
+        """下一次提交整屏翻转"""
+        self.full_redraw = True
+    
+    def _coalesce(self, rects):
+        """矩形太多时按网格块合并，避免提交大量小矩形"""
+        if len(rects) <= DIRTY_RECT_MAX_RECTS:
+            return rects
+        tiles = {}
+        tile = DIRTY_RECT_TILE
+        for rect in rects:
+            for tx in range(rect.left // tile, (rect.right - 1) // tile + 1):
+                for ty in range(rect.top // tile, (rect.bottom - 1) // tile + 1):
+                    tiles[(tx, ty)] = True
+        return [self.screen_rect.clip(pygame.Rect(tx * tile, ty * tile, tile, tile)) for tx, ty in tiles]
+    
+    def present(self):
+        """提交本帧画面，返回是否整屏翻转"""
+        rects = self._coalesce(self.previous + self.current)
+        dirty_area = sum(rect.width * rect.height for rect in rects)
+        screen_area = self.screen_rect.width * self.screen_rect.height
+        
+        full = self.full_redraw or dirty_area > self.threshold * screen_area
+        if full:
+            pygame.display.flip()
+            self.full_flips += 1
+        elif rects:
+            pygame.display.update(rects)
+            self.partial_updates += 1
+        
+        self.previous = self.current
+        self.current = []
+        self.full_redraw = False
+        return full
@@ -0,0 +1,282 @@
+"""
+帧导出：把每一帧呈现的画面发布到 multiprocessing.shared_memory 环形缓冲区，供外部进程（录制、视觉模型）读取
+
+共享内存布局（小端，各段按 64 字节对齐）：
+    文件头  <4sHHHHH4sI  魔数 b'SFRM'、版本号、宽、高、每行字节数、每像素字节数、
+                         各字节的通道（例如 b'BGRX'）、槽位数
+            偏移 32      int64 最新一帧的序号（-1 表示还没有帧）
+            偏移 40      int64 写入端是否仍在运行
+    槽位    int64 该槽中帧的序号（写入期间为 -1），偏移 64 处起是屏幕表面的原始像素（逐行，含行尾填充）
+
+写入端每帧只有一次内存拷贝：屏幕表面通过缓冲区协议直接拷进槽位，不经过 tostring/surfarray 的中间数组。
+读取端可以直接拿槽位的零拷贝视图，用完后用 valid() 确认这一帧没有被覆盖；
+也可以用 read() 拷贝出来，拷贝前后都检查槽位序号，不会读到写了一半的画面。
+
+    python3 -m src.utils.frame_export NAME   # 连接正在导出的游戏，报告收到的帧率和丢帧数
+"""
+
+import argparse
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from src.utils.constants import FRAME_EXPORT_SLOTS
+
+FRAME_MAGIC = b'SFRM'
+FRAME_VERSION = 1
+_HEADER = struct.Struct('<4sHHHHH4sI')
+_LATEST_OFFSET = 32
+_RUNNING_OFFSET = 40
+_DATA_OFFSET = 64  # 文件头和每个槽位头的大小
+
+
+class FrameExportError(ValueError):
+    """共享内存中不是导出的帧，或版本不支持"""
+
+
+def _align(size, alignment=64):
+    return (size + alignment - 1) // alignment * alignment
+
+
+def _channels(surface):
+    """表面每个像素内各字节对应的通道（只支持按字节对齐的 24/32 位格式）"""
+    names = []
+    for byte in range(surface.get_bytesize()):
+        mask = 0xFF << (8 * byte)
+        for name, channel_mask in zip('RGBA', surface.get_masks()):
+            if channel_mask == mask:
+                names.append(name)
+                break
+        else:
+            names.append('X')
+    return ''.join(names).encode('ascii')
+
+
+class _Layout:
+    """由文件头字段算出各段的偏移，写入端和读取端共用"""
+    def __init__(self, width, height, pitch, bytesize, slots):
+        self.width = width
+        self.height = height
+        self.pitch = pitch
+        self.bytesize = bytesize
+        self.slots = slots
+        self.frame_bytes = pitch * height
+        self.slot_size = _DATA_OFFSET + _align(self.frame_bytes)
+        self.size = _DATA_OFFSET + slots * self.slot_size
+    
+    def slot_offset(self, slot):
+        return _DATA_OFFSET + slot * self.slot_size
+    
+    def counters(self, buffer):
+        """(最新帧序号, 是否运行, 各槽位序号) 的 int64 视图"""
+        latest = np.ndarray((), np.int64, buffer, _LATEST_OFFSET)
+        running = np.ndarray((), np.int64, buffer, _RUNNING_OFFSET)
+        sequences = [np.ndarray((), np.int64, buffer, self.slot_offset(slot)) for slot in range(self.slots)]
+        return latest, running, sequences
+    
+    def pixels(self, buffer, slot):
+        """槽位像素的 (高, 宽, 每像素字节数) 视图"""
+        return np.ndarray((self.height, self.width, self.bytesize), np.uint8, buffer,
+                          self.slot_offset(slot) + _DATA_OFFSET, (self.pitch, self.bytesize, 1))
+
+
+class FrameExporter:
+    """
+    写入端：每次 publish 把表面拷进下一个槽位
+    
+    name 为 None 时由系统生成共享内存的名字（self.name），需要把它告诉读取端。
+    """
+    def __init__(self, surface, slots=FRAME_EXPORT_SLOTS, name=None):
+        width, height = surface.get_size()
+        self.layout = _Layout(width, height, surface.get_pitch(), surface.get_bytesize(), slots)
+        self.channels = _channels(surface)
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=self.layout.size)
+        self.name = self.shm.name
+        self.frames = 0  # 已发布的帧数，也是下一帧的序号
+        
+        buffer = self.shm.buf
+        _HEADER.pack_into(buffer, 0, FRAME_MAGIC, FRAME_VERSION, width, height, self.layout.pitch,
+                          self.layout.bytesize, self.channels, slots)
+        self._latest, self._running, self._sequences = self.layout.counters(buffer)
+        self._slots = [np.ndarray(self.layout.frame_bytes, np.uint8, buffer,
+                                  self.layout.slot_offset(slot) + _DATA_OFFSET) for slot in range(slots)]
+        self._latest[...] = -1
+        for sequence in self._sequences:
+            sequence[...] = -1
+        self._running[...] = 1
+        for pixels in self._slots:
+            pixels.fill(0)  # 先把每页都碰一遍，缺页开销留在启动时，不落在游戏开始的前几帧上
+    
+    def publish(self, surface):
+        """发布一帧，返回它的序号"""
+        index = self.frames
+        slot = index % self.layout.slots
+        sequence = self._sequences[slot]
+        sequence[...] = -1
+        view = surface.get_view('0')
+        if view.length != self.layout.frame_bytes:
+            raise ValueError("表面的大小或像素格式与导出缓冲区不一致")
+        self._slots[slot][:] = np.frombuffer(view, np.uint8)
+        del view  # 释放表面的锁
+        sequence[...] = index
+        self._latest[...] = index
+        self.frames += 1
+        return index
+    
+    def close(self):
+        """标记写入端已停止并删除共享内存（已经附加的读取端仍可读完手上的帧）"""
+        if self.shm is None:
+            return
+        self._running[...] = 0
+        self._latest = self._running = None
+        self._sequences = self._slots = []
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
+
+
+def _attach(name):
+    """附加已有的共享内存，不登记到 resource_tracker，免得它在读取端退出时删掉共享内存（写入端负责删除）"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    # Python 3.13 之前附加也会登记。不能事后注销：读取端与写入端在同一进程，或子进程继承了写入端的
+    # resource_tracker 时，注销的是写入端那条登记，写入端 unlink 时 resource_tracker 就会报 KeyError。
+    # 所以附加期间临时跳过登记，效果和 track=False 相同。
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None if rtype == 'shared_memory' else register(name, rtype)
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class FrameReader:
+    """
+    读取端：在另一个进程里按名字附加到导出的环形缓冲区
+    
+    frame = reader.view(index) 是零拷贝视图，形状为 (高, 宽, 每像素字节数)，通道顺序见 channels；
+    写入端最多再写 slots - 1 帧就会覆盖它，用完后用 reader.valid(index) 确认。
+    """
+    def __init__(self, name):
+        self.shm = _attach(name)
+        buffer = self.shm.buf
+        if len(buffer) < _DATA_OFFSET:
+            raise FrameExportError(f"{name}: 共享内存太小")
+        magic, version, width, height, pitch, bytesize, channels, slots = _HEADER.unpack_from(buffer, 0)
+        if magic != FRAME_MAGIC or version != FRAME_VERSION:
+            raise FrameExportError(f"{name}: 不是导出的帧或版本不支持")
+        self.layout = _Layout(width, height, pitch, bytesize, slots)
+        self.width = width
+        self.height = height
+        self.slots = slots
+        self.channels = channels.decode('ascii')[:bytesize]
+        self._latest, self._running, self._sequences = self.layout.counters(buffer)
+        self._pixels = [self.layout.pixels(buffer, slot) for slot in range(slots)]
+        self._rgb = [self.channels.index(name) for name in 'RGB']
+        self.last_index = -1  # frames() 最近交出的帧
+        self.dropped = 0      # frames() 跳过的帧数（读得比写得慢时）
+    
+    @property
+    def latest(self):
+        """最新一帧的序号，还没有帧时为 -1"""
+        return int(self._latest)
+    
+    @property
+    def running(self):
+        return bool(self._running)
+    
+    def valid(self, index):
+        """index 这一帧是否仍在它的槽位里"""
+        return index >= 0 and int(self._sequences[index % self.slots]) == index
+    
+    def view(self, index):
+        """index 这一帧的零拷贝视图，已经被覆盖时返回 None"""
+        if not self.valid(index):
+            return None
+        return self._pixels[index % self.slots]
+    
+    def read(self, index=None, out=None):
+        """拷贝出一帧（默认最新一帧），返回 (序号, 数组)；没有帧或读的过程中被覆盖时返回 None"""
+        if index is None:
+            index = self.latest
+        if not self.valid(index):
+            return None
+        if out is None:
+            out = np.empty((self.height, self.width, self.layout.bytesize), np.uint8)
+        out[...] = self._pixels[index % self.slots]
+        if not self.valid(index):
+            return None
+        return index, out
+    
+    def wait(self, after, timeout=None, poll=0.001):
+        """等到出现序号大于 after 的帧，返回最新序号；超时（timeout 为 None 时不限）或写入端已停止时返回 None"""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            latest = self.latest
+            if latest > after:
+                return latest
+            if not self.running or deadline is not None and time.perf_counter() >= deadline:
+                return None
+            time.sleep(poll)
+    
+    def frames(self, timeout=None):
+        """
+        依次产出 (序号, 零拷贝视图)，直到写入端停止（或两帧之间等待超过 timeout 秒）
+        
+        第一次调用时从当时最新的一帧开始。读得比写得慢时跳到缓冲区中最旧的有效帧，跳过的帧数累加到 dropped。
+        """
+        if self.last_index < 0:
+            self.last_index = max(-1, self.latest - 1)
+        while True:
+            latest = self.wait(self.last_index, timeout)
+            if latest is None:
+                return
+            index = max(self.last_index + 1, latest - self.slots + 1)
+            self.dropped += index - self.last_index - 1
+            for index in range(index, latest + 1):
+                frame = self.view(index)
+                if frame is None:
+                    self.dropped += 1
+                    continue
+                self.last_index = index
+                yield index, frame
+    
+    def to_rgb(self, frame):
+        """把帧转换成 (高, 宽, 3) 的 RGB 数组（会拷贝）"""
+        return frame[..., self._rgb]
+    
+    def close(self):
+        self._latest = self._running = None
+        self._sequences = self._pixels = []
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # 调用方还拿着 view() 返回的视图，等它们释放后才会解除映射
+
+
+def main():
+    """连接正在导出帧的游戏，报告收到的帧率和丢帧数"""
+    parser = argparse.ArgumentParser(description="读取游戏导出到共享内存的帧")
+    parser.add_argument('name', help="共享内存的名字（游戏的 --export-frames 参数）")
+    parser.add_argument('--seconds', type=float, default=5.0, help="读取多长时间")
+    args = parser.parse_args()
+    
+    reader = FrameReader(args.name)
+    print(f"{args.name}: {reader.width}x{reader.height} {reader.channels}, {reader.slots} 个槽位")
+    received = 0
+    start = time.perf_counter()
+    for index, frame in reader.frames():
+        received += 1
+        if time.perf_counter() - start >= args.seconds:
+            break
+    elapsed = time.perf_counter() - start
+    reader.close()
+    print(f"收到 {received} 帧, 用时 {elapsed:.2f} 秒 ({received / elapsed:.1f} 帧/秒), 丢帧 {reader.dropped}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+物理计算工具
+"""
+
+import math
+from functools import lru_cache
+from src.utils.constants import *
+
+
+def _exit_step(p0, v, limit):
+    """匀速运动中第一次越过 [0, limit] 区间的步数（不会越过时返回 None）"""
+    if v > 0:
+        return max(1, math.floor((limit - p0) / v) + 1)
+    if v < 0:
+        return max(1, math.floor(p0 / -v) + 1)
+    return None if 0 <= p0 <= limit else 1
+
+
+def clamp_pull(power_x, power_y, max_distance=MAX_PULL_DISTANCE):
+    """把拉动向量限制在弹弓最大拉伸距离内"""
+    distance = math.sqrt(power_x * power_x + power_y * power_y)
+    if distance > max_distance:
+        scale = max_distance / distance
+        return power_x * scale, power_y * scale
+    return power_x, power_y
+
+
+def sweep_circle(x0, y0, x1, y1, cx, cy, reach):
+    """
+    点从 (x0, y0) 匀速移动到 (x1, y1) 时第一次进入以 (cx, cy) 为圆心、半径 reach 的圆
+    
+    返回 (toi, nx, ny)：toi 为碰撞时刻在线段上的比例 [0, 1]，(nx, ny) 为该点处由圆心指向外的单位法线；
+    不相交时返回 None。起点已在圆内时 toi 为 0。
+    """
+    fx = x0 - cx
+    fy = y0 - cy
+    dx = x1 - x0
+    dy = y1 - y0
+    c = fx * fx + fy * fy - reach * reach
+    if c < 0:
+        toi = 0.0
+    else:
+        a = dx * dx + dy * dy
+        b = fx * dx + fy * dy
+        discriminant = b * b - a * c
+        if a == 0 or b >= 0 or discriminant <= 0:
+            return None
+        toi = (-b - math.sqrt(discriminant)) / a
+        if toi > 1:
+            return None
+    nx = fx + dx * toi
+    ny = fy + dy * toi
+    length = math.sqrt(nx * nx + ny * ny)
+    if length == 0:
+        return toi, 0.0, -1.0
+    return toi, nx / length, ny / length
+
+
+def sweep_box(x0, y0, x1, y1, left, top, right, bottom):
+    """
+    点从 (x0, y0) 匀速移动到 (x1, y1) 时第一次进入开区间矩形 (left, right) × (top, bottom)
+    
+    圆与矩形的碰撞把矩形四边向外扩展圆的半径后就是点与矩形。
+    返回 (toi, nx, ny)：(nx, ny) 为进入的那条边的外法线；起点已在矩形内时 toi 为 0，
+    法线取离起点最近的边（依次比较左、右、上、下）。不相交时返回 None。
+    """
+    if left < x0 < right and top < y0 < bottom:
+        distances = (x0 - left, right - x0, y0 - top, bottom - y0)
+        nearest = distances.index(min(distances))
+        return (0.0,) + _BOX_NORMALS[nearest]
+    
+    # 分轴求进入/离开时刻（slab 法），最晚的进入时刻就是碰撞时刻
+    t_near = -math.inf
+    t_far = math.inf
+    normal = None
+    for p0, d, low, high, axis in ((x0, x1 - x0, left, right, 0), (y0, y1 - y0, top, bottom, 1)):
+        if d == 0:
+            if not low < p0 < high:
+                return None
+            continue
+        if d > 0:
+            entry, exit_ = (low - p0) / d, (high - p0) / d
+            side = axis * 2
+        else:
+            entry, exit_ = (high - p0) / d, (low - p0) / d
+            side = axis * 2 + 1
+        if entry > t_near:
+            t_near = entry
+            normal = _BOX_NORMALS[side]
+        t_far = min(t_far, exit_)
+    if normal is None or t_near < 0 or t_near > 1 or t_near >= t_far:
+        return None
+    return (t_near,) + normal
+
+
+# sweep_box 的边法线：左、右、上、下
+_BOX_NORMALS = ((-1.0, 0.0), (1.0, 0.0), (0.0, -1.0), (0.0, 1.0))
+
+
+@lru_cache(maxsize=TRAJECTORY_CACHE_SIZE)
+def trajectory_points(start_x, start_y, pull_x, pull_y, steps=50, gravity=GRAVITY, dt=1.0):
+    """
+    发射轨迹预测点（与 Bird.update 以步长 dt 逐帧积分的结果一致）
+    
+    预测点按基准物理帧（1/SIM_RATE 秒）取样，第 n 个基准帧的位置有闭式解：
+        x_n = x_0 + n * vx
+        y_n = y_0 + n * vy + gravity * n * (n + dt) / 2
+    dt 为 1 时每个预测点就是一个物理帧；--sim-rate 改变步长时，这个式子在真实物理帧处与积分结果相同，
+    中间是同一条抛物线，所以预览与实际飞行重合。轨迹在第一次飞出屏幕（左右边界或底部）的那一帧结束。
+    """
+    x0 = start_x - pull_x
+    y0 = start_y - pull_y
+    vx = pull_x * LAUNCH_POWER
+    vy = pull_y * LAUNCH_POWER
+    
+    count = steps
+    exit_x = _exit_step(x0, vx, SCREEN_WIDTH)
+    if exit_x is not None:
+        count = min(count, exit_x)
+    
+    # 解 gravity/2 * n^2 + (vy + gravity*dt/2) * n + (y0 - SCREEN_HEIGHT) = 0 的正根
+    a = gravity / 2
+    b = vy + a * dt
+    c = y0 - SCREEN_HEIGHT
+    discriminant = b * b - 4 * a * c
+    if a > 0 and discriminant >= 0:
+        root = (-b + math.sqrt(discriminant)) / (2 * a)
+        count = min(count, max(1, math.floor(root) + 1))
+    
+    return tuple((x0 + n * vx, y0 + n * vy + a * n * (n + dt)) for n in range(1, count + 1))
@@ -0,0 +1,103 @@
+"""
+帧性能分析器：按阶段记录主循环每一帧的耗时（perf_counter_ns），保存在环形缓冲区中
+"""
+
+import csv
+import time
+
+import numpy as np
+
+from src.utils.constants import PROFILER_FRAMES
+from src.utils.timing import percentile
+
+# 主循环的阶段（按一帧内的执行顺序），export 只在开启帧导出时有耗时，最后的 wait 是 clock.tick 的等待时间
+PHASES = ('events', 'update', 'world', 'trajectory', 'birds', 'particles', 'ui', 'hud', 'present', 'export', 'wait')
+
+
+class FrameProfiler:
+    """
+    帧性能分析器
+    
+    每帧调用 begin_frame()，每个阶段结束时调用 lap(阶段名)，帧末调用 end_frame()。
+    同一帧内多次 lap 同一阶段（例如追赶时多次 update）会累加。
+    """
+    def __init__(self, capacity=PROFILER_FRAMES):
+        self.capacity = capacity
+        self.samples = np.zeros((capacity, len(PHASES)), dtype=np.int64)
+        self.frames = 0  # 已记录的总帧数
+        self.visible = False
+        self._phase_index = {name: index for index, name in enumerate(PHASES)}
+        self._current = [0] * len(PHASES)
+        self._last = None
+        self._stats = None
+        self._stats_frame = -1
+    
+    def begin_frame(self):
+        """开始记录一帧"""
+        self._current = [0] * len(PHASES)
+        self._last = time.perf_counter_ns()
+    
+    def lap(self, phase):
+        """把上一次 lap 以来的耗时记到 phase 上（不在帧内时忽略）"""
+        if self._last is None:
+            return
+        now = time.perf_counter_ns()
+        self._current[self._phase_index[phase]] += now - self._last
+        self._last = now
+    
+    def end_frame(self):
+        """结束一帧，写入环形缓冲区"""
+        if self._last is None:
+            return
+        self.samples[self.frames % self.capacity] = self._current
+        self.frames += 1
+        self._last = None
+    
+    def toggle(self):
+        """显示/隐藏性能面板"""
+        self.visible = not self.visible
+        return self.visible
+    
+    def recent(self):
+        """按时间顺序返回缓冲区中的帧，形状为 (帧数, 阶段数)，单位纳秒"""
+        if self.frames <= self.capacity:
+            return self.samples[:self.frames]
+        start = self.frames % self.capacity
+        return np.concatenate((self.samples[start:], self.samples[:start]))
+    
+    def busy_times(self):
+        """每帧去掉等待时间后的耗时（纳秒）"""
+        return self.recent()[:, :-1].sum(axis=1)
+    
+    def stats(self, every=10):
+        """
+        帧耗时的 p50/p95/p99 和各阶段平均耗时（毫秒）
+        
+        每 every 帧才重新计算一次，面板上的文字不会每帧都变。
+        """
+        if self._stats is None or self.frames - self._stats_frame >= every:
+            recent = self.recent()
+            busy = recent[:, :-1].sum(axis=1).tolist()
+            means = recent.mean(axis=0) / 1e6 if len(recent) else np.zeros(len(PHASES))
+            self._stats = {
+                'frames': len(busy),
+                'p50': percentile(busy, 50) / 1e6,
+                'p95': percentile(busy, 95) / 1e6,
+                'p99': percentile(busy, 99) / 1e6,
+                'phases': dict(zip(PHASES, means.tolist())),
+            }
+            self._stats_frame = self.frames
+        return self._stats
+    
+    def dump_csv(self, path):
+        """把缓冲区写成 CSV（每帧一行，单位微秒），返回写入的帧数"""
+        recent = self.recent()
+        first = self.frames - len(recent)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(('frame',) + PHASES + ('busy', 'total'))
+            for offset, row in enumerate(recent.tolist()):
+                busy = sum(row[:-1])
+                writer.writerow([first + offset] + [f"{value / 1000:.1f}" for value in row] +
+                                [f"{busy / 1000:.1f}", f"{(busy + row[-1]) / 1000:.1f}"])
+        return len(recent)
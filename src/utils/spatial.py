@@ -0,0 +1,66 @@
+"""
+均匀网格空间索引（碰撞粗检测）
+"""
+
+from src.utils.constants import SPATIAL_CELL_SIZE
+
+
+class SpatialHash:
+    """均匀网格空间哈希，按轴对齐包围盒插入和查询对象"""
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self._entries = {}  # id(obj) -> (插入序号, 对象, 占用的格子)
+        self._counter = 0
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def _cell_range(self, left, top, right, bottom):
+        """包围盒覆盖的格子坐标"""
+        size = self.cell_size
+        for cx in range(int(left // size), int(right // size) + 1):
+            for cy in range(int(top // size), int(bottom // size) + 1):
+                yield cx, cy
+    
+    def insert(self, obj, left, top, right, bottom, order=None):
+        """插入对象及其包围盒（order 为查询结果中的排序键，默认按插入顺序）"""
+        if id(obj) in self._entries:
+            self.remove(obj)
+        cells = list(self._cell_range(left, top, right, bottom))
+        for cell in cells:
+            self.cells.setdefault(cell, {})[id(obj)] = obj
+        if order is None:
+            order = self._counter
+            self._counter += 1
+        self._entries[id(obj)] = (order, obj, cells)
+    
+    def remove(self, obj):
+        """移除对象，不存在时忽略"""
+        entry = self._entries.pop(id(obj), None)
+        if entry is None:
+            return
+        for cell in entry[2]:
+            bucket = self.cells.get(cell)
+            if bucket is not None:
+                bucket.pop(id(obj), None)
+                if not bucket:
+                    del self.cells[cell]
+    
+    def clear(self):
+        """清空索引"""
+        self.cells.clear()
+        self._entries.clear()
+    
+    def query(self, left, top, right, bottom):
+        """返回包围盒可能相交的对象，按插入顺序排列"""
+        found = {}
+        cells = self.cells
+        for cell in self._cell_range(left, top, right, bottom):
+            bucket = cells.get(cell)
+            if bucket:
+                found.update(bucket)
+        if len(found) > 1:
+            entries = self._entries
+            return sorted(found.values(), key=lambda obj: entries[id(obj)][0])
+        return list(found.values())
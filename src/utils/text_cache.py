@@ -0,0 +1,38 @@
+"""
+文字渲染缓存
+"""
+
+from collections import OrderedDict
+from src.utils.constants import TEXT_CACHE_SIZE
+
+
+class TextCache:
+    """按 (字体, 文字, 颜色, 抗锯齿) 缓存渲染结果的 LRU 缓存"""
+    def __init__(self, max_size=TEXT_CACHE_SIZE):
+        self.max_size = max_size
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def __len__(self):
+        return len(self._cache)
+    
+    def render(self, font, text, color, antialias=True):
+        """返回文字表面，命中缓存时不再光栅化字形"""
+        key = (font, text, color, antialias)
+        surface = self._cache.get(key)
+        if surface is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return surface
+        
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._cache[key] = surface
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return surface
+    
+    def clear(self):
+        """清空缓存（例如字体重新加载之后）"""
+        self._cache.clear()
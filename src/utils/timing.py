@@ -0,0 +1,40 @@
+"""
+性能计时工具
+"""
+
+import math
+import time
+
+
+def time_calls(func, *args, frames=300, warmup=10):
+    """重复调用 func，返回每次调用耗时（纳秒）列表"""
+    for _ in range(warmup):
+        func(*args)
+
+    samples = []
+    for _ in range(frames):
+        start = time.perf_counter_ns()
+        func(*args)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def percentile(samples, pct):
+    """计算百分位数（最近秩法）"""
+    if not samples:
+        return 0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """汇总耗时样本，单位毫秒"""
+    if not samples:
+        return {'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+    return {
+        'mean': sum(samples) / len(samples) / 1e6,
+        'p50': percentile(samples, 50) / 1e6,
+        'p95': percentile(samples, 95) / 1e6,
+        'p99': percentile(samples, 99) / 1e6,
+    }
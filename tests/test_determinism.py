@@ -0,0 +1,75 @@
+"""
+确定性：同样的随机源和动作得到同样的模拟结果，强化学习环境同一个种子的回合完全一致
+"""
+
+import random
+
+import numpy as np
+
+from src.entities.particle import particle_pool
+from src.simulation.core import Simulation
+from src.simulation.gym_env import ShotEnv, ShotVectorEnv, _episode_digest, check_determinism
+from src.utils.constants import MAX_PULL_DISTANCE
+
+
+def _run(seed, level, dt=1.0):
+    sim = Simulation(level=level, dt=dt, rng=random.Random(seed), particles=False)
+    pulls = np.random.default_rng(seed).uniform(-MAX_PULL_DISTANCE, MAX_PULL_DISTANCE, (5, 2))
+    scores = [sim.simulate_shot(float(x), float(y)) for x, y in pulls]
+    return (scores, sim.score, sim.snapshot())
+
+
+def test_simulation_is_deterministic():
+    for level in (1, 4):
+        first = _run(7, level)
+        random.random()  # 全局随机数状态不影响结果
+        assert _run(7, level) == first
+    assert _run(7, 4, dt=3.0) == _run(7, 4, dt=3.0)
+
+
+def test_headless_simulation_emits_no_particles():
+    particle_pool.clear()
+    sim = Simulation(level=1, rng=random.Random(0), particles=False)
+    score = sum(sim.simulate_shot(*pull) for pull in [(40, -40), (48, -24), (56, -32)])
+    assert score > 0  # 确实打中了小羊
+    assert particle_pool.count == 0
+
+
+def test_shot_env_same_seed_same_episode():
+    assert check_determinism(seed=0, shots=10)
+    assert check_determinism(seed=3, shots=10, level=None)
+    assert check_determinism(seed=1, shots=5, frame_size=(64, 48))
+
+
+def test_shot_env_different_seeds_differ():
+    actions = np.zeros((3, 2))
+    env = ShotEnv(level=None)
+    digests = {_episode_digest(env, seed, actions) for seed in range(4)}
+    env.close()
+    assert len(digests) > 1
+
+
+def test_shot_env_truncates_after_max_shots():
+    env = ShotEnv(level=1, max_shots=2)
+    env.reset(seed=0)
+    _, _, terminated, truncated, _ = env.step(np.array([0.0, 0.0]))  # 不拉弹弓，打不中
+    assert not terminated and not truncated
+    _, _, terminated, truncated, _ = env.step(np.array([0.0, 0.0]))
+    assert not terminated and truncated
+    env.close()
+
+
+def test_vector_env_matches_single_envs():
+    actions = np.random.default_rng(0).uniform(-MAX_PULL_DISTANCE, MAX_PULL_DISTANCE, (3, 2, 2))
+    with ShotVectorEnv(2, workers=2, max_shots=10) as vector:
+        observations, _ = vector.reset(seed=5)
+        rewards = [vector.step(step)[1] for step in actions]
+    
+    for index in range(2):
+        env = ShotEnv(max_shots=10)
+        observation, _ = env.reset(seed=5 + index)
+        for name in observation:
+            assert np.array_equal(observation[name], observations[name][index])
+        for step, reward in zip(actions, rewards):
+            assert env.step(step[index])[1] == reward[index]
+        env.close()
@@ -0,0 +1,100 @@
+"""
+帧导出：读取端拿到的画面与写入端发布的表面逐字节相同，覆盖、停止和跨进程读取都按约定工作
+"""
+
+import multiprocessing
+
+import numpy as np
+import pygame
+import pytest
+
+from src.utils.frame_export import FrameExportError, FrameExporter, FrameReader
+
+
+def _surface(value, size=(32, 16)):
+    surface = pygame.Surface(size)
+    surface.fill((value, value // 2, 255 - value))
+    return surface
+
+
+def _pixels(surface):
+    return np.frombuffer(surface.get_view('0'), np.uint8).reshape(surface.get_height(), surface.get_pitch())
+
+
+@pytest.fixture
+def exporter():
+    exporter = FrameExporter(_surface(0), slots=3)
+    yield exporter
+    exporter.close()
+
+
+def test_reader_sees_published_frames(exporter):
+    reader = FrameReader(exporter.name)
+    assert (reader.width, reader.height, reader.slots) == (32, 16, 3)
+    assert reader.latest == -1 and reader.read() is None
+    
+    surface = _surface(40)
+    assert exporter.publish(surface) == 0
+    index, frame = reader.read()
+    assert index == 0
+    expected = _pixels(surface)[:, :32 * reader.layout.bytesize].reshape(16, 32, reader.layout.bytesize)
+    assert np.array_equal(frame, expected)
+    assert np.array_equal(reader.to_rgb(frame)[0, 0], [40, 20, 215])
+    reader.close()
+
+
+def test_old_frames_are_overwritten(exporter):
+    reader = FrameReader(exporter.name)
+    for value in range(5):
+        exporter.publish(_surface(value * 10))
+    assert reader.latest == 4
+    assert not reader.valid(1) and reader.view(1) is None
+    assert reader.valid(2) and reader.valid(4)
+    assert reader.to_rgb(reader.view(2))[0, 0, 0] == 20
+    reader.close()
+
+
+def test_frames_stop_when_writer_closes():
+    exporter = FrameExporter(_surface(0), slots=4)
+    reader = FrameReader(exporter.name)
+    exporter.publish(_surface(1))
+    exporter.publish(_surface(2))
+    exporter.close()
+    assert not reader.running
+    # 写入端停止后，读取端仍能读完手上的帧
+    assert [index for index, _ in reader.frames(timeout=1)] == [1]
+    reader.close()
+
+
+def test_rejects_other_shared_memory():
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(create=True, size=128)
+    try:
+        with pytest.raises(FrameExportError):
+            FrameReader(shm.name)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _read_in_child(name, queue):
+    reader = FrameReader(name)
+    queue.put(reader.read())
+    reader.close()
+
+
+@pytest.mark.parametrize('method', ['fork', 'spawn'])
+def test_reader_in_child_process(exporter, method):
+    if method not in multiprocessing.get_all_start_methods():
+        pytest.skip(f"不支持 {method}")
+    surface = _surface(90)
+    exporter.publish(surface)
+    context = multiprocessing.get_context(method)
+    queue = context.Queue()
+    process = context.Process(target=_read_in_child, args=(exporter.name, queue))
+    process.start()
+    index, frame = queue.get(timeout=30)
+    process.join(timeout=30)
+    assert process.exitcode == 0
+    assert index == 0
+    assert frame[0, 0].tolist() == _pixels(surface)[0, :frame.shape[2]].tolist()
@@ -0,0 +1,115 @@
+"""
+关卡缓存 levels.bin：编译后解码的数据与 JSON 源文件一致，过期/旧版本/删不掉的缓存都能恢复
+"""
+
+import json
+import os
+import shutil
+
+import pytest
+
+from src.levels.loader import (LEVELS_DIR, LevelData, LevelFormatError, LevelLibrary, compile_levels,
+                               find_sources)
+
+
+@pytest.fixture
+def level_dir(tmp_path):
+    """复制一份内置关卡源文件，缓存写在临时目录里"""
+    for path in find_sources(LEVELS_DIR):
+        shutil.copy(path, tmp_path)
+    return tmp_path
+
+
+def _points(values):
+    return [[values[i], values[i + 1]] for i in range(0, len(values), 2)]
+
+
+def test_round_trip_matches_sources(level_dir):
+    library = LevelLibrary(str(level_dir))
+    sources = find_sources(str(level_dir))
+    assert library.level_count == len(sources)
+    assert os.path.exists(library.cache_path)
+    
+    for number, path in enumerate(sources, 1):
+        with open(path, encoding='utf-8') as f:
+            source = json.load(f)
+        data = library.load(number)
+        assert data.title == source.get('title', '')
+        sheep = [point for group in source['groups'] for point in group.get('sheep', [])]
+        watermelons = [point for group in source['groups'] for point in group.get('watermelons', [])]
+        assert _points(data.sheep) == sheep
+        assert _points(data.watermelons) == watermelons
+        assert list(data.group_sizes) == [len(group.get(key, [])) for group in source['groups']
+                                          for key in ('sheep', 'watermelons')]
+
+
+def test_record_bytes_round_trip():
+    source = {'title': "测试关", 'groups': [{'sheep': [[1, 2], [3.5, 4]], 'watermelons': [[5, 6]]},
+                                            {'sheep': [[7, 8]]}]}
+    data = LevelData.from_source(source)
+    decoded = LevelData.from_bytes(data.to_bytes())
+    assert decoded.title == data.title
+    assert list(decoded.group_sizes) == list(data.group_sizes)
+    assert list(decoded.sheep) == list(data.sheep)
+    assert list(decoded.watermelons) == list(data.watermelons)
+
+
+def test_cache_reused_until_sources_change(level_dir):
+    first = LevelLibrary(str(level_dir))
+    first.load(1)
+    mtime = os.path.getmtime(first.cache_path)
+    
+    LevelLibrary(str(level_dir)).load(1)
+    assert os.path.getmtime(first.cache_path) == mtime
+    
+    # 源文件比缓存新时重新编译
+    path = find_sources(str(level_dir))[0]
+    with open(path, encoding='utf-8') as f:
+        source = json.load(f)
+    source['title'] = "改过的标题"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(source, f, ensure_ascii=False)
+    os.utime(path, (mtime + 10, mtime + 10))
+    assert LevelLibrary(str(level_dir)).load(1).title == "改过的标题"
+
+
+def test_old_cache_is_rebuilt(level_dir):
+    cache_path = os.path.join(level_dir, 'levels.bin')
+    with open(cache_path, 'wb') as f:
+        f.write(b'OLD!' + bytes(64))
+    library = LevelLibrary(str(level_dir))
+    assert library.level_count == len(find_sources(str(level_dir)))
+    with open(cache_path, 'rb') as f:
+        assert f.read(4) == b'SLVL'
+
+
+def test_undeletable_stale_cache_falls_back_to_memory(level_dir, monkeypatch):
+    cache_path = os.path.join(level_dir, 'levels.bin')
+    with open(cache_path, 'wb') as f:
+        f.write(b'OLD!' + bytes(64))
+    
+    def deny(path):
+        raise PermissionError(path)
+    
+    monkeypatch.setattr(os, 'remove', deny)
+    library = LevelLibrary(str(level_dir))
+    assert library.load(1).sheep_count > 0
+    assert library._data is not None
+
+
+def test_compile_rejects_counts_that_do_not_fit_the_format():
+    with pytest.raises(LevelFormatError):
+        LevelData.from_source({'groups': [{'sheep': [[1, 1]]}] * 0x10000})
+    with pytest.raises(LevelFormatError):
+        LevelData.from_source({'groups': [{'sheep': [[1, 1]] * 0x10000}]})
+    with pytest.raises(LevelFormatError):
+        LevelData.from_source({'title': 'x' * 0x10000, 'groups': [{'sheep': [[1, 1]]}]})
+    with pytest.raises(LevelFormatError):
+        compile_levels([''] * 0x10000)
+
+
+def test_invalid_source_is_rejected():
+    with pytest.raises(LevelFormatError):
+        LevelData.from_source({'groups': [{'sheep': [[1]]}]})
+    with pytest.raises(LevelFormatError):
+        LevelData.from_source({'groups': [{'watermelons': [[1, 1]]}]})
@@ -0,0 +1,95 @@
+"""
+输入录像：文件头和事件能原样读回，录制的一局回放后得到完全相同的结果
+"""
+
+import random
+
+import pytest
+
+from src.entities.particle import particle_pool
+from src.levels.generator import GeneratedLevels
+from src.simulation.replay import (INPUT_DRAG, INPUT_END, INPUT_PRESS, INPUT_RELEASE, INPUT_RESET,
+                                   INPUT_TRAJECTORY, MAX_COUNT, MAX_LEVEL_SEED, MAX_SEED, Replay,
+                                   ReplayError, ReplayRecorder)
+
+
+def test_header_and_events_round_trip(tmp_path):
+    path = str(tmp_path / 'session.rpl')
+    levels = GeneratedLevels(MAX_LEVEL_SEED, MAX_COUNT, 0.1 + 0.2, MAX_COUNT)
+    recorder = ReplayRecorder(path, MAX_SEED, MAX_COUNT, levels)
+    recorder.record(3, INPUT_PRESS, 5, -6)
+    recorder.record(7, INPUT_RELEASE, -32768, 32767)
+    recorder.close(10)
+    
+    replay = Replay.load(path)
+    assert replay.seed == MAX_SEED
+    assert replay.sim_rate == MAX_COUNT
+    assert replay.levels.seed == MAX_LEVEL_SEED
+    assert replay.levels.groups == MAX_COUNT
+    assert replay.levels.density == 0.1 + 0.2  # 按 double 保存，生成的关卡与录制时相同
+    assert replay.levels.count == MAX_COUNT
+    assert replay.events == [(3, INPUT_PRESS, 5, -6), (7, INPUT_RELEASE, -32768, 32767), (10, INPUT_END, 0, 0)]
+    assert replay.end_tick == 10
+    assert replay.events_at(5) == [(INPUT_PRESS, 5, -6)]
+    assert replay.events_at(10) == [(INPUT_RELEASE, -32768, 32767), (INPUT_END, 0, 0)]
+    assert replay.finished
+
+
+def test_builtin_levels_and_truncated_tail(tmp_path):
+    path = str(tmp_path / 'session.rpl')
+    recorder = ReplayRecorder(path, 0, 60)
+    recorder.record(1, INPUT_PRESS, 1, 2)
+    recorder.close(5)
+    with open(path, 'ab') as f:
+        f.write(b'\x01\x02\x03')  # 录制中途退出时写了一半的事件
+    
+    replay = Replay.load(path)
+    assert replay.levels is None
+    assert replay.events == [(1, INPUT_PRESS, 1, 2), (5, INPUT_END, 0, 0)]
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'not_a_replay.rpl'
+    path.write_bytes(b'SRPL')
+    with pytest.raises(ReplayError):
+        Replay.load(str(path))
+    path.write_bytes(b'XXXX' + bytes(64))
+    with pytest.raises(ReplayError):
+        Replay.load(str(path))
+
+
+def _state(game):
+    sim = game.sim
+    return (sim.level, sim.score, [sheep.alive for sheep in sim.sheeps], [sheep.variant() for sheep in sim.sheeps],
+            [watermelon.is_cut for watermelon in sim.watermelons], particle_pool.count,
+            particle_pool.x[:particle_pool.count].tobytes(), [cloud['x'] for cloud in game.background.clouds])
+
+
+def test_recorded_game_replays_identically(tmp_path):
+    from src.game import Game
+    
+    path = str(tmp_path / 'session.rpl')
+    game = Game(record_path=path, quiet=True)
+    bird = game.get_current_bird()
+    script = {
+        5: [(INPUT_PRESS, int(bird.x), int(bird.y))],
+        6: [(INPUT_DRAG, 100, 620)],
+        9: [(INPUT_DRAG, 90, 630), (INPUT_RELEASE, 90, 630)],
+        150: [(INPUT_RESET, 0, 0)],
+        160: [(INPUT_TRAJECTORY, 0, 0), (INPUT_PRESS, 200, 550)],
+        170: [(INPUT_DRAG, 80, 600), (INPUT_RELEASE, 80, 600)],
+    }
+    for tick in range(400):
+        for event in script.get(tick, []):
+            game.apply_input(*event)
+        game.update()
+        if tick % 3 == 0:
+            game.draw()
+    game.recorder.close(game.update_count)
+    expected = _state(game)
+    
+    random.random()  # 回放不能依赖录制之后的全局随机数状态
+    replayed = Game(replay=Replay.load(path), quiet=True)
+    result = replayed.run_replay(0)
+    assert result['completed']
+    assert _state(replayed) == expected
@@ -0,0 +1,88 @@
+"""
+世界快照：保存后恢复得到相同的状态，从快照分支出去的模拟与原来的一致，损坏的数据报 SnapshotError
+"""
+
+import random
+
+import pytest
+
+from src.simulation.core import Simulation
+from src.simulation.snapshot import _HEADER, SnapshotError
+
+PULLS = [(70, 30), (90, 10), (60, 45), (80, -10)]
+
+
+def _state(sim):
+    queue = sim.bird_queue
+    return (sim.level, sim.score, sim.tick, sim.alive_count, sim.game_over, sim.level_complete,
+            [sheep.alive for sheep in sim.sheeps], [sheep.variant() for sheep in sim.sheeps],
+            [(watermelon.x, watermelon.y, watermelon.size, watermelon.is_cut) for watermelon in sim.watermelons],
+            queue.index, [(bird.x, bird.y, bird.velocity_x, bird.velocity_y, bird.launched, bird.active, bird.color)
+                          for bird in queue.active_birds()],
+            len(sim.sheep_index))
+
+
+def _play(sim, pulls, steps=60):
+    for pull in pulls:
+        sim.launch(*pull)
+        for _ in range(steps):
+            sim.step()
+        sim.next_bird()
+
+
+def _make(level):
+    return Simulation(level=level, rng=random.Random(level), particles=False)
+
+
+@pytest.mark.parametrize('level', [1, 4])
+def test_restore_then_branch_matches(level):
+    sim = _make(level)
+    _play(sim, PULLS[:2], steps=15)  # 存档时有小鸟还在飞
+    snapshot = sim.snapshot()
+    before = _state(sim)
+    _play(sim, PULLS)
+    after = _state(sim)
+    
+    sim.restore(snapshot)
+    assert _state(sim) == before
+    assert sim.snapshot() == snapshot
+    _play(sim, PULLS)
+    assert _state(sim) == after
+
+
+def test_restore_into_other_level():
+    sim = _make(4)
+    _play(sim, PULLS[:2])
+    snapshot = sim.snapshot()
+    
+    other = _make(1)
+    other.restore(snapshot)
+    assert _state(other) == _state(sim)
+    assert other.snapshot() == snapshot
+    x, y, alive = other.sheep_table.columns()
+    assert list(alive) == [sheep.alive for sheep in sim.sheeps]
+    assert list(x) == [sheep.x for sheep in sim.sheeps]
+
+
+def test_corrupt_snapshot_raises_snapshot_error():
+    sim = _make(1)
+    _play(sim, PULLS[:1], steps=10)
+    snapshot = sim.snapshot()
+    before = _state(sim)
+    
+    # 第一只小羊的颜色下标（x、y 各 8 字节、存活 1 字节之后）
+    bad = bytearray(snapshot)
+    bad[_HEADER.size + len(sim.sheeps) * 17] = 200
+    with pytest.raises(SnapshotError):
+        sim.restore(bytes(bad))
+    
+    bad = bytearray(snapshot)
+    bad[-2] = 99  # 最后一只小鸟的颜色下标
+    with pytest.raises(SnapshotError):
+        sim.restore(bytes(bad))
+    
+    for data in (snapshot[:_HEADER.size - 1], snapshot[:-1], b'XXXX' + snapshot[4:]):
+        with pytest.raises(SnapshotError):
+            sim.restore(data)
+    
+    assert _state(sim) == before  # 读取失败时不改动当前状态